@@ -4,4 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
-    verbose_name = 'Cuentas y Perfiles'
\ No newline at end of file
+    verbose_name = 'Cuentas y Perfiles'
+    
+    def ready(self):
+        import apps.accounts.catalogos
+        import apps.accounts.dashboard
+        import apps.accounts.navegacion
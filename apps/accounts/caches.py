@@ -0,0 +1,231 @@
+# accounts/caches.py
+
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+
+# Métricas compartidas: una clave por dominio y evento
+METRICAS_KEY = 'metricas:{dominio}:{evento}'
+EVENTOS = ('aciertos', 'fallos', 'expulsiones', 'invalidaciones')
+
+# Claves guardadas por este proceso que se recuerdan para detectar expulsiones
+MAXIMO_RASTREADAS = 10000
+
+_FALTANTE = object()
+
+
+# =========================================================
+#   CACHÉ POR DOMINIO
+# =========================================================
+# Cada dominio (catálogos, calendario, dashboard, navegación)
+# tiene su espacio de nombres y su número de versión en la caché compartida:
+#
+#     <dominio>:version          → 7
+#     <dominio>:v7:<clave>       → valor
+#
+# Un dominio puede además tener grupos con su propia versión (el dashboard
+# usa uno por unidad y por trabajador): la clave lleva las dos versiones
+# (<dominio>:v7.3:<clave>) y invalidar(grupo) solo sube la del grupo.
+#
+# invalidar() sube la versión: las claves anteriores dejan de consultarse
+# y expiran por su TTL, sin tener que saber cuáles existen. Ningún valor
+# vive más de CACHE_TTL_MAXIMO, ni siquiera en los dominios "sin caducidad".
+#
+# Cada dominio cuenta aciertos, fallos, expulsiones (claves que este
+# proceso guardó y que desaparecieron antes de su TTL: la caché las sacó
+# por espacio) e invalidaciones. Los contadores viven en memoria y se
+# suman a la caché compartida cada CACHE_METRICAS_SEGUNDOS; el comando
+# `estadisticas_cache` los muestra.
+
+class CacheDominio:
+
+    def __init__(self, nombre, timeout=DEFAULT_TIMEOUT):
+        self.nombre = nombre
+        self.timeout = timeout  # por omisión, el TIMEOUT de CACHES; None = CACHE_TTL_MAXIMO
+        self.version_key = f'{nombre}:version'
+        self._contadores = Counter()
+        self._vencimientos = {}  # {clave: instante en que expira}
+        self._proximo_volcado = 0.0
+        self._candado = threading.Lock()
+        atexit.register(self.volcar_metricas)  # lo contado desde el último volcado
+
+    def __repr__(self):
+        return f"<CacheDominio {self.nombre}>"
+
+    # ---------------------------------------------------------
+    #   VERSIÓN
+    # ---------------------------------------------------------
+    def version(self, grupo=None):
+        """
+        Versión vigente del dominio; forma parte de cada clave. Con `grupo`
+        (p. ej. una unidad) se le agrega la versión del grupo, que se puede
+        invalidar sin tocar al resto del dominio.
+        """
+        claves = self._claves_version(grupo)
+        guardadas = cache.get_many(claves)
+        return self._componer([guardadas.get(k) or self._sembrar_version(k) for k in claves])
+
+    async def aversion(self, grupo=None):
+        claves = self._claves_version(grupo)
+        guardadas = await cache.aget_many(claves)
+        versiones = []
+        for key in claves:
+            version = guardadas.get(key)
+            if version is None:
+                await cache.aadd(key, time.time_ns(), timeout=None)
+                version = await cache.aget(key) or time.time_ns()
+            versiones.append(version)
+        return self._componer(versiones)
+
+    def invalidar(self, grupo=None):
+        """
+        Descarta las entradas del dominio (o solo las de `grupo`) subiendo
+        su versión.
+        """
+        key = self._claves_version(grupo)[-1]
+        try:
+            version = cache.incr(key)
+        except ValueError:
+            version = self._sembrar_version(key)
+        self._contar('invalidaciones')
+        return version
+
+    def _claves_version(self, grupo):
+        if grupo is None:
+            return [self.version_key]
+        return [self.version_key, f'{self.version_key}:{grupo}']
+
+    @staticmethod
+    def _componer(versiones):
+        return versiones[0] if len(versiones) == 1 else '.'.join(map(str, versiones))
+
+    @staticmethod
+    def _sembrar_version(key):
+        # Si la clave de versión desaparece (expulsión por LRU o MAX_ENTRIES) no
+        # se reinicia en 1: eso volvería a exponer las entradas de versiones
+        # pasadas. El reloj en nanosegundos siempre es mayor que cualquier
+        # versión anterior (sembrada antes e incrementada una vez por invalidación).
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.get(key) or time.time_ns()
+
+    def clave(self, clave, version):
+        return f'{self.nombre}:v{version}:{clave}'
+
+    # ---------------------------------------------------------
+    #   LECTURA / ESCRITURA
+    # ---------------------------------------------------------
+    def get(self, clave, default=None, grupo=None):
+        completa = self.clave(clave, self.version(grupo))
+        valor = cache.get(completa, _FALTANTE)
+        return self._registrar_lectura(completa, valor, default)
+
+    async def aget(self, clave, default=None, grupo=None):
+        completa = self.clave(clave, await self.aversion(grupo))
+        valor = await cache.aget(completa, _FALTANTE)
+        return self._registrar_lectura(completa, valor, default)
+
+    def set(self, clave, valor, timeout=_FALTANTE, grupo=None):
+        timeout = self._timeout(timeout)
+        completa = self.clave(clave, self.version(grupo))
+        cache.set(completa, valor, timeout)
+        self._rastrear(completa, timeout)
+
+    async def aset(self, clave, valor, timeout=_FALTANTE, grupo=None):
+        timeout = self._timeout(timeout)
+        completa = self.clave(clave, await self.aversion(grupo))
+        await cache.aset(completa, valor, timeout)
+        self._rastrear(completa, timeout)
+
+    def get_or_set(self, clave, calcular, timeout=_FALTANTE, grupo=None):
+        """Valor de `clave`; si no está, lo calcula con `calcular()` y lo guarda."""
+        timeout = self._timeout(timeout)
+        completa = self.clave(clave, self.version(grupo))
+        valor = self._registrar_lectura(completa, cache.get(completa, _FALTANTE), _FALTANTE)
+        if valor is _FALTANTE:
+            valor = calcular()
+            cache.set(completa, valor, timeout)
+            self._rastrear(completa, timeout)
+        return valor
+
+    def _timeout(self, timeout):
+        # _FALTANTE = el del dominio; DEFAULT_TIMEOUT = el de CACHES; None = el máximo
+        if timeout is _FALTANTE:
+            timeout = self.timeout
+        return settings.CACHE_TTL_MAXIMO if timeout is None else timeout
+
+    # ---------------------------------------------------------
+    #   MÉTRICAS
+    # ---------------------------------------------------------
+    def _registrar_lectura(self, completa, valor, default):
+        if valor is _FALTANTE:
+            expira = self._vencimientos.pop(completa, None)
+            if expira is not None and time.monotonic() < expira:
+                self._contar('expulsiones')
+            self._contar('fallos')
+            return default
+        self._contar('aciertos')
+        return valor
+
+    def _rastrear(self, completa, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = cache.default_timeout
+        if len(self._vencimientos) >= MAXIMO_RASTREADAS:
+            self._vencimientos.clear()
+        self._vencimientos[completa] = time.monotonic() + timeout
+
+    def _contar(self, evento):
+        with self._candado:
+            self._contadores[evento] += 1
+            ahora = time.monotonic()
+            if ahora < self._proximo_volcado:
+                return
+            pendientes = dict(self._contadores)
+            self._contadores.clear()
+            self._proximo_volcado = ahora + settings.CACHE_METRICAS_SEGUNDOS
+        self._volcar(pendientes)
+
+    def _volcar(self, pendientes):
+        for evento, cantidad in pendientes.items():
+            key = METRICAS_KEY.format(dominio=self.nombre, evento=evento)
+            try:
+                cache.incr(key, cantidad)
+            except ValueError:
+                if not cache.add(key, cantidad, timeout=None):
+                    cache.incr(key, cantidad)
+
+    def volcar_metricas(self):
+        """Suma a la caché compartida lo que este proceso lleva contado."""
+        if not self._contadores:
+            return
+        with self._candado:
+            pendientes = dict(self._contadores)
+            self._contadores.clear()
+        self._volcar(pendientes)
+
+    def metricas(self):
+        """{evento: total} de todos los procesos (lo ya volcado)."""
+        return {
+            evento: cache.get(METRICAS_KEY.format(dominio=self.nombre, evento=evento), 0)
+            for evento in EVENTOS
+        }
+
+    def reiniciar_metricas(self):
+        cache.delete_many([METRICAS_KEY.format(dominio=self.nombre, evento=evento) for evento in EVENTOS])
+
+
+# =========================================================
+#   DOMINIOS
+# =========================================================
+
+CATALOGOS = CacheDominio('catalogos', timeout=None)
+CALENDARIO = CacheDominio('calendario', timeout=None)
+DASHBOARD = CacheDominio('dashboard')
+NAVEGACION = CacheDominio('navegacion')
+
+DOMINIOS = (CATALOGOS, CALENDARIO, DASHBOARD, NAVEGACION)
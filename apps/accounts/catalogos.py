@@ -0,0 +1,157 @@
+# accounts/catalogos.py
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.incidencias.models import TipoIncidencia
+from apps.jornadas_laborales.models import JornadaLaboral
+from apps.trabajadores.models import Puesto, TipoNombramiento
+from apps.unidades.models import UnidadAdministrativa
+
+from .caches import CATALOGOS
+
+
+# =========================================================
+#   CATÁLOGOS CACHEADOS
+# =========================================================
+# Unidades, puestos, nombramientos, tipos de incidencia y jornadas casi no
+# cambian y se piden en casi todos los formularios y filtros. Se guardan en
+# el dominio CATALOGOS (hasta CACHE_TTL_MAXIMO) como tuplas ligeras:
+#
+#   - Las de dos campos (id, texto) sirven directo como choices y, por ser
+#     namedtuple, la plantilla las sigue leyendo como el modelo
+#     (unidad.id_unidad, unidad.nombre).
+#   - Las jornadas llevan lo que muestran las tarjetas de asignación.
+#
+# Cualquier alta, cambio o baja en un catálogo sube la versión del dominio
+# (señales de abajo) y todos se vuelven a cargar en la siguiente petición.
+
+Unidad = namedtuple('Unidad', 'id_unidad nombre')
+PuestoCatalogo = namedtuple('PuestoCatalogo', 'id_puesto etiqueta')
+Nombramiento = namedtuple('Nombramiento', 'id_tipo_nombramiento descripcion')
+TipoIncidenciaCatalogo = namedtuple('TipoIncidenciaCatalogo', 'id_tipo_incidencia descripcion')
+JornadaCatalogo = namedtuple('JornadaCatalogo', 'pk descripcion etiqueta hora_entrada hora_salida dias_cortos')
+
+
+def unidades():
+    """[Unidad(id_unidad, nombre), ...] ordenadas por nombre."""
+    return CATALOGOS.get_or_set('unidades', lambda: [
+        Unidad(*fila)
+        for fila in UnidadAdministrativa.objects.order_by('nombre').values_list('id_unidad', 'nombre')
+    ])
+
+
+def unidades_visibles(scope):
+    """Unidades que puede elegir el usuario: todas (admin), la suya (jefe) o ninguna."""
+    if scope.es_admin():
+        return unidades()
+    if scope.es_jefe() and scope.tiene_unidad:
+        return [unidad for unidad in unidades() if unidad.id_unidad == scope.id_unidad]
+    return []
+
+
+def puestos():
+    """[(id_puesto, "nombre (nivel)"), ...] ordenados como el modelo."""
+    return CATALOGOS.get_or_set('puestos', lambda: [
+        PuestoCatalogo(puesto.pk, str(puesto)) for puesto in Puesto.objects.all()
+    ])
+
+
+def tipos_nombramiento():
+    """[(id_tipo_nombramiento, descripcion), ...] ordenados como el modelo."""
+    return CATALOGOS.get_or_set('tipos_nombramiento', lambda: [
+        Nombramiento(*fila)
+        for fila in TipoNombramiento.objects.values_list('id_tipo_nombramiento', 'descripcion')
+    ])
+
+
+def tipos_incidencia():
+    """[(id_tipo_incidencia, descripcion), ...] de los tipos activos."""
+    return CATALOGOS.get_or_set('tipos_incidencia', lambda: [
+        TipoIncidenciaCatalogo(*fila)
+        for fila in TipoIncidencia.objects.filter(activo=True).values_list('id_tipo_incidencia', 'descripcion')
+    ])
+
+
+def _cargar_jornadas():
+    # dias_cortos sale de dias_mask: no hace falta leer JornadaDias
+    return [
+        JornadaCatalogo(
+            pk=jornada.pk,
+            descripcion=jornada.descripcion,
+            etiqueta=str(jornada),
+            hora_entrada=jornada.hora_entrada,
+            hora_salida=jornada.hora_salida,
+            dias_cortos=jornada.dias_cortos,
+        )
+        for jornada in JornadaLaboral.objects.all()
+    ]
+
+
+def jornadas():
+    """[JornadaCatalogo, ...] ordenadas como el modelo."""
+    return CATALOGOS.get_or_set('jornadas', _cargar_jornadas)
+
+
+def opciones_jornadas():
+    """[(id_jornada, texto), ...] para un campo de selección."""
+    return [(jornada.pk, jornada.etiqueta) for jornada in jornadas()]
+
+
+def jornadas_por_tipo():
+    """
+    {tipo: {'label': texto del tipo, 'jornadas': [JornadaCatalogo]}} en el
+    orden de las jornadas, como lo usan las tarjetas de asignación.
+    """
+    etiquetas = dict(JornadaLaboral.TIPO_JORNADA)
+    agrupadas = {}
+    for jornada in jornadas():
+        grupo = agrupadas.setdefault(jornada.descripcion, {
+            'label': etiquetas.get(jornada.descripcion, jornada.descripcion),
+            'jornadas': [],
+        })
+        grupo['jornadas'].append(jornada)
+    return agrupadas
+
+
+def usar_catalogo(campo, opciones):
+    """
+    Hace que un ModelChoiceField se dibuje con `opciones` (tuplas del
+    catálogo) en lugar de consultar su queryset. La validación sigue
+    usando el queryset, así que conviene asignarlo antes.
+    """
+    vacia = [('', campo.empty_label)] if campo.empty_label is not None else []
+    campo.choices = vacia + list(opciones)
+
+
+def invalidar_catalogos():
+    """
+    Descarta todos los catálogos cacheados al confirmarse la transacción en
+    curso (o en el momento, si no hay una): invalidar antes dejaría que otra
+    petición vuelva a cachear los datos viejos mientras la transacción sigue
+    abierta.
+    """
+    transaction.on_commit(CATALOGOS.invalidar)
+
+
+# =========================================================
+#   SEÑALES
+# =========================================================
+# Los días de una jornada (dias_cortos) cambian sin guardar la jornada: los
+# métodos que actualizan dias_mask invalidan por su cuenta.
+
+@receiver(post_save, sender=UnidadAdministrativa, dispatch_uid='catalogo_unidad_save')
+@receiver(post_delete, sender=UnidadAdministrativa, dispatch_uid='catalogo_unidad_delete')
+@receiver(post_save, sender=Puesto, dispatch_uid='catalogo_puesto_save')
+@receiver(post_delete, sender=Puesto, dispatch_uid='catalogo_puesto_delete')
+@receiver(post_save, sender=TipoNombramiento, dispatch_uid='catalogo_nombramiento_save')
+@receiver(post_delete, sender=TipoNombramiento, dispatch_uid='catalogo_nombramiento_delete')
+@receiver(post_save, sender=TipoIncidencia, dispatch_uid='catalogo_tipo_incidencia_save')
+@receiver(post_delete, sender=TipoIncidencia, dispatch_uid='catalogo_tipo_incidencia_delete')
+@receiver(post_save, sender=JornadaLaboral, dispatch_uid='catalogo_jornada_save')
+@receiver(post_delete, sender=JornadaLaboral, dispatch_uid='catalogo_jornada_delete')
+def invalidar_catalogos_por_cambio(sender, **kwargs):
+    invalidar_catalogos()
@@ -0,0 +1,119 @@
+# accounts/concurrencia.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+
+# Valor que muestran las plantillas cuando una consulta lenta no respondió a tiempo
+NO_DISPONIBLE = 'n/a'
+
+# Margen sobre CONSULTAS_TIMEOUT antes de dejar de esperar una consulta que la
+# base de datos no canceló (conexión lenta, o un motor sin statement_timeout)
+MARGEN_TIMEOUT = 1.0
+
+
+# =========================================================
+#   POOL DE CONSULTAS
+# =========================================================
+# El ORM asíncrono de Django 5.0 (acount(), afirst(), ...) manda todas las
+# consultas de una petición al mismo hilo, una detrás de otra; para que de
+# verdad corran al mismo tiempo cada consulta necesita su hilo y su conexión.
+#
+# Los hilos son pocos (CONSULTAS_HILOS por proceso) y viven lo que el proceso:
+# cada uno abre su conexión la primera vez y la reutiliza, así que un fallo de
+# caché del dashboard no abre una conexión por estadística y el total de
+# conexiones queda acotado aunque lleguen muchas peticiones a la vez (esperan
+# turno en el pool).
+
+_pool = ThreadPoolExecutor(max_workers=settings.CONSULTAS_HILOS, thread_name_prefix='consultas')
+
+
+def _conexion_lista():
+    # Como close_old_connections() pero sin CONN_MAX_AGE: la conexión del hilo
+    # solo se descarta si un error la dejó inservible.
+    if connection.errors_occurred:
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+        connection.errors_occurred = False
+
+
+def _ejecutar(func, timeout):
+    """
+    Corre `func` en el hilo actual del pool. Con `timeout`, en PostgreSQL la
+    base de datos cancela la consulta al vencer (statement_timeout) y el
+    resultado es NO_DISPONIBLE: ni la consulta ni el hilo siguen ocupados.
+    """
+    _conexion_lista()
+    if timeout is None:
+        return func()
+    try:
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    # SET LOCAL: solo dura lo que la transacción
+                    cursor.execute('SET LOCAL statement_timeout = %s', [int(timeout * 1000)])
+            return func()
+    except OperationalError:
+        # QueryCanceled (statement_timeout) llega como OperationalError
+        return NO_DISPONIBLE
+
+
+async def _en_pool(func, timeout=None):
+    loop = asyncio.get_running_loop()
+    futuro = loop.run_in_executor(_pool, _ejecutar, func, timeout)
+    if timeout is None:
+        return await futuro
+    try:
+        return await asyncio.wait_for(futuro, timeout + MARGEN_TIMEOUT)
+    except asyncio.TimeoutError:
+        return NO_DISPONIBLE
+
+
+def _repartir(resultados, clave, valor):
+    # Una consulta puede llenar varias claves a la vez (p. ej. un aggregate)
+    if isinstance(clave, tuple):
+        if valor is NO_DISPONIBLE:
+            valor = (NO_DISPONIBLE,) * len(clave)
+        resultados.update(zip(clave, valor))
+    else:
+        resultados[clave] = valor
+
+
+async def ejecutar_concurrentes(consultas=None, lentas=None, timeout=None):
+    """
+    Ejecuta consultas independientes al mismo tiempo en el pool de consultas.
+
+    Args:
+        consultas (dict): {clave: callable} que siempre se esperan (listas
+            cortas que la plantilla recorre).
+        lentas (dict): {clave: callable} limitadas por `timeout`; si no
+            terminan a tiempo su valor es NO_DISPONIBLE.
+        timeout (float): segundos para cada consulta lenta.
+
+    La clave puede ser una tupla cuando el callable devuelve varios valores.
+
+    Returns:
+        dict {clave: valor}. La latencia es la de la consulta más lenta, no la
+        suma de todas (mientras haya hilos libres en el pool).
+    """
+    consultas = consultas or {}
+    lentas = lentas or {}
+
+    claves = list(consultas) + list(lentas)
+    valores = await asyncio.gather(
+        *(_en_pool(func) for func in consultas.values()),
+        *(_en_pool(func, timeout) for func in lentas.values()),
+    )
+
+    resultados = {}
+    for clave, valor in zip(claves, valores):
+        _repartir(resultados, clave, valor)
+    return resultados
+
+
+def completos(resultados):
+    """True si ninguna consulta se degradó (y por tanto se puede cachear)."""
+    return all(valor is not NO_DISPONIBLE for valor in resultados.values())
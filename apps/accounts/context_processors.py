@@ -0,0 +1,8 @@
+# accounts/context_processors.py
+
+from .scope import ANONIMO
+
+
+def scope(request):
+    """Expone el AccessScope de la petición como `scope` en las plantillas."""
+    return {'scope': getattr(request, 'scope', ANONIMO)}
@@ -0,0 +1,260 @@
+# accounts/dashboard.py
+
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.asistencias.models import RegistroAsistencia
+from apps.incidencias.models import Incidencia
+from apps.jornadas_laborales.models import JornadaLaboral
+from apps.trabajadores.models import Trabajador
+from apps.unidades.models import UnidadAdministrativa
+
+from .caches import DASHBOARD
+from .concurrencia import completos, ejecutar_concurrentes
+from .models import PerfilUsuario
+
+
+# =========================================================
+#   INVALIDACIÓN
+# =========================================================
+
+# Cada entrada pertenece a un grupo con su propia versión (ver caches.py):
+#   - 'todos'                  dashboard del administrador
+#   - 'unidad-<id_unidad>'     jefes de la unidad
+#   - 'trabajador-<id>'        el trabajador
+# Un registro o una incidencia solo invalida los grupos que la ven (el de
+# su trabajador, el de su unidad y 'todos'), así que en la hora de entrada
+# los demás dashboards siguen saliendo de la caché. Los cambios que pueden
+# afectar a cualquier dashboard (trabajadores) suben la versión del dominio.
+#
+# La invalidación espera a que se confirme la transacción: si otro proceso
+# recalculara antes, guardaría de nuevo los datos viejos con la versión nueva.
+
+GRUPO_ADMIN = 'todos'
+
+
+def _grupos(unidades=(), trabajadores=()):
+    return (
+        [GRUPO_ADMIN]
+        + [f'unidad-{id_unidad}' for id_unidad in set(unidades) if id_unidad is not None]
+        + [f'trabajador-{id_trabajador}' for id_trabajador in set(trabajadores)]
+    )
+
+
+def invalidar_dashboard(unidades=None, trabajadores=None):
+    """
+    Descarta estadísticas cacheadas al confirmarse la transacción en curso
+    (o en el momento, si no hay una).
+
+    Sin argumentos sube la versión del dominio DASHBOARD (todas las
+    entradas); con `unidades` y/o `trabajadores` (ids) solo las de esos
+    grupos y la del administrador.
+    """
+    if unidades is None and trabajadores is None:
+        transaction.on_commit(DASHBOARD.invalidar)
+        return
+
+    grupos = _grupos(unidades or (), trabajadores or ())
+
+    def invalidar():
+        for grupo in grupos:
+            DASHBOARD.invalidar(grupo)
+    transaction.on_commit(invalidar)
+
+
+# =========================================================
+#   CONSULTAS POR ROL
+# =========================================================
+# Cada proveedor devuelve (consultas, lentas): callables independientes que
+# ejecutar_concurrentes corre al mismo tiempo. Los conteos van en `lentas`
+# (se degradan a "n/a" si tardan); las listas que recorre la plantilla no.
+
+def _conteo_estatus(registros):
+    """(asistencias, retardos, faltas) de un queryset de registros en una consulta."""
+    def consulta():
+        totales = registros.aggregate(
+            asistencias=Count('id_registro', filter=Q(estatus='ASI')),
+            retardos=Count('id_registro', filter=Q(estatus='RET')),
+            faltas=Count('id_registro', filter=Q(estatus='FAL')),
+        )
+        return totales['asistencias'], totales['retardos'], totales['faltas']
+    return consulta
+
+
+def _consultas_admin(scope, hoy):
+    consultas = {
+        'usuarios_por_rol': lambda: list(
+            PerfilUsuario.objects.values('rol').annotate(
+                total=Count('id_perfil')
+            ).order_by('rol')
+        ),
+        'ultimas_asistencias': lambda: list(
+            RegistroAsistencia.objects.select_related(
+                'id_trabajador', 'id_trabajador__id_unidad'
+            ).order_by('-fecha', '-hora_entrada')[:5]
+        ),
+    }
+    lentas = {
+        'total_usuarios': User.objects.filter(is_active=True).count,
+        'total_trabajadores': Trabajador.objects.filter(activo=True).count,
+        'total_unidades': UnidadAdministrativa.objects.count,
+        ('asistencias_hoy', 'retardos_hoy', 'faltas_hoy'): _conteo_estatus(
+            RegistroAsistencia.objects.filter(fecha=hoy)
+        ),
+        'incidencias_pendientes': Incidencia.objects.filter(estado='pendiente').count,
+    }
+    return consultas, lentas
+
+
+def _consultas_jefe(scope, hoy):
+    trabajadores_unidad = Trabajador.objects.visible_to(scope).filter(activo=True)
+
+    consultas = {
+        'ultimas_asistencias': lambda: list(
+            RegistroAsistencia.objects.visible_to(scope).select_related(
+                'id_trabajador'
+            ).order_by('-fecha', '-hora_entrada')[:5]
+        ),
+        'trabajadores_unidad': lambda: list(
+            trabajadores_unidad.select_related('id_puesto')[:10]
+        ),
+    }
+    lentas = {
+        'total_trabajadores_unidad': trabajadores_unidad.count,
+        ('asistencias_hoy', 'retardos_hoy', 'faltas_hoy'): _conteo_estatus(
+            RegistroAsistencia.objects.visible_to(scope).filter(fecha=hoy)
+        ),
+        'incidencias_pendientes': Incidencia.objects.visible_to(scope).filter(
+            estado='pendiente'
+        ).count,
+    }
+    return consultas, lentas
+
+
+def _consultas_trabajador(scope, hoy):
+    inicio_mes = hoy.replace(day=1)
+
+    def mi_jornada():
+        # Jornada vigente hoy, desde la jornada actual desnormalizada
+        return JornadaLaboral.objects.filter(
+            trabajadores_asignados__pk=Trabajador.objects.filter(
+                pk=scope.id_trabajador
+            ).con_jornada_vigente(hoy).values('jornada_actual')[:1]
+        ).first()
+
+    def mis_incidencias():
+        totales = Incidencia.objects.visible_to(scope).aggregate(
+            pendientes=Count('id_incidencia', filter=Q(estado='pendiente')),
+            rechazadas=Count('id_incidencia', filter=Q(estado='rechazada')),
+        )
+        return totales['pendientes'], totales['rechazadas']
+
+    consultas = {
+        'asistencia_hoy': RegistroAsistencia.objects.visible_to(scope).filter(
+            fecha=hoy
+        ).first,
+        'mi_jornada': mi_jornada,
+        'mis_ultimas_asistencias': lambda: list(
+            RegistroAsistencia.objects.visible_to(scope).order_by('-fecha')[:7]
+        ),
+    }
+    lentas = {
+        ('asistencias_mes', 'retardos_mes', 'faltas_mes'): _conteo_estatus(
+            RegistroAsistencia.objects.visible_to(scope).filter(
+                fecha__gte=inicio_mes,
+                fecha__lte=hoy
+            )
+        ),
+        ('mis_incidencias_pendientes', 'mis_incidencias_rechazadas'): mis_incidencias,
+    }
+    return consultas, lentas
+
+
+def _proveedor(scope):
+    """Devuelve (función, grupo) para el alcance, o (None, None)."""
+    if scope.es_admin():
+        return _consultas_admin, GRUPO_ADMIN
+    if scope.es_jefe() and scope.tiene_trabajador:
+        return _consultas_jefe, f'unidad-{scope.id_unidad}'
+    if scope.es_trabajador() and scope.tiene_trabajador:
+        return _consultas_trabajador, f'trabajador-{scope.id_trabajador}'
+    return None, None
+
+
+async def aobtener_estadisticas_dashboard(scope):
+    """
+    Estadísticas del dashboard para el alcance dado.
+
+    Todos los jefes de una misma unidad comparten la entrada de caché; un
+    trabajador tiene la suya. La clave incluye la fecha (los contadores son
+    "de hoy"/"del mes") y las versiones del dominio y del grupo, que suben
+    las señales de abajo.
+
+    En un fallo de caché las consultas corren al mismo tiempo; si alguna
+    se degradó a "n/a" el resultado no se guarda.
+
+    Returns:
+        dict con los valores listos para el contexto (sin QuerySets).
+    """
+    proveedor, grupo = _proveedor(scope)
+    if proveedor is None:
+        return {}
+
+    hoy = datetime.now().date()
+    key = f'{scope.rol}:{grupo}:{hoy.isoformat()}'
+
+    datos = await DASHBOARD.aget(key, grupo=grupo)
+    if datos is None:
+        consultas, lentas = proveedor(scope, hoy)
+        datos = await ejecutar_concurrentes(
+            consultas, lentas, timeout=settings.CONSULTAS_TIMEOUT
+        )
+        if completos(datos):
+            await DASHBOARD.aset(key, datos, settings.DASHBOARD_CACHE_TTL, grupo=grupo)
+    return datos
+
+
+# =========================================================
+#   SEÑALES
+# =========================================================
+
+def _unidad_del_trabajador(instance):
+    # Sin consulta si el trabajador ya viene cargado en la instancia
+    campo = type(instance).id_trabajador.field
+    if campo.is_cached(instance):
+        trabajador = campo.get_cached_value(instance)
+        return trabajador.id_unidad_id if trabajador else None
+    return Trabajador.objects.filter(
+        pk=instance.id_trabajador_id
+    ).values_list('id_unidad', flat=True).first()
+
+
+@receiver(post_save, sender=RegistroAsistencia, dispatch_uid='dashboard_registro_save')
+@receiver(post_delete, sender=RegistroAsistencia, dispatch_uid='dashboard_registro_delete')
+@receiver(post_save, sender=Incidencia, dispatch_uid='dashboard_incidencia_save')
+@receiver(post_delete, sender=Incidencia, dispatch_uid='dashboard_incidencia_delete')
+def invalidar_dashboard_por_registro(sender, instance, **kwargs):
+    invalidar_dashboard(
+        unidades=[_unidad_del_trabajador(instance)],
+        trabajadores=[instance.id_trabajador_id],
+    )
+
+
+@receiver(post_save, sender=PerfilUsuario, dispatch_uid='dashboard_perfil_save')
+@receiver(post_delete, sender=PerfilUsuario, dispatch_uid='dashboard_perfil_delete')
+def invalidar_dashboard_por_perfil(sender, **kwargs):
+    # Solo el administrador ve usuarios y roles
+    invalidar_dashboard(unidades=[], trabajadores=[])
+
+
+@receiver(post_save, sender=Trabajador, dispatch_uid='dashboard_trabajador_save')
+@receiver(post_delete, sender=Trabajador, dispatch_uid='dashboard_trabajador_delete')
+def invalidar_dashboard_por_trabajador(sender, **kwargs):
+    # Un cambio de unidad afecta a la unidad anterior, que aquí no se conoce
+    invalidar_dashboard()
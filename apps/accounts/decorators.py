@@ -2,8 +2,54 @@
 
 from django.shortcuts import redirect
 from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
 from functools import wraps
 
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+
+def _envolver(view_func, verificar):
+    """
+    Aplica `verificar(request)` antes de la vista.
+
+    `verificar` devuelve una respuesta (redirección) o None si puede pasar.
+    Para vistas asíncronas la verificación corre en un hilo: request.user y
+    request.scope se cargan ahí (consultan la BD) y la vista ya los recibe
+    resueltos.
+    """
+    if iscoroutinefunction(view_func):
+        def verificar_y_resolver(request):
+            respuesta = verificar(request)
+            request.scope.autenticado  # resolver el scope fuera del event loop
+            return respuesta
+
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            respuesta = await sync_to_async(verificar_y_resolver)(request)
+            if respuesta is not None:
+                return respuesta
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        respuesta = verificar(request)
+        if respuesta is not None:
+            return respuesta
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def sesion_requerida(view_func):
+    """
+    Equivalente a login_required que también acepta vistas asíncronas
+    (login_required de Django 5.0 solo funciona con vistas síncronas).
+    """
+    def verificar(request):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+    return _envolver(view_func, verificar)
+
 
 def rol_requerido(*roles_permitidos):
     """
@@ -11,25 +57,23 @@ def rol_requerido(*roles_permitidos):
     Uso: @rol_requerido('admin', 'jefe')
     """
     def decorator(view_func):
-        @wraps(view_func)
-        def wrapper(request, *args, **kwargs):
+        def verificar(request):
 
             # 1️⃣ Usuario no logueado
             if not request.user.is_authenticated:
                 return redirect('account_login')
 
             # 2️⃣ Sin perfil → este NO debe redirigir al dashboard, porque causará loops
-            if not hasattr(request.user, 'perfil'):
+            if not request.scope.tiene_perfil:
                 messages.error(request, 'Tu cuenta no tiene un perfil asignado.')
                 return redirect('account_logout')  # preferible sacarlo para evitar loops
 
             # 3️⃣ Verificar rol
-            if request.user.perfil.rol not in roles_permitidos:
+            if request.scope.rol not in roles_permitidos:
                 messages.error(request, 'No tienes permisos para acceder aquí.')
                 return redirect(request.META.get("HTTP_REFERER", "/"))
 
-            return view_func(request, *args, **kwargs)
-        return wrapper
+        return _envolver(view_func, verificar)
     return decorator
 
 
@@ -49,47 +93,45 @@ def requiere_trabajador_y_unidad(view_func):
 	EXCEPCIÓN: Los admins saltan esta validación.
 	Usado para jefes y trabajadores que necesitan estas relaciones.
 	"""
-	@wraps(view_func)
-	def wrapper(request, *args, **kwargs):
-		# Los admins no necesitan estas validaciones
-		if request.user.is_authenticated and hasattr(request.user, 'perfil') and request.user.perfil.es_admin():
-			return view_func(request, *args, **kwargs)
-
+	def verificar(request):
 		if not request.user.is_authenticated:
 			return redirect('account_login')
 
-		if not hasattr(request.user, 'perfil') or not request.user.perfil:
+		scope = request.scope
+
+		# Los admins no necesitan estas validaciones
+		if scope.es_admin():
+			return None
+
+		if not scope.tiene_perfil:
 			messages.error(request, 'Tu cuenta no tiene un perfil asignado.')
 			return redirect('account_logout')
 
-		if not hasattr(request.user.perfil, 'id_trabajador') or not request.user.perfil.id_trabajador:
+		if not scope.tiene_trabajador:
 			messages.error(request, 'Tu perfil no tiene un trabajador asociado.')
 			return redirect('account_logout')
 
-		if not hasattr(request.user.perfil.id_trabajador, 'id_unidad') or not request.user.perfil.id_trabajador.id_unidad:
+		if not scope.tiene_unidad:
 			messages.error(request, 'Tu trabajador no tiene una unidad asociada.')
 			return redirect('account_logout')
 
-		return view_func(request, *args, **kwargs)
-	return wrapper
+	return _envolver(view_func, verificar)
 
 
 # === Decorador especial para autorizar incidencias === #
 
 def puede_autorizar_incidencias(view_func):
-    @wraps(view_func)
-    def wrapper(request, *args, **kwargs):
+    def verificar(request):
 
         if not request.user.is_authenticated:
             return redirect('account_login')
 
-        if not hasattr(request.user, 'perfil'):
+        if not request.scope.tiene_perfil:
             messages.error(request, 'Tu usuario no tiene un perfil asignado.')
             return redirect('account_logout')
 
-        if not request.user.perfil.puede_autorizar_incidencias:
+        if not request.scope.puede_autorizar_incidencias:
             messages.error(request, 'No tienes permisos para autorizar incidencias.')
             return redirect('no_autorizado')
 
-        return view_func(request, *args, **kwargs)
-    return wrapper
+    return _envolver(view_func, verificar)
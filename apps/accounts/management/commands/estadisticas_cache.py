@@ -0,0 +1,43 @@
+# apps/accounts/management/commands/estadisticas_cache.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.accounts.caches import DOMINIOS, EVENTOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra por dominio de caché (catálogos, calendario, dashboard, "
+        "navegación) los aciertos, fallos, expulsiones e invalidaciones "
+        "sumados por todos los procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reiniciar', action='store_true',
+            help='Poner los contadores en cero después de mostrarlos'
+        )
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"Backend: {backend} ({settings.CACHE_BACKEND})")
+        self.stdout.write(
+            f"{'Dominio':<12}{'Versión':>21}" + ''.join(f"{evento.capitalize():>16}" for evento in EVENTOS)
+            + f"{'% aciertos':>12}"
+        )
+
+        for dominio in DOMINIOS:
+            totales = dominio.metricas()
+            lecturas = totales['aciertos'] + totales['fallos']
+            porcentaje = f"{100 * totales['aciertos'] / lecturas:.1f}" if lecturas else '-'
+            self.stdout.write(
+                f"{dominio.nombre:<12}{dominio.version():>21}"
+                + ''.join(f"{totales[evento]:>16}" for evento in EVENTOS)
+                + f"{porcentaje:>12}"
+            )
+            if options['reiniciar']:
+                dominio.reiniciar_metricas()
+
+        if options['reiniciar']:
+            self.stdout.write(self.style.SUCCESS("Contadores reiniciados"))
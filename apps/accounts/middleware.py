@@ -0,0 +1,21 @@
+# accounts/middleware.py
+
+from django.utils.functional import SimpleLazyObject
+
+from .scope import cargar_scope
+
+
+class AccessScopeMiddleware:
+    """
+    Agrega `request.scope` (AccessScope) a cada petición.
+
+    Se evalúa de forma perezosa: solo las peticiones que lo usan hacen la
+    consulta, y como máximo una vez. Debe ir después de AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.scope = SimpleLazyObject(lambda: cargar_scope(request.user))
+        return self.get_response(request)
@@ -58,6 +58,36 @@ class PerfilUsuario(models.Model):
         email = self.user.email or self.user.username
         return f"{email} - {self.get_rol_display()}"
 
+    # ============================================================
+    #   DETECCIÓN DE CAMBIOS
+    # ============================================================
+    CAMPOS_RASTREADOS = ('rol', 'id_trabajador_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        perfil = super().from_db(db, field_names, values)
+        perfil._guardar_estado_original()
+        return perfil
+
+    def _guardar_estado_original(self):
+        # Solo los campos cargados (no forzar consultas de campos diferidos)
+        self._estado_original = {
+            campo: self.__dict__[campo]
+            for campo in self.CAMPOS_RASTREADOS
+            if campo in self.__dict__
+        }
+
+    def tiene_cambios(self):
+        """True si el perfil es nuevo o cambió su rol/trabajador desde que se cargó."""
+        original = getattr(self, '_estado_original', None)
+        if original is None:
+            return True
+        return any(getattr(self, campo) != valor for campo, valor in original.items())
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._guardar_estado_original()
+
     # ============================================================
     #   VERIFICACIÓN DE ROLES
     # ============================================================
@@ -122,7 +152,17 @@ def crear_perfil_usuario(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def guardar_perfil_usuario(sender, instance, **kwargs):
-    """Guarda también el perfil cuando el usuario se guarda."""
-    if hasattr(instance, 'perfil'):
-        instance.perfil.save()
+def guardar_perfil_usuario(sender, instance, created, **kwargs):
+    """
+    Guarda también el perfil cuando el usuario se guarda, solo si ya estaba
+    cargado en memoria y cambió.
+
+    Cada login guarda User.last_login; antes esto consultaba el perfil y lo
+    volvía a escribir (SELECT + UPDATE por login sin cambiar nada).
+    """
+    if created:
+        return  # crear_perfil_usuario ya lo acaba de insertar
+
+    perfil = PerfilUsuario.user.field.remote_field.get_cached_value(instance, None)
+    if perfil is not None and perfil.tiene_cambios():
+        perfil.save()
@@ -0,0 +1,52 @@
+# accounts/navegacion.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import translation
+
+from apps.unidades.models import UnidadAdministrativa
+
+from .caches import NAVEGACION
+from .models import PerfilUsuario
+from .scope import ANONIMO
+
+
+# =========================================================
+#   MENÚ LATERAL CACHEADO
+# =========================================================
+# El menú de base.html solo depende del rol, de si el usuario tiene
+# trabajador (sección "Mi Información"), de su unidad, de is_staff y del
+# idioma. Se dibuja una vez por combinación y se guarda en el dominio
+# NAVEGACION con el TIMEOUT de CACHES, que también cubre los cambios de la
+# plantilla al desplegar. Ver templatetags/navegacion.py.
+
+def clave_navegacion(request):
+    """Clave del menú para el usuario de `request`."""
+    scope = getattr(request, 'scope', ANONIMO)
+    user = getattr(request, 'user', None)
+    return ':'.join(str(parte) for parte in (
+        scope.rol,
+        scope.id_unidad,
+        int(scope.tiene_trabajador),
+        int(bool(user and user.is_staff)),
+        translation.get_language(),
+    ))
+
+
+def invalidar_navegacion():
+    """Descarta todos los menús cacheados."""
+    NAVEGACION.invalidar()
+
+
+# =========================================================
+#   SEÑALES
+# =========================================================
+# Un cambio de rol o de unidad invalida los menús de inmediato en lugar
+# de esperar al TTL.
+
+@receiver(post_save, sender=PerfilUsuario, dispatch_uid='navegacion_perfil_save')
+@receiver(post_delete, sender=PerfilUsuario, dispatch_uid='navegacion_perfil_delete')
+@receiver(post_save, sender=UnidadAdministrativa, dispatch_uid='navegacion_unidad_save')
+@receiver(post_delete, sender=UnidadAdministrativa, dispatch_uid='navegacion_unidad_delete')
+def invalidar_navegacion_por_cambio(sender, **kwargs):
+    invalidar_navegacion()
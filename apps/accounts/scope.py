@@ -0,0 +1,143 @@
+# accounts/scope.py
+
+from dataclasses import dataclass
+
+from django.db import models
+
+from .models import PerfilUsuario
+
+
+ROLES_DISPLAY = dict(PerfilUsuario.ROLES)
+
+
+@dataclass(frozen=True)
+class AccessScope:
+    """
+    Alcance de acceso del usuario para la petición actual.
+
+    Se construye una sola vez por petición (ver AccessScopeMiddleware) y es
+    inmutable: decoradores, vistas, formularios y plantillas leen de aquí el
+    rol, el trabajador y la unidad en lugar de recorrer
+    request.user.perfil.id_trabajador.id_unidad en cada uso.
+    """
+
+    autenticado: bool = False
+    id_perfil: int = None
+    rol: str = None
+    id_trabajador: int = None
+    id_unidad: int = None
+    unidad_nombre: str = None
+
+    # ============================================================
+    #   VERIFICACIÓN DE ROLES (misma interfaz que PerfilUsuario)
+    # ============================================================
+    def es_admin(self):
+        return self.rol == 'admin'
+
+    def es_jefe(self):
+        return self.rol == 'jefe'
+
+    def es_trabajador(self):
+        return self.rol == 'trabajador'
+
+    def es_espera(self):
+        return self.rol == 'espera'
+
+    def get_rol_display(self):
+        return ROLES_DISPLAY.get(self.rol, self.rol or '')
+
+    # ============================================================
+    #   UTILIDADES PARA CONTROL POR UNIDAD
+    # ============================================================
+    @property
+    def tiene_perfil(self):
+        return self.id_perfil is not None
+
+    @property
+    def tiene_trabajador(self):
+        return self.id_trabajador is not None
+
+    @property
+    def tiene_unidad(self):
+        return self.id_unidad is not None
+
+    @property
+    def puede_autorizar_incidencias(self):
+        """Admin y jefe pueden autorizar incidencias."""
+        return self.rol in ['admin', 'jefe']
+
+    def puede_ver_reportes(self):
+        return self.rol in ['admin', 'jefe']
+
+    def pertenece_a_su_unidad(self, trabajador):
+        """Verifica si un trabajador pertenece a la unidad del jefe (sin consultas)."""
+        if not self.es_jefe() or not self.tiene_unidad:
+            return False
+        return trabajador.id_unidad_id == self.id_unidad
+
+
+ANONIMO = AccessScope()
+
+
+def cargar_scope(user):
+    """
+    Construye el AccessScope de un usuario con una sola consulta.
+
+    El perfil se obtiene con select_related hasta la unidad y se deja en la
+    caché de la relación `user.perfil`, así el código que todavía necesite la
+    instancia (p. ej. el trabajador para registrar asistencia) no vuelve a
+    consultar la base de datos.
+    """
+    if not user.is_authenticated:
+        return ANONIMO
+
+    perfil = PerfilUsuario.objects.select_related(
+        'id_trabajador__id_unidad'
+    ).filter(user_id=user.pk).first()
+
+    if perfil is None:
+        return AccessScope(autenticado=True)
+
+    # Reutilizar el perfil cargado en user.perfil y perfil.user
+    PerfilUsuario.user.field.remote_field.set_cached_value(user, perfil)
+    PerfilUsuario.user.field.set_cached_value(perfil, user)
+
+    trabajador = perfil.id_trabajador
+    unidad = trabajador.id_unidad if trabajador else None
+
+    return AccessScope(
+        autenticado=True,
+        id_perfil=perfil.id_perfil,
+        rol=perfil.rol,
+        id_trabajador=trabajador.pk if trabajador else None,
+        id_unidad=unidad.pk if unidad else None,
+        unidad_nombre=unidad.nombre if unidad else None,
+    )
+
+
+# ============================================================
+#   QUERYSETS POR ALCANCE
+# ============================================================
+
+class ScopeQuerySet(models.QuerySet):
+    """
+    QuerySet con `.visible_to(scope)`: admin ve todo, jefe ve su unidad y
+    trabajador solo lo suyo. Cualquier otro caso (en espera, sin unidad o
+    sin trabajador) no ve nada.
+
+    El filtro siempre se aplica sobre las mismas columnas indexadas
+    (`campo_unidad` / `campo_trabajador`), así todas las vistas generan
+    la misma consulta para el mismo alcance.
+    """
+
+    campo_unidad = 'id_trabajador__id_unidad_id'
+    campo_trabajador = 'id_trabajador_id'
+
+    def visible_to(self, scope):
+        if scope.es_admin():
+            return self
+        if scope.es_jefe() and scope.tiene_unidad:
+            return self.filter(**{self.campo_unidad: scope.id_unidad})
+        if scope.es_trabajador() and scope.tiene_trabajador:
+            return self.filter(**{self.campo_trabajador: scope.id_trabajador})
+        return self.none()
@@ -0,0 +1,40 @@
+# accounts/templatetags/navegacion.py
+
+from django import template
+
+from apps.accounts.caches import NAVEGACION
+from apps.accounts.navegacion import clave_navegacion
+
+
+register = template.Library()
+
+
+class NavegacionNode(template.Node):
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        request = context.get('request')
+        if request is None:
+            return self.nodelist.render(context)
+        return NAVEGACION.get_or_set(
+            clave_navegacion(request),
+            lambda: self.nodelist.render(context),
+        )
+
+
+@register.tag
+def navegacion_cacheada(parser, token):
+    """
+    Guarda lo que encierra en el dominio NAVEGACION, una vez por rol,
+    unidad, trabajador, is_staff e idioma:
+
+        {% load navegacion %}
+        {% navegacion_cacheada %} ... {% endnavegacion_cacheada %}
+
+    Lo encerrado no debe depender de nada más de la petición.
+    """
+    nodelist = parser.parse(('endnavegacion_cacheada',))
+    parser.delete_first_token()
+    return NavegacionNode(nodelist)
@@ -3,6 +3,7 @@
 from django import forms
 from .models import RegistroAsistencia
 from apps.trabajadores.models import Trabajador
+from apps.trabajadores.widgets import TrabajadorAutocompleteWidget
 from datetime import date, datetime
 
 
@@ -15,9 +16,7 @@ class RegistroAsistenciaForm(forms.ModelForm):
         model = RegistroAsistencia
         fields = ['id_trabajador', 'fecha', 'hora_entrada', 'hora_salida', 'estatus']
         widgets = {
-            'id_trabajador': forms.Select(attrs={
-                'class': 'w-full px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500'
-            }),
+            'id_trabajador': TrabajadorAutocompleteWidget(parametros={'pendientes': 1}),
             'fecha': forms.DateInput(attrs={
                 'type': 'date',
                 'class': 'w-full px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500',
@@ -67,20 +66,16 @@ class RegistroAsistenciaForm(forms.ModelForm):
 # =========================================================
 
 class RegistroRapidoForm(forms.Form):
+    # La vista limita el queryset a los pendientes de hoy; el autocompletado
+    # busca con el mismo filtro (parámetro `pendientes`)
     numero_empleado = forms.ModelChoiceField(
         queryset=Trabajador.objects.filter(activo=True),
-        widget=forms.Select(attrs={
-            'class': 'w-full px-4 py-3 text-lg border-2 border-blue-500 rounded-lg focus:ring-2 focus:ring-blue-500',
-            'autofocus': True
-        }),
-        label='Selecciona el trabajador',
-        empty_label='-- Selecciona un trabajador --'
+        widget=TrabajadorAutocompleteWidget(
+            attrs={'autofocus': True},
+            parametros={'pendientes': 1},
+        ),
+        label='Selecciona el trabajador'
     )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Personalizar cómo se muestra cada trabajador en el combo
-        self.fields['numero_empleado'].label_from_instance = lambda obj: f"{obj.numero_empleado} - {obj.nombre} {obj.apellido_paterno} {obj.apellido_materno}"
 
 
 # =========================================================
@@ -115,8 +110,10 @@ class FiltroAsistenciaForm(forms.Form):
     trabajador = forms.ModelChoiceField(
         required=False,
         queryset=Trabajador.objects.filter(activo=True),
-        widget=forms.Select(attrs={
-            'class': 'px-4 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500'
-        }),
+        widget=TrabajadorAutocompleteWidget(
+            attrs={'id': 'filtro-trabajador'},
+            unidad_selector='#filtro-unidad',
+            placeholder='Todos los trabajadores'
+        ),
         label='Trabajador'
     )
\ No newline at end of file
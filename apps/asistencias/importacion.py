@@ -0,0 +1,336 @@
+# apps/asistencias/importacion.py
+
+import csv
+import io
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.trabajadores.models import Trabajador
+
+from .models import RegistroAsistencia
+from .utils import ResolutorJornadas
+
+
+# Checadas del reloj anterior: una por línea con número de empleado y fecha/hora
+# ISO 8601 ("2024-03-15 08:02:11" o con zona horaria), ordenadas por fecha.
+#   CSV:   encabezado numero_empleado,fecha_hora
+#   JSONL: {"numero_empleado": "...", "fecha_hora": "..."}
+CAMPO_EMPLEADO = 'numero_empleado'
+CAMPO_FECHA_HORA = 'fecha_hora'
+
+LOTE = 2000
+
+CAMPOS_ACTUALIZABLES = ['hora_entrada', 'hora_salida', 'estatus', 'updated_at', 'updated_by']
+
+
+@dataclass
+class ResultadoImportacion:
+    checadas: int = 0
+    registros: int = 0
+    errores: int = 0
+    omitidas: int = 0
+    segundos: float = 0.0
+
+    @property
+    def checadas_por_segundo(self):
+        return self.checadas / self.segundos if self.segundos else 0
+
+    def __str__(self):
+        texto = (
+            f"{self.checadas} checadas → {self.registros} registros, "
+            f"{self.errores} con error en {self.segundos:.1f} s "
+            f"({self.checadas_por_segundo:,.0f} checadas/s)"
+        )
+        if self.omitidas:
+            texto += f"; {self.omitidas} líneas ya importadas omitidas"
+        return texto
+
+
+# =========================================================
+#   LECTURA
+# =========================================================
+
+def leer_checadas(archivo, formato):
+    """
+    Genera (numero_linea, numero_empleado, texto_fecha_hora) sin cargar el
+    archivo completo. `archivo` es binario; `formato` 'csv' o 'jsonl'.
+    """
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    try:
+        if formato == 'jsonl':
+            for numero_linea, linea in enumerate(texto, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except ValueError:
+                    yield numero_linea, '', None
+                    continue
+                yield numero_linea, str(fila.get(CAMPO_EMPLEADO, '')), fila.get(CAMPO_FECHA_HORA)
+        else:
+            # La línea 1 es el encabezado
+            for numero_linea, fila in enumerate(csv.DictReader(texto), start=2):
+                yield numero_linea, fila.get(CAMPO_EMPLEADO) or '', fila.get(CAMPO_FECHA_HORA)
+    finally:
+        # No cerrar el archivo del llamador
+        texto.detach()
+
+
+def _fecha_hora_local(valor):
+    fecha_hora = datetime.fromisoformat(str(valor).strip())
+    if timezone.is_aware(fecha_hora):
+        fecha_hora = timezone.localtime(fecha_hora)
+    return fecha_hora
+
+
+# =========================================================
+#   PROGRESO (para reanudar)
+# =========================================================
+
+def ruta_progreso(ruta_archivo):
+    return f"{ruta_archivo}.progreso"
+
+
+# {"linea": última línea guardada, "reporte": tamaño del reporte de errores en
+# ese momento}. Al reanudar, el reporte se recorta a ese tamaño: las líneas con
+# error que se escribieron después se vuelven a leer y a reportar una sola vez.
+
+def _leer_estado(ruta):
+    try:
+        with open(ruta, encoding='utf-8') as f:
+            estado = json.load(f)
+        return {'linea': int(estado.get('linea', 0)), 'reporte': estado.get('reporte')}
+    except (OSError, ValueError, AttributeError):
+        return {'linea': 0, 'reporte': None}
+
+
+def leer_progreso(ruta):
+    """Última línea ya guardada según el archivo de progreso (0 si no hay)."""
+    return _leer_estado(ruta)['linea']
+
+
+def _guardar_progreso(ruta, linea, reporte=None):
+    estado = {'linea': linea}
+    if reporte is not None:
+        reporte.flush()
+        estado['reporte'] = reporte.tell()
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, ruta)  # atómico: nunca queda un progreso a medias
+
+
+# =========================================================
+#   IMPORTACIÓN
+# =========================================================
+
+class _Dia:
+    """Checadas de un trabajador en un día: la primera es la entrada, la última la salida."""
+    __slots__ = ('entrada', 'salida', 'primera_linea')
+
+    def __init__(self, hora, linea):
+        self.entrada = hora
+        self.salida = hora
+        self.primera_linea = linea
+
+    def agregar(self, hora):
+        self.entrada = min(self.entrada, hora)
+        self.salida = max(self.salida, hora)
+
+    def unir(self, otro):
+        self.agregar(otro.entrada)
+        self.agregar(otro.salida)
+        self.primera_linea = min(self.primera_linea, otro.primera_linea)
+
+
+def _guardar_lote(listos, resolutor, usuario, resultado):
+    """
+    Guarda los días completos en un solo INSERT ... ON CONFLICT.
+
+    Los registros que ya existen (capturados a mano o de una corrida
+    anterior) se combinan: se conserva la entrada más temprana y la salida
+    más tarde. Por eso volver a importar las mismas checadas no cambia nada
+    y se puede reanudar desde un punto anterior sin duplicar.
+    """
+    if not listos:
+        return
+
+    existentes = RegistroAsistencia.objects.filter(
+        id_trabajador_id__in={id_trabajador for id_trabajador, _ in listos},
+        fecha__in={fecha for _, fecha in listos},
+    ).values_list('id_trabajador_id', 'fecha', 'hora_entrada', 'hora_salida')
+
+    for id_trabajador, fecha, entrada, salida in existentes:
+        dia = listos.get((id_trabajador, fecha))
+        if dia is None:
+            continue
+        for hora in (entrada, salida):
+            if hora is not None:
+                dia.agregar(hora)
+
+    registros = []
+    for (id_trabajador, fecha), dia in listos.items():
+        salida = dia.salida if dia.salida > dia.entrada else None
+        registros.append(RegistroAsistencia(
+            id_trabajador_id=id_trabajador,
+            fecha=fecha,
+            hora_entrada=dia.entrada,
+            hora_salida=salida,
+            estatus=resolutor.estatus(id_trabajador, fecha, dia.entrada),
+            created_by=usuario,
+            updated_by=usuario,
+        ))
+
+    with transaction.atomic():
+        RegistroAsistencia.objects.bulk_create(
+            registros,
+            update_conflicts=True,
+            unique_fields=['id_trabajador', 'fecha'],
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+    resultado.registros += len(registros)
+
+
+def importar_checadas(archivo, formato='csv', reporte=None, progreso=None,
+                      usuario=None, lote=LOTE, al_guardar=None, ventana=0):
+    """
+    Importa checadas históricas y las convierte en RegistroAsistencia.
+
+    El archivo debe venir ordenado por fecha. Las checadas se leen una a
+    una y se agrupan por trabajador y día; un día se da por completo
+    cuando llega una checada posterior del mismo trabajador o cuando el
+    archivo avanza más de `ventana` días (así el día de alguien que dejó
+    de checar no queda abierto hasta el final). Los días completos se
+    guardan por lotes y su estatus se calcula con ResolutorJornadas, sin
+    consultas por registro.
+
+    Una checada que llega después de cerrado su día (archivo desordenado)
+    no se pierde: se combina con el registro ya guardado. Solo el
+    progreso para reanudar depende del orden.
+
+    Args:
+        archivo: archivo binario con las checadas.
+        formato (str): 'csv' o 'jsonl'.
+        reporte: archivo de texto opcional para las líneas con error.
+        progreso (str): ruta del archivo de progreso. Si existe, se omiten
+            las líneas ya guardadas (y el reporte se recorta a lo que tenía
+            entonces); se actualiza después de cada lote y se borra al
+            terminar.
+        usuario: User que queda en created_by/updated_by.
+        lote (int): registros por INSERT.
+        al_guardar: callable(resultado) opcional, llamado después de cada lote.
+        ventana (int): días que un día sigue abierto, esperando checadas
+            atrasadas, después de que el archivo pasa a una fecha posterior.
+
+    Returns:
+        ResultadoImportacion
+    """
+    inicio = time.monotonic()
+    resultado = ResultadoImportacion()
+    resolutor = ResolutorJornadas()
+    trabajadores = dict(Trabajador.objects.values_list('numero_empleado', 'id_trabajador'))
+    hoy = date.today()
+
+    estado = _leer_estado(progreso) if progreso else {'linea': 0, 'reporte': None}
+    desde = estado['linea']
+
+    escritor = None
+    if reporte is not None:
+        escritor = csv.writer(reporte)
+        if desde and estado['reporte'] is not None:
+            # Descartar los errores escritos después del último lote guardado
+            reporte.truncate(estado['reporte'])
+            reporte.seek(0, os.SEEK_END)
+        if not reporte.tell():  # al reanudar se continúa el mismo reporte
+            escritor.writerow(['linea', 'numero_empleado', 'error'])
+
+    def registrar_error(numero_linea, numero_empleado, error):
+        resultado.errores += 1
+        if escritor:
+            escritor.writerow([numero_linea, numero_empleado, error])
+
+    abiertos = {}  # {id_trabajador: (fecha, _Dia)} día en curso de cada trabajador
+    listos = {}    # {(id_trabajador, fecha): _Dia} días completos por guardar
+    ultima_linea = desde
+    fecha_actual = None
+
+    def cerrar(id_trabajador):
+        fecha, dia = abiertos.pop(id_trabajador)
+        clave = (id_trabajador, fecha)
+        if clave in listos:
+            listos[clave].unir(dia)
+        else:
+            listos[clave] = dia
+
+    def guardar():
+        _guardar_lote(listos, resolutor, usuario, resultado)
+        listos.clear()
+        if progreso:
+            # Todo lo anterior al día abierto más antiguo ya está guardado
+            pendiente = min((dia.primera_linea for _, dia in abiertos.values()), default=ultima_linea + 1)
+            _guardar_progreso(progreso, pendiente - 1, reporte)
+        resultado.segundos = time.monotonic() - inicio
+        if al_guardar:
+            al_guardar(resultado)
+
+    for numero_linea, numero_empleado, valor in leer_checadas(archivo, formato):
+        if numero_linea <= desde:
+            resultado.omitidas += 1
+            continue
+        ultima_linea = numero_linea
+        numero_empleado = numero_empleado.strip()
+
+        id_trabajador = trabajadores.get(numero_empleado)
+        if id_trabajador is None:
+            registrar_error(numero_linea, numero_empleado, "número de empleado no existe")
+            continue
+        try:
+            fecha_hora = _fecha_hora_local(valor)
+        except (TypeError, ValueError):
+            registrar_error(numero_linea, numero_empleado, f"fecha/hora no válida: {valor!r}")
+            continue
+        fecha = fecha_hora.date()
+        if fecha > hoy:
+            registrar_error(numero_linea, numero_empleado, "fecha futura")
+            continue
+
+        resultado.checadas += 1
+        hora = fecha_hora.time().replace(microsecond=0)
+
+        if fecha_actual is None or fecha > fecha_actual:
+            # El archivo avanzó: los días anteriores a la ventana ya no recibirán checadas
+            fecha_actual = fecha
+            limite = fecha - timedelta(days=ventana)
+            for id_abierto in [i for i, (dia_fecha, _) in abiertos.items() if dia_fecha < limite]:
+                cerrar(id_abierto)
+
+        actual = abiertos.get(id_trabajador)
+        if actual and actual[0] == fecha:
+            actual[1].agregar(hora)
+            continue
+        if actual:
+            cerrar(id_trabajador)
+        abiertos[id_trabajador] = (fecha, _Dia(hora, numero_linea))
+
+        if len(listos) >= lote:
+            guardar()
+
+    for id_trabajador in list(abiertos):
+        cerrar(id_trabajador)
+    guardar()
+
+    if progreso and os.path.exists(progreso):
+        os.remove(progreso)
+
+    if resultado.registros:
+        from apps.accounts.dashboard import invalidar_dashboard
+        invalidar_dashboard()
+
+    resultado.segundos = time.monotonic() - inicio
+    return resultado
@@ -0,0 +1,85 @@
+# apps/asistencias/management/commands/importar_checadas.py
+
+import os
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.asistencias.importacion import LOTE, importar_checadas, leer_progreso, ruta_progreso
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa checadas históricas (numero_empleado, fecha_hora) desde un CSV o "
+        "JSONL ordenado por fecha y las convierte en registros de asistencia por "
+        "trabajador y día."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo de checadas (UTF-8)')
+        parser.add_argument(
+            '--formato', choices=['csv', 'jsonl'],
+            help='Formato del archivo (por defecto según la extensión)'
+        )
+        parser.add_argument(
+            '--errores', default='errores_checadas.csv',
+            help='Ruta del reporte de líneas con error (por defecto errores_checadas.csv)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=LOTE,
+            help=f'Registros por inserción (por defecto {LOTE})'
+        )
+        parser.add_argument(
+            '--ventana', type=int, default=0,
+            help='Días que se esperan checadas atrasadas de un día ya pasado (por defecto 0)'
+        )
+        parser.add_argument(
+            '--reanudar', action='store_true',
+            help='Continuar desde el último lote guardado de una corrida interrumpida'
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Username que queda como creador/modificador de los registros'
+        )
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+            if usuario is None:
+                raise CommandError(f"No existe el usuario '{options['usuario']}'")
+
+        ruta = options['archivo']
+        formato = options['formato']
+        if formato is None:
+            formato = 'jsonl' if ruta.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+        progreso = ruta_progreso(ruta)
+        if options['reanudar']:
+            linea = leer_progreso(progreso)
+            if linea:
+                self.stdout.write(f"Reanudando después de la línea {linea}")
+        elif os.path.exists(progreso):
+            # Corrida nueva: descartar el progreso de una interrumpida
+            os.remove(progreso)
+
+        try:
+            archivo = open(ruta, 'rb')
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+
+        def al_guardar(resultado):
+            self.stdout.write(f"  {resultado}")
+
+        # En una reanudación el reporte se continúa, no se sobrescribe
+        modo = 'a' if options['reanudar'] else 'w'
+        with archivo, open(options['errores'], modo, encoding='utf-8', newline='') as reporte:
+            resultado = importar_checadas(
+                archivo, formato=formato, reporte=reporte, progreso=progreso,
+                usuario=usuario, lote=max(1, options['lote']), al_guardar=al_guardar,
+                ventana=max(0, options['ventana']),
+            )
+
+        self.stdout.write(f"Importación terminada: {resultado}")
+        if resultado.errores:
+            self.stdout.write(f"Líneas con error en {options['errores']}")
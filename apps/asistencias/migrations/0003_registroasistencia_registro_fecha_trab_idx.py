@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencias', '0002_alter_registroasistencia_estatus'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registroasistencia',
+            index=models.Index(fields=['fecha', 'id_trabajador'], name='registro_fecha_trab_idx'),
+        ),
+    ]
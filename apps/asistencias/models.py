@@ -5,6 +5,8 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from datetime import date
 
+from apps.accounts.scope import ScopeQuerySet
+
 
 # =========================================================
 #   MODELO PRINCIPAL: REGISTRO DE ASISTENCIA
@@ -96,6 +98,8 @@ class RegistroAsistencia(models.Model):
         verbose_name="Modificado por"
     )
 
+    objects = ScopeQuerySet.as_manager()
+
     # -----------------------------
     #   CONFIGURACIÓN META
     # -----------------------------
@@ -106,6 +110,11 @@ class RegistroAsistencia(models.Model):
         ordering = ['-fecha', 'id_trabajador']
         unique_together = [['id_trabajador', 'fecha']]
         # Garantiza: solo un registro por trabajador por día
+        # (y sirve de índice para el alcance por trabajador)
+        indexes = [
+            # Alcance de jefe/admin: registros de un día para los trabajadores de la unidad
+            models.Index(fields=['fecha', 'id_trabajador'], name='registro_fecha_trab_idx'),
+        ]
 
     # -----------------------------
     #   REPRESENTACIÓN
@@ -1,17 +1,20 @@
 # apps/asistencias/utils.py
 
 from datetime import datetime, date, timedelta
-from django.db.models import Q
 
 # Modelos externos
+from apps.jornadas_laborales.calendario import es_inhabil
 from apps.jornadas_laborales.models import (
     JornadaLaboral,
-    CalendarioLaboral,
     TrabajadorJornada,
-    JornadaDias
+    bit_dia
 )
 
 
+# Minutos después de la hora de entrada que todavía cuentan como asistencia
+TOLERANCIA_MINUTOS = 10
+
+
 # =========================================================
 #   JORNADA DEL TRABAJADOR
 # =========================================================
@@ -28,16 +31,14 @@ def obtener_jornada_vigente(trabajador, fecha):
         JornadaLaboral | None: Jornada si existe, de lo contrario None.
     
     Tips de rendimiento:
+        - vigentes_en() usa el índice GiST de la vigencia en PostgreSQL.
         - select_related reduce las consultas al traer la jornada junto a la asignación.
         - first() es más rápido cuando solo necesitamos un resultado.
     """
     try:
         asignacion = (
-            TrabajadorJornada.objects.filter(
-                id_trabajador=trabajador,
-                fecha_inicio__lte=fecha
-            )
-            .filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha))
+            TrabajadorJornada.objects.filter(id_trabajador=trabajador)
+            .vigentes_en(fecha)
             .select_related('id_jornada')
             .first()
         )
@@ -62,18 +63,13 @@ def es_dia_inhabil(fecha):
 
     Returns:
         bool: True si es inhábil, False si no.
-    
+
     Optimización:
-        - first() detiene la búsqueda en cuanto encuentra un registro.
+        - Consulta el índice en memoria de días inhábiles por año
+          (jornadas_laborales.calendario): sin consultas después de la
+          primera del año.
     """
-    try:
-        return CalendarioLaboral.objects.filter(
-            fecha=fecha,
-            es_inhabil=True
-        ).exists()
-
-    except Exception:
-        return False
+    return es_inhabil(fecha)
 
 
 # =========================================================
@@ -101,14 +97,8 @@ def trabajador_debe_asistir(trabajador, fecha):
     if not jornada:
         return (False, "Trabajador sin jornada asignada")
 
-    # 3. Validar si ese día labora
-    numero_dia = fecha.isoweekday()  # 1 = Lunes ... 7 = Domingo
-    trabaja_este_dia = JornadaDias.objects.filter(
-        id_jornada=jornada,
-        numero_dia=numero_dia
-    ).exists()
-
-    if not trabaja_este_dia:
+    # 3. Validar si ese día labora (bit de dias_mask, sin consultar JornadaDias)
+    if not jornada.labora(fecha):
         return (False, f"No labora el día {fecha.strftime('%A')}")
 
     return (True, "Debe asistir")
@@ -144,9 +134,11 @@ def calcular_estatus_asistencia(trabajador, fecha, hora_entrada=None, hora_salid
     if not jornada:
         return 'ASI'
 
-    hora_esperada = jornada.hora_entrada
-    TOLERANCIA_MINUTOS = 10
+    return estatus_por_hora(fecha, jornada.hora_entrada, hora_entrada)
+
 
+def estatus_por_hora(fecha, hora_esperada, hora_entrada):
+    """'ASI' si la entrada cae dentro de la tolerancia, 'RET' si no."""
     hora_esperada_dt = datetime.combine(fecha, hora_esperada)
     hora_entrada_dt = datetime.combine(fecha, hora_entrada)
 
@@ -155,6 +147,87 @@ def calcular_estatus_asistencia(trabajador, fecha, hora_entrada=None, hora_salid
     return 'ASI' if hora_entrada_dt <= hora_limite else 'RET'
 
 
+class ResolutorJornadas:
+    """
+    Versión en memoria de calcular_estatus_asistencia() para procesos masivos.
+
+    Carga una sola vez (dos consultas) las asignaciones de jornada y los
+    horarios con su máscara de días; los días inhábiles salen del índice
+    en memoria del calendario. Después estatus() no consulta la base de
+    datos sin importar cuántos registros se calculen. Sigue las mismas
+    reglas que calcular_estatus_asistencia().
+    """
+
+    def __init__(self):
+        # Asignaciones por trabajador, en el mismo orden que usa
+        # obtener_jornada_vigente() (gana la primera que cubra la fecha)
+        self.asignaciones = {}
+        for id_trabajador, inicio, fin, id_jornada in TrabajadorJornada.objects.values_list(
+            'id_trabajador_id', 'fecha_inicio', 'fecha_fin', 'id_jornada_id'
+        ):
+            self.asignaciones.setdefault(id_trabajador, []).append((inicio, fin, id_jornada))
+
+        self.horarios = {}
+        self.dias_mask = {}
+        for id_jornada, hora_entrada, dias_mask in JornadaLaboral.objects.values_list(
+            'id_jornada', 'hora_entrada', 'dias_mask'
+        ):
+            self.horarios[id_jornada] = hora_entrada
+            self.dias_mask[id_jornada] = dias_mask
+
+    def jornada_vigente(self, id_trabajador, fecha):
+        """id_jornada vigente en `fecha`, o None."""
+        for inicio, fin, id_jornada in self.asignaciones.get(id_trabajador, ()):
+            if inicio <= fecha and (fin is None or fin >= fecha):
+                return id_jornada
+        return None
+
+    def estatus(self, id_trabajador, fecha, hora_entrada=None):
+        id_jornada = None
+        if not es_inhabil(fecha):
+            id_jornada = self.jornada_vigente(id_trabajador, fecha)
+
+        debe_asistir = (
+            id_jornada is not None and
+            bool(self.dias_mask[id_jornada] & bit_dia(fecha.isoweekday()))
+        )
+        if not debe_asistir:
+            return 'ASI' if hora_entrada else 'JUS'
+        if not hora_entrada:
+            return 'FAL'
+        return estatus_por_hora(fecha, self.horarios[id_jornada], hora_entrada)
+
+
+def recalcular_estatus(fechas, lote=2000):
+    """
+    Recalcula con ResolutorJornadas el estatus de todas las asistencias de
+    `fechas` (p. ej. después de registrar días inhábiles) y guarda solo los
+    que cambiaron, en un bulk_update.
+
+    Returns:
+        int: registros actualizados.
+    """
+    from .models import RegistroAsistencia
+
+    resolutor = ResolutorJornadas()
+    cambiados = []
+    registros = RegistroAsistencia.objects.filter(fecha__in=fechas).only(
+        'id_registro', 'id_trabajador_id', 'fecha', 'hora_entrada', 'estatus'
+    )
+    for registro in registros.iterator(chunk_size=lote):
+        estatus = resolutor.estatus(registro.id_trabajador_id, registro.fecha, registro.hora_entrada)
+        if estatus != registro.estatus:
+            registro.estatus = estatus
+            cambiados.append(registro)
+
+    RegistroAsistencia.objects.bulk_update(cambiados, ['estatus'], batch_size=lote)
+
+    if cambiados:
+        from apps.accounts.dashboard import invalidar_dashboard
+        invalidar_dashboard()
+    return len(cambiados)
+
+
 # =========================================================
 #   MINUTOS DE RETARDO
 # =========================================================
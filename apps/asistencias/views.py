@@ -7,7 +7,6 @@ from django.views import View
 from django.views.generic import ListView, DetailView, CreateView, FormView
 from django.contrib import messages
 from django.urls import reverse_lazy
-from django.db.models import Q
 from django.utils.decorators import method_decorator
 
 from .models import RegistroAsistencia
@@ -23,7 +22,7 @@ from .utils import (
 )
 
 from apps.trabajadores.models import Trabajador
-from apps.unidades.models import UnidadAdministrativa
+from apps.accounts import catalogos
 from apps.accounts.decorators import rol_requerido
 
 
@@ -41,16 +40,12 @@ class AsistenciaListView(ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = RegistroAsistencia.objects.select_related(
-            'id_trabajador', 'id_trabajador__id_unidad'
-        ).order_by('-fecha', 'id_trabajador')
-
-        user = self.request.user
+        scope = self.request.scope
 
         # 🔹 Si es jefe → filtrar solo su unidad
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            queryset = queryset.filter(id_trabajador__id_unidad=unidad)
+        queryset = RegistroAsistencia.objects.visible_to(scope).select_related(
+            'id_trabajador', 'id_trabajador__id_unidad'
+        ).order_by('-fecha', 'id_trabajador')
 
         # ----- Filtros -----
         unidad_id = self.request.GET.get('unidad')
@@ -60,7 +55,7 @@ class AsistenciaListView(ListView):
         trabajador_id = self.request.GET.get('trabajador')
 
         # Filtro por unidad (solo admin puede filtrar por unidad)
-        if unidad_id and user.perfil.es_admin():
+        if unidad_id and scope.es_admin():
             queryset = queryset.filter(id_trabajador__id_unidad_id=unidad_id)
         
         if fecha_inicio:
@@ -81,42 +76,29 @@ class AsistenciaListView(ListView):
         context = super().get_context_data(**kwargs)
 
         hoy = date.today()
-        user = self.request.user
+        scope = self.request.scope
 
         context['filtro_form'] = FiltroAsistenciaForm(self.request.GET or None)
 
         context['fecha_actual'] = hoy
         
-        # Filtrar contadores por unidad si es jefe
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            unidad = user.perfil.id_trabajador.id_unidad
-            context['asistencias_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='ASI', id_trabajador__id_unidad=unidad).count()
-            context['retardos_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='RET', id_trabajador__id_unidad=unidad).count()
-            context['faltas_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='FAL', id_trabajador__id_unidad=unidad).count()
-        else:
-            # Admin ve estadísticas globales
-            context['asistencias_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='ASI').count()
-            context['retardos_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='RET').count()
-            context['faltas_hoy'] = RegistroAsistencia.objects.filter(fecha=hoy, estatus='FAL').count()
+        # Contadores del día: globales para admin, de su unidad para jefe
+        registros_hoy = RegistroAsistencia.objects.visible_to(scope).filter(fecha=hoy)
+        context['asistencias_hoy'] = registros_hoy.filter(estatus='ASI').count()
+        context['retardos_hoy'] = registros_hoy.filter(estatus='RET').count()
+        context['faltas_hoy'] = registros_hoy.filter(estatus='FAL').count()
 
         form = FiltroAsistenciaForm(self.request.GET or None)
         
-        # Agregar unidades y trabajadores para el filtro dinámico (solo admin)
-        if user.perfil.es_admin():
-            context['unidades'] = UnidadAdministrativa.objects.all().order_by('nombre')
-            context['todos_trabajadores'] = Trabajador.objects.filter(activo=True).select_related('id_unidad').order_by('nombre')
-        elif user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            form.fields['trabajador'].queryset = Trabajador.objects.filter(
-                activo=True,
-                id_unidad=unidad
-            )
-            context['trabajadores'] = Trabajador.objects.filter(activo=True, id_unidad=unidad).order_by('nombre')
-        elif user.perfil.es_trabajador():
+        # Unidades para el filtro (solo admin); el trabajador se busca con el
+        # autocompletado, que ya aplica el alcance del usuario
+        if scope.es_admin():
+            context['unidades'] = catalogos.unidades()
+        elif scope.es_jefe():
+            form.fields['trabajador'].queryset = Trabajador.objects.visible_to(scope).filter(activo=True)
+        elif scope.es_trabajador():
             # Solo él mismo
-            form.fields['trabajador'].queryset = Trabajador.objects.filter(
-                pk=user.perfil.id_trabajador.id
-            )
+            form.fields['trabajador'].queryset = Trabajador.objects.visible_to(scope)
 
         context['filtro_form'] = form
 
@@ -137,45 +119,21 @@ class RegistroRapidoView(FormView):
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
         
-        user = self.request.user
+        scope = self.request.scope
         hoy = date.today()
         
-        # 🔹 Si es jefe, filtrar trabajadores solo de su unidad
-        if user.perfil.es_jefe():
-            trabajador_jefe = user.perfil.id_trabajador
-            if trabajador_jefe and trabajador_jefe.id_unidad:
-                trabajadores_base = Trabajador.objects.filter(
-                    id_unidad=trabajador_jefe.id_unidad,
-                    activo=True
-                )
-        else:
-            # Admin ve todos los trabajadores activos
-            trabajadores_base = Trabajador.objects.filter(activo=True)
-        
-        # 🔹 Filtrar solo trabajadores que tienen jornadas asignadas
-        from apps.jornadas_laborales.models import TrabajadorJornada
-        trabajadores_con_jornada = TrabajadorJornada.objects.filter(
-            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-        ).values_list('id_trabajador', flat=True)
-        
-        trabajadores_base = trabajadores_base.filter(id_trabajador__in=trabajadores_con_jornada)
-        
-        # Obtener trabajadores que ya completaron su asistencia hoy
-        trabajadores_completos_hoy = RegistroAsistencia.objects.filter(
-            fecha=hoy,
-            hora_entrada__isnull=False,
-            hora_salida__isnull=False
-        ).values_list('id_trabajador', flat=True)
+        # 🔹 Admin ve todos los trabajadores activos, jefe solo los de su unidad
+        trabajadores_base = Trabajador.objects.visible_to(scope).filter(activo=True)
         
-        # Excluir trabajadores que ya completaron su asistencia
-        trabajadores_disponibles = trabajadores_base.exclude(
-            id_trabajador__in=trabajadores_completos_hoy
-        ).order_by('apellido_paterno', 'apellido_materno', 'nombre')
+        # 🔹 Solo trabajadores con jornada vigente que no han completado su asistencia hoy
+        trabajadores_disponibles = trabajadores_base.pendientes_de_registro(hoy).order_by(
+            'apellido_paterno', 'apellido_materno', 'nombre'
+        )
         
         form.fields['numero_empleado'].queryset = trabajadores_disponibles
         
         # Guardar flag si todos asistieron
-        self.todos_asistieron = not trabajadores_disponibles.exists() and trabajadores_base.exists()
+        self.todos_asistieron = not trabajadores_disponibles.exists() and trabajadores_base.con_jornada_vigente(hoy).exists()
         
         return form
 
@@ -184,7 +142,7 @@ class RegistroRapidoView(FormView):
         hoy = date.today()
         hora_actual = datetime.now().time()
 
-        user = self.request.user
+        scope = self.request.scope
         
         # 🔹 Validar si es día inhábil
         from .utils import es_dia_inhabil
@@ -193,9 +151,9 @@ class RegistroRapidoView(FormView):
             return redirect(self.success_url)
 
         # 🔹 Jefe no puede registrar asistencia de trabajador de otra unidad
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            if trabajador.id_unidad != unidad:
+        if scope.es_jefe():
+            unidad = scope.id_unidad
+            if trabajador.id_unidad_id != unidad:
                 messages.error(self.request, "No puedes registrar asistencia de otra unidad.")
                 return redirect(self.success_url)
 
@@ -243,15 +201,8 @@ class RegistroRapidoView(FormView):
         context['todos_asistieron'] = getattr(self, 'todos_asistieron', False)
 
         # 🔹 Filtrar últimos registros según rol
-        user = self.request.user
-        ultimos_registros = RegistroAsistencia.objects.filter(fecha=hoy)
-        
-        if user.perfil.es_jefe():
-            trabajador_jefe = user.perfil.id_trabajador
-            if trabajador_jefe and trabajador_jefe.id_unidad:
-                ultimos_registros = ultimos_registros.filter(
-                    id_trabajador__id_unidad=trabajador_jefe.id_unidad
-                )
+        scope = self.request.scope
+        ultimos_registros = RegistroAsistencia.objects.visible_to(scope).filter(fecha=hoy)
         
         context['ultimos_registros'] = ultimos_registros.select_related(
             'id_trabajador'
@@ -274,37 +225,15 @@ class RegistroAsistenciaCreateView(CreateView):
 
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
-        user = self.request.user
+        scope = self.request.scope
         hoy = date.today()
 
         # Base queryset de trabajadores activos
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            trabajadores_base = Trabajador.objects.filter(id_unidad=unidad, activo=True)
-        else:
-            trabajadores_base = Trabajador.objects.filter(activo=True)
-        
-        # 🔹 Filtrar solo trabajadores que tienen jornadas asignadas
-        from apps.jornadas_laborales.models import TrabajadorJornada
-        from django.db.models import Q
-        trabajadores_con_jornada = TrabajadorJornada.objects.filter(
-            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-        ).values_list('id_trabajador', flat=True)
+        trabajadores_base = Trabajador.objects.visible_to(scope).filter(activo=True)
         
-        trabajadores_base = trabajadores_base.filter(id_trabajador__in=trabajadores_con_jornada)
-
-        # Obtener trabajadores que ya completaron su asistencia hoy
-        # (tienen entrada Y salida registradas)
-        trabajadores_completos_hoy = RegistroAsistencia.objects.filter(
-            fecha=hoy,
-            hora_entrada__isnull=False,
-            hora_salida__isnull=False
-        ).values_list('id_trabajador', flat=True)
-
-        # Excluir trabajadores que ya completaron su asistencia
-        trabajadores_disponibles = trabajadores_base.exclude(
-            id_trabajador__in=trabajadores_completos_hoy
-        )
+        # 🔹 Solo trabajadores con jornada vigente que no han completado
+        # (entrada Y salida) su asistencia hoy
+        trabajadores_disponibles = trabajadores_base.pendientes_de_registro(hoy)
 
         form.fields['id_trabajador'].queryset = trabajadores_disponibles
 
@@ -338,22 +267,11 @@ class RegistroAsistenciaCreateView(CreateView):
         context['es_dia_inhabil'] = es_dia_inhabil(hoy)
         
         # Obtener trabajadores con registro parcial (solo entrada)
-        user = self.request.user
-        
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            registros_parciales = RegistroAsistencia.objects.filter(
-                fecha=hoy,
-                hora_entrada__isnull=False,
-                hora_salida__isnull=True,
-                id_trabajador__id_unidad=unidad
-            ).select_related('id_trabajador')
-        else:
-            registros_parciales = RegistroAsistencia.objects.filter(
-                fecha=hoy,
-                hora_entrada__isnull=False,
-                hora_salida__isnull=True
-            ).select_related('id_trabajador')
+        registros_parciales = RegistroAsistencia.objects.visible_to(self.request.scope).filter(
+            fecha=hoy,
+            hora_entrada__isnull=False,
+            hora_salida__isnull=True
+        ).select_related('id_trabajador')
         
         context['registros_parciales'] = registros_parciales
         context['fecha_actual'] = hoy
@@ -414,9 +332,9 @@ class AsistenciaDetailView(DetailView):
         registro = self.get_object()
 
         # 🔹 Jefe solo ve registros de su unidad
-        if request.user.perfil.es_jefe():
-            unidad = request.user.perfil.id_trabajador.id_unidad
-            if registro.id_trabajador.id_unidad != unidad:
+        if request.scope.es_jefe():
+            unidad = request.scope.id_unidad
+            if registro.id_trabajador.id_unidad_id != unidad:
                 from django.http import Http404
                 raise Http404("No puedes acceder a esta asistencia.")
 
@@ -448,7 +366,7 @@ class ResumenTrabajadorView(DetailView):
 
     def dispatch(self, request, *args, **kwargs):
         numero_empleado = kwargs.get('numero_empleado')
-        user = request.user
+        scope = request.scope
 
         try:
             trabajador = Trabajador.objects.get(numero_empleado=numero_empleado)
@@ -457,15 +375,15 @@ class ResumenTrabajadorView(DetailView):
             raise Http404("Trabajador no encontrado.")
 
         # Trabajador: solo puede ver su propio resumen
-        if user.perfil.rol == 'trabajador':
-            if user.perfil.id_trabajador.numero_empleado != numero_empleado:
+        if scope.rol == 'trabajador':
+            if trabajador.pk != scope.id_trabajador:
                 from django.http import HttpResponseForbidden
                 return HttpResponseForbidden("No puedes ver a otro trabajador.")
 
         # Jefe: solo trabajadores de su unidad
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-            if trabajador.id_unidad != unidad:
+        if scope.es_jefe():
+            unidad = scope.id_unidad
+            if trabajador.id_unidad_id != unidad:
                 from django.http import Http404
                 raise Http404("No tienes acceso a este trabajador.")
 
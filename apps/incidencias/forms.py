@@ -2,7 +2,11 @@
 
 from django import forms
 from django.core.exceptions import ValidationError
+from django.db.models import Q
+from apps.accounts import catalogos
+from apps.accounts.scope import ANONIMO
 from apps.trabajadores.models import Trabajador
+from apps.trabajadores.widgets import TrabajadorAutocompleteWidget, etiqueta_trabajador
 from .models import Incidencia, TipoIncidencia
 # from apps.workers.models import Trabajador   # ← Aún no existe, lo comentamos
 
@@ -23,9 +27,7 @@ class IncidenciaForm(forms.ModelForm):
             'observaciones'
         ]
         widgets = {
-            'id_trabajador': forms.Select(attrs={
-                'class': 'form-control'
-            }),
+            'id_trabajador': TrabajadorAutocompleteWidget(),
             'id_tipo_incidencia': forms.Select(attrs={
                 'class': 'form-control'
             }),
@@ -52,14 +54,15 @@ class IncidenciaForm(forms.ModelForm):
         }
 
     def __init__(self, *args, **kwargs):
-        self.user = kwargs.pop('user', None)
+        self.scope = kwargs.pop('scope', ANONIMO)
         from_mis_incidencias = kwargs.pop('from_mis_incidencias', False)
         super().__init__(*args, **kwargs)
 
-        perfil = getattr(self.user, 'perfil', None)
+        scope = self.scope
 
-        # TIPOS DE INCIDENCIA ACTIVOS
+        # TIPOS DE INCIDENCIA ACTIVOS (la plantilla dibuja las opciones del catálogo)
         self.fields['id_tipo_incidencia'].queryset = TipoIncidencia.objects.filter(activo=True)
+        self.tipos_incidencia = catalogos.tipos_incidencia()
 
         # ===========================================================
         #  SECCIÓN DE TRABAJADORES
@@ -67,40 +70,29 @@ class IncidenciaForm(forms.ModelForm):
         
         queryset_trab = Trabajador.objects.filter(activo=True)
         
-        if perfil:
+        if from_mis_incidencias and scope.tiene_trabajador:
             # Si viene desde mis_incidencias, cualquier usuario con trabajador asociado
             # debe tener su trabajador pre-seleccionado y bloqueado
-            if from_mis_incidencias and perfil.id_trabajador:
-                self.fields['id_trabajador'].queryset = queryset_trab.filter(pk=perfil.id_trabajador.pk)
-                self.fields['id_trabajador'].initial = perfil.id_trabajador
-            
-            # Si NO viene desde mis_incidencias, aplicar reglas según el rol
-            elif perfil.es_admin():
-                # Admin puede seleccionar cualquier trabajador
-                self.fields['id_trabajador'].queryset = queryset_trab
-        
-            elif perfil.es_jefe():
-                # Jefe puede seleccionar trabajadores de su unidad
-                if perfil.id_trabajador and perfil.id_trabajador.id_unidad:
-                    unidad = perfil.id_trabajador.id_unidad
-                    self.fields['id_trabajador'].queryset = queryset_trab.filter(id_unidad=unidad)
-                else:
-                    self.fields['id_trabajador'].queryset = queryset_trab.none()
-        
-            elif perfil.es_trabajador():
-                # Trabajador solo puede crear incidencias para sí mismo
-                if perfil.id_trabajador:
-                    self.fields['id_trabajador'].queryset = queryset_trab.filter(pk=perfil.id_trabajador.pk)
-                    self.fields['id_trabajador'].initial = perfil.id_trabajador
-                    self.fields['id_trabajador'].widget = forms.HiddenInput()
-                else:
-                    self.fields['id_trabajador'].queryset = queryset_trab.none()
+            self.fields['id_trabajador'].queryset = queryset_trab.filter(pk=scope.id_trabajador)
+            self.fields['id_trabajador'].initial = scope.id_trabajador
+            self.fields['id_trabajador'].widget = forms.HiddenInput()
+        else:
+            # Admin: cualquier trabajador / Jefe: su unidad / Trabajador: solo él mismo
+            self.fields['id_trabajador'].queryset = queryset_trab.visible_to(scope)
+
+            if scope.es_trabajador() and scope.tiene_trabajador:
+                self.fields['id_trabajador'].initial = scope.id_trabajador
+                self.fields['id_trabajador'].widget = forms.HiddenInput()
 
 
         # Validación dinámica de fechas
         self.fields['fecha_inicio'].required = True
         self.fields['fecha_fin'].required = True
 
+    def etiqueta_trabajador_fijo(self):
+        """Nombre del trabajador cuando el campo no se puede cambiar (oculto)."""
+        return etiqueta_trabajador(self['id_trabajador'].value())
+
     def clean(self):
         cleaned_data = super().clean()
         fecha_inicio = cleaned_data.get('fecha_inicio')
@@ -112,6 +104,106 @@ class IncidenciaForm(forms.ModelForm):
         return cleaned_data
 
 
+class IncidenciaMasivaForm(forms.Form):
+    """
+    Formulario para registrar la misma incidencia a un grupo de trabajadores
+    (una unidad completa o una selección de trabajadores).
+    """
+    unidad = forms.ModelChoiceField(
+        queryset=None,
+        required=False,
+        empty_label='-- Sin unidad --',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Unidad Administrativa'
+    )
+
+    trabajadores = forms.ModelMultipleChoiceField(
+        queryset=Trabajador.objects.none(),
+        required=False,
+        widget=forms.SelectMultiple(attrs={'class': 'form-control', 'size': 10}),
+        label='Trabajadores'
+    )
+
+    id_tipo_incidencia = forms.ModelChoiceField(
+        queryset=TipoIncidencia.objects.filter(activo=True),
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        label='Tipo de Incidencia'
+    )
+
+    fecha_inicio = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label='Fecha de Inicio'
+    )
+
+    fecha_fin = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+        label='Fecha de Fin'
+    )
+
+    observaciones = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 3,
+            'placeholder': 'Ingresa observaciones adicionales (opcional)'
+        }),
+        label='Observaciones'
+    )
+
+    def __init__(self, *args, **kwargs):
+        self.scope = kwargs.pop('scope', ANONIMO)
+        super().__init__(*args, **kwargs)
+
+        from apps.unidades.models import UnidadAdministrativa
+
+        scope = self.scope
+        queryset_trab = Trabajador.objects.filter(activo=True)
+
+        if scope.es_admin():
+            self.fields['unidad'].queryset = UnidadAdministrativa.objects.all()
+            self.fields['trabajadores'].queryset = queryset_trab
+        elif scope.es_jefe() and scope.tiene_unidad:
+            # Jefe: solo su unidad
+            self.fields['unidad'].queryset = UnidadAdministrativa.objects.filter(pk=scope.id_unidad)
+            self.fields['trabajadores'].queryset = queryset_trab.visible_to(scope)
+        else:
+            self.fields['unidad'].queryset = UnidadAdministrativa.objects.none()
+            self.fields['trabajadores'].queryset = queryset_trab.none()
+
+        # Opciones que dibuja la plantilla, desde los catálogos cacheados
+        self.unidades = catalogos.unidades_visibles(scope)
+        self.tipos_incidencia = catalogos.tipos_incidencia()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        fecha_inicio = cleaned_data.get('fecha_inicio')
+        fecha_fin = cleaned_data.get('fecha_fin')
+
+        if fecha_inicio and fecha_fin and fecha_fin < fecha_inicio:
+            raise ValidationError('La fecha de fin no puede ser anterior a la fecha de inicio.')
+
+        if not cleaned_data.get('unidad') and not cleaned_data.get('trabajadores'):
+            raise ValidationError('Selecciona una unidad o al menos un trabajador.')
+
+        return cleaned_data
+
+    def obtener_trabajadores(self):
+        """
+        Queryset con los trabajadores destino: los de la unidad elegida
+        más los seleccionados individualmente, siempre dentro del alcance del usuario.
+        """
+        unidad = self.cleaned_data.get('unidad')
+        seleccionados = self.cleaned_data.get('trabajadores')
+
+        filtro = Q()
+        if unidad:
+            filtro |= Q(id_unidad=unidad)
+        if seleccionados:
+            filtro |= Q(pk__in=[t.pk for t in seleccionados])
+
+        return self.fields['trabajadores'].queryset.filter(filtro)
+
+
 class AutorizarIncidenciaForm(forms.Form):
     """
     Formulario para autorizar o rechazar una incidencia.
@@ -160,8 +252,11 @@ class FiltroIncidenciaForm(forms.Form):
     trabajador = forms.ModelChoiceField(
         queryset=Trabajador.objects.filter(activo=True),
         required=False,
-        empty_label='Todos los trabajadores',
-        widget=forms.Select(attrs={'class': 'form-control'}),
+        widget=TrabajadorAutocompleteWidget(
+            attrs={'id': 'filtro-trabajador'},
+            unidad_selector='#filtro-unidad',
+            placeholder='Todos los trabajadores'
+        ),
         label='Trabajador'
     )
 
@@ -200,6 +295,7 @@ class FiltroIncidenciaForm(forms.Form):
         else:
             from apps.unidades.models import UnidadAdministrativa
             self.fields['unidad'].queryset = UnidadAdministrativa.objects.all()
+        self.tipos_incidencia = catalogos.tipos_incidencia()
 
 
 class TipoIncidenciaForm(forms.ModelForm):
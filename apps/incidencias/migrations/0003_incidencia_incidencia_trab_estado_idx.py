@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidencias', '0002_alter_incidencia_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incidencia',
+            index=models.Index(fields=['id_trabajador', 'estado', 'fecha_inicio'], name='incidencia_trab_estado_idx'),
+        ),
+    ]
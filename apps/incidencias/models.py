@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from apps.accounts.scope import ScopeQuerySet
+
 
 # ============================================================
 #   MODELO: TipoIncidencia
@@ -113,11 +115,17 @@ class Incidencia(models.Model):
         related_name="incidencias_modificadas"
     )
 
+    objects = ScopeQuerySet.as_manager()
+
     class Meta:
         db_table = "incidencia"
         verbose_name = "Incidencia"
         verbose_name_plural = "Incidencias"
         ordering = ["-fecha_inicio", "-created_at"]
+        indexes = [
+            # Alcance por trabajador + filtro por estado / periodo
+            models.Index(fields=["id_trabajador", "estado", "fecha_inicio"], name="incidencia_trab_estado_idx"),
+        ]
 
     def __str__(self):
         return f"{self.id_trabajador.nombre_completo} - {self.id_tipo_incidencia.descripcion}"
@@ -11,6 +11,7 @@ urlpatterns = [
     path('mis-incidencias/', views.mis_incidencias, name='mis_incidencias'),
     # path('autorizar/', views.autorizar_incidencias, name='autorizar_incidencias'),  # Eliminada - jefes usan lista_incidencias
     path('crear/', views.crear_incidencia, name='crear_incidencia'),
+    path('crear-grupo/', views.crear_incidencias_grupo, name='crear_incidencias_grupo'),
     path('tipos/', views.crear_tipo_incidencia, name='crear_tipo_incidencia'),
     path('tipos/<int:pk>/editar/', views.editar_tipo_incidencia, name='editar_tipo_incidencia'),
     # Rutas basadas en ID
@@ -0,0 +1,99 @@
+# apps/incidencias/utils.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Incidencia
+
+
+# =========================================================
+#   CREACIÓN MASIVA DE INCIDENCIAS
+# =========================================================
+
+def crear_incidencias_masivas(trabajadores, tipo_incidencia, fecha_inicio, fecha_fin,
+                              usuario, observaciones=""):
+    """
+    Crea la misma incidencia para un grupo de trabajadores en una sola
+    transacción.
+
+    Args:
+        trabajadores (QuerySet[Trabajador]): Trabajadores destino (ya filtrados por alcance)
+        tipo_incidencia (TipoIncidencia)
+        fecha_inicio (date)
+        fecha_fin (date)
+        usuario (User): Usuario que registra
+        observaciones (str)
+
+    Returns:
+        dict con:
+            - 'creadas': lista de Incidencia insertadas
+            - 'conflictos': lista de dicts {trabajador, fecha_inicio, fecha_fin}
+              con la incidencia existente que se traslapa
+
+    Optimización:
+        - Un solo query detecta los traslapes de todo el grupo.
+        - bulk_create inserta todas las incidencias sin conflicto en un INSERT.
+        - select_for_update bloquea a los trabajadores para que dos altas
+          simultáneas no generen incidencias traslapadas.
+        - Al confirmarse se invalida el dashboard solo de las unidades y
+          trabajadores afectados.
+    """
+    with transaction.atomic():
+        trabajadores = list(trabajadores.select_for_update())
+        ids = [t.pk for t in trabajadores]
+
+        # Traslapes: inicio_existente <= fin_nuevo AND fin_existente >= inicio_nuevo
+        traslapes = Incidencia.objects.filter(
+            id_trabajador_id__in=ids,
+            estado__in=["pendiente", "autorizada"],
+            fecha_inicio__lte=fecha_fin,
+            fecha_fin__gte=fecha_inicio,
+        ).order_by('fecha_inicio').values_list('id_trabajador_id', 'fecha_inicio', 'fecha_fin')
+
+        periodo_existente = {}
+        for id_trabajador, inicio, fin in traslapes:
+            periodo_existente.setdefault(id_trabajador, (inicio, fin))
+
+        # Si el tipo no requiere autorización, se autorizan automáticamente
+        autorizar = not tipo_incidencia.requiere_autorizacion
+        ahora = timezone.now()
+
+        nuevas = []
+        conflictos = []
+        for trabajador in trabajadores:
+            if trabajador.pk in periodo_existente:
+                inicio, fin = periodo_existente[trabajador.pk]
+                conflictos.append({
+                    'trabajador': trabajador,
+                    'fecha_inicio': inicio,
+                    'fecha_fin': fin,
+                })
+                continue
+
+            nuevas.append(Incidencia(
+                id_trabajador=trabajador,
+                id_tipo_incidencia=tipo_incidencia,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                observaciones=observaciones,
+                estado="autorizada" if autorizar else "pendiente",
+                autorizada_por=usuario if autorizar else None,
+                fecha_autorizacion=ahora if autorizar else None,
+                created_by=usuario,
+                updated_by=usuario,
+            ))
+
+        creadas = Incidencia.objects.bulk_create(nuevas)
+
+        # bulk_create no emite las señales que invalidan el dashboard
+        if creadas:
+            from apps.accounts.dashboard import invalidar_dashboard
+            invalidar_dashboard(
+                unidades=[incidencia.id_trabajador.id_unidad_id for incidencia in creadas],
+                trabajadores=[incidencia.id_trabajador_id for incidencia in creadas],
+            )
+
+    return {
+        'creadas': creadas,
+        'conflictos': conflictos,
+    }
@@ -6,9 +6,11 @@ from django.contrib import messages
 from django.db.models import Q, Count
 from django.utils import timezone
 from django.http import HttpResponseForbidden
+from apps.accounts import catalogos
 from apps.accounts.decorators import jefe_o_admin_requerido, puede_autorizar_incidencias
 from .models import Incidencia, TipoIncidencia
-from .forms import IncidenciaForm, AutorizarIncidenciaForm, FiltroIncidenciaForm
+from .forms import IncidenciaForm, AutorizarIncidenciaForm, FiltroIncidenciaForm, IncidenciaMasivaForm
+from .utils import crear_incidencias_masivas
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse
@@ -18,22 +20,22 @@ from django.db import IntegrityError
 
 @login_required
 def index(request):
-    perfil = request.user.perfil
+    scope = request.scope
 
     print(">>> Entrando a incidencias:index")
-    print("Rol admin?:", perfil.es_admin())
-    print("Rol jefe?:", perfil.es_jefe())
-    print("Rol trabajador?:", perfil.es_trabajador())
+    print("Rol admin?:", scope.es_admin())
+    print("Rol jefe?:", scope.es_jefe())
+    print("Rol trabajador?:", scope.es_trabajador())
 
-    if perfil.es_admin():
+    if scope.es_admin():
         print("Redirigiendo a lista_incidencias")
         return redirect('incidencias:lista_incidencias')
 
-    if perfil.es_jefe():
+    if scope.es_jefe():
         print("Redirigiendo a lista_incidencias (jefe)")
         return redirect('incidencias:lista_incidencias')
 
-    if perfil.es_trabajador():
+    if scope.es_trabajador():
         print("Redirigiendo a mis_incidencias")
         return redirect('incidencias:mis_incidencias')
 
@@ -43,31 +45,15 @@ def index(request):
 @login_required
 def lista_incidencias(request):
     """Vista para listar incidencias según el rol del usuario"""
-    perfil = request.user.perfil
+    scope = request.scope
     
-    # Filtrar incidencias según el rol
-    if perfil.es_admin():
-        incidencias = Incidencia.objects.all()
-    elif perfil.es_jefe():
-        # El jefe puede ver las de su unidad si tiene trabajador asociado
-        if perfil.id_trabajador and perfil.id_trabajador.id_unidad:
-            incidencias = Incidencia.objects.filter(
-                id_trabajador__id_unidad=perfil.id_trabajador.id_unidad
-            )
-        else:
-            incidencias = Incidencia.objects.all()
-    else:
-        # Trabajadores solo ven sus propias incidencias
-        if perfil.id_trabajador:
-            incidencias = Incidencia.objects.filter(id_trabajador=perfil.id_trabajador)
-        else:
-            incidencias = Incidencia.objects.none()
+    # Filtrar incidencias según el rol (admin: todas, jefe: su unidad, trabajador: las suyas)
+    incidencias = Incidencia.objects.visible_to(scope)
     
     # Preparar queryset de unidades para el formulario
     from apps.unidades.models import UnidadAdministrativa
-    from apps.trabajadores.models import Trabajador
     
-    if perfil.es_admin():
+    if scope.es_admin():
         unidades_queryset = UnidadAdministrativa.objects.all()
     else:
         unidades_queryset = UnidadAdministrativa.objects.none()
@@ -100,23 +86,11 @@ def lista_incidencias(request):
         if fecha_hasta:
             incidencias = incidencias.filter(fecha_fin__lte=fecha_hasta)
     
-    # Preparar trabajadores agrupados por unidad para el template
-    if perfil.es_admin():
-        todos_trabajadores = Trabajador.objects.filter(activo=True).select_related('id_unidad').order_by('id_unidad', 'nombre', 'apellido_paterno')
-    else:
-        todos_trabajadores = Trabajador.objects.none()
-    
-    trabajadores = Trabajador.objects.filter(activo=True).select_related('id_unidad')
-    if perfil.es_jefe() and perfil.id_trabajador and perfil.id_trabajador.id_unidad:
-        trabajadores = trabajadores.filter(id_unidad=perfil.id_trabajador.id_unidad)
-    
     # Estadísticas filtradas según el rol y unidad
     incidencias_para_stats = incidencias
-    if perfil.es_jefe() and perfil.id_trabajador and perfil.id_trabajador.id_unidad:
+    if scope.es_jefe():
         # Jefe ve estadísticas solo de su unidad (sin filtros aplicados)
-        incidencias_para_stats = Incidencia.objects.filter(
-            id_trabajador__id_unidad=perfil.id_trabajador.id_unidad
-        )
+        incidencias_para_stats = Incidencia.objects.visible_to(scope)
     
     estadisticas = {
         'total': incidencias_para_stats.count(),
@@ -136,12 +110,9 @@ def lista_incidencias(request):
         'incidencias': incidencias,
         'form': form,
         'estadisticas': estadisticas,
-        'perfil': perfil,
-        'trabajadores': trabajadores,
-        'todos_trabajadores': todos_trabajadores,
-        'unidades': unidades_queryset,
-        'es_admin': perfil.es_admin(),
-        'es_jefe': perfil.es_jefe(),
+        'unidades': catalogos.unidades() if scope.es_admin() else [],
+        'es_admin': scope.es_admin(),
+        'es_jefe': scope.es_jefe(),
     }
     return render(request, 'incidencias/lista_incidencias.html', context)
 
@@ -149,32 +120,17 @@ def lista_incidencias(request):
 @login_required
 def detalle_incidencia(request, pk):
     """Vista para ver el detalle de una incidencia"""
-    incidencia = get_object_or_404(Incidencia, pk=pk)
-    perfil = request.user.perfil
+    scope = request.scope
+    # Misma regla que los listados: fuera del alcance del usuario es un 404
+    incidencia = get_object_or_404(Incidencia.objects.visible_to(scope), pk=pk)
     
     # Detectar si viene desde mis_incidencias
     from_mis_incidencias = request.GET.get('from') == 'mis_incidencias'
     
-    # Verificar permisos
-    puede_ver = False
-    if perfil.es_admin():
-        puede_ver = True
-    elif perfil.es_jefe():
-        if perfil.id_trabajador and perfil.id_trabajador.id_unidad:
-            puede_ver = incidencia.id_trabajador.id_unidad == perfil.id_trabajador.id_unidad
-        else:
-            puede_ver = True
-    else:
-        puede_ver = perfil.id_trabajador == incidencia.id_trabajador
-    
-    if not puede_ver:
-        messages.error(request, 'No tienes permiso para ver esta incidencia.')
-        return redirect('incidencias:lista_incidencias')
-    
     context = {
         'incidencia': incidencia,
-        'puede_autorizar': perfil.puede_autorizar_incidencias and incidencia.puede_ser_autorizada,
-        'puede_editar': perfil.puede_autorizar_incidencias and incidencia.puede_ser_editada,
+        'puede_autorizar': scope.puede_autorizar_incidencias and incidencia.puede_ser_autorizada,
+        'puede_editar': scope.puede_autorizar_incidencias and incidencia.puede_ser_editada,
         'from_mis_incidencias': from_mis_incidencias,
     }
     return render(request, 'incidencias/detalle_incidencia.html', context)
@@ -187,7 +143,7 @@ def crear_incidencia(request):
     from_mis_incidencias = request.GET.get('from') == 'mis_incidencias'
     
     if request.method == 'POST':
-        form = IncidenciaForm(request.POST, user=request.user, from_mis_incidencias=from_mis_incidencias)
+        form = IncidenciaForm(request.POST, scope=request.scope, from_mis_incidencias=from_mis_incidencias)
         if form.is_valid():
             try:
                 incidencia = form.save(commit=False)
@@ -211,33 +167,72 @@ def crear_incidencia(request):
             except Exception as e:
                 messages.error(request, f'Error al crear la incidencia: {str(e)}')
     else:
-        form = IncidenciaForm(user=request.user, from_mis_incidencias=from_mis_incidencias)
+        form = IncidenciaForm(scope=request.scope, from_mis_incidencias=from_mis_incidencias)
     
     context = {
         'form': form,
         'titulo': 'Crear Nueva Incidencia',
         'boton': 'Crear Incidencia',
         'from_mis_incidencias': from_mis_incidencias,
-        'trabajador_bloqueado': from_mis_incidencias and request.user.perfil.id_trabajador
     }
     return render(request, 'incidencias/form_incidencia.html', context)
 
 
+@jefe_o_admin_requerido
+def crear_incidencias_grupo(request):
+    """Vista para registrar la misma incidencia a una unidad o lista de trabajadores"""
+    reporte = None
+
+    if request.method == 'POST':
+        form = IncidenciaMasivaForm(request.POST, scope=request.scope)
+        if form.is_valid():
+            reporte = crear_incidencias_masivas(
+                form.obtener_trabajadores(),
+                form.cleaned_data['id_tipo_incidencia'],
+                form.cleaned_data['fecha_inicio'],
+                form.cleaned_data['fecha_fin'],
+                request.user,
+                form.cleaned_data['observaciones'],
+            )
+
+            total_creadas = len(reporte['creadas'])
+            total_conflictos = len(reporte['conflictos'])
+            if total_creadas:
+                messages.success(request, f'Se crearon {total_creadas} incidencia(s).')
+            if total_conflictos:
+                messages.warning(
+                    request,
+                    f'{total_conflictos} trabajador(es) omitido(s) por traslape con otra incidencia.'
+                )
+            if not total_creadas and not total_conflictos:
+                messages.warning(request, 'No se encontraron trabajadores activos para el grupo seleccionado.')
+    else:
+        form = IncidenciaMasivaForm(scope=request.scope)
+
+    context = {
+        'form': form,
+        'reporte': reporte,
+        'titulo': 'Incidencia por Grupo',
+        'boton': 'Crear Incidencias',
+    }
+    return render(request, 'incidencias/form_incidencia_grupo.html', context)
+
+
 @login_required
 def editar_incidencia(request, pk):
     """Vista para editar una incidencia"""
     incidencia = get_object_or_404(Incidencia, pk=pk)
-    perfil = request.user.perfil
+    scope = request.scope
     
     # Verificar permisos
     puede_editar = False
-    if perfil.es_admin():
+    if scope.es_admin():
         puede_editar = incidencia.puede_ser_editada
-    elif perfil.es_jefe():
+    elif scope.es_jefe():
         puede_editar = incidencia.puede_ser_editada
     else:
         puede_editar = (
-            perfil.id_trabajador == incidencia.id_trabajador and 
+            scope.id_trabajador == incidencia.id_trabajador_id and 
             incidencia.puede_ser_editada
         )
     
@@ -246,7 +241,7 @@ def editar_incidencia(request, pk):
         return redirect('incidencias:detalle_incidencia', pk=pk)
     
     if request.method == 'POST':
-        form = IncidenciaForm(request.POST, instance=incidencia, user=request.user)
+        form = IncidenciaForm(request.POST, instance=incidencia, scope=request.scope)
         if form.is_valid():
             try:
                 incidencia = form.save(commit=False)
@@ -257,7 +252,7 @@ def editar_incidencia(request, pk):
             except Exception as e:
                 messages.error(request, f'Error al actualizar la incidencia: {str(e)}')
     else:
-        form = IncidenciaForm(instance=incidencia, user=request.user)
+        form = IncidenciaForm(instance=incidencia, scope=request.scope)
     
     context = {
         'form': form,
@@ -305,11 +300,11 @@ def autorizar_incidencia(request, pk):
 def eliminar_incidencia(request, pk):
     """Vista para eliminar una incidencia"""
     incidencia = get_object_or_404(Incidencia, pk=pk)
-    perfil = request.user.perfil
+    scope = request.scope
     
     # Solo admin puede eliminar, o el creador si está pendiente
     puede_eliminar = False
-    if perfil.es_admin():
+    if scope.es_admin():
         puede_eliminar = True
     elif incidencia.created_by == request.user and incidencia.estado == 'pendiente':
         puede_eliminar = True
@@ -332,14 +327,14 @@ def eliminar_incidencia(request, pk):
 @login_required
 def mis_incidencias(request):
     """Vista para que un trabajador vea solo sus incidencias"""
-    perfil = request.user.perfil
+    scope = request.scope
     
-    if not perfil.id_trabajador:
+    if not scope.tiene_trabajador:
         messages.error(request, 'No tienes un trabajador asociado a tu cuenta.')
         return redirect('accounts:dashboard')
     
     incidencias = Incidencia.objects.filter(
-        id_trabajador=perfil.id_trabajador
+        id_trabajador_id=scope.id_trabajador
     ).select_related(
         'id_tipo_incidencia',
         'autorizada_por'
@@ -356,7 +351,6 @@ def mis_incidencias(request):
     context = {
         'incidencias': incidencias,
         'estadisticas': estadisticas,
-        'perfil': perfil,
     }
     return render(request, 'incidencias/mis_incidencias.html', context)
 
@@ -369,24 +363,15 @@ def autorizar_incidencias(request):
     En la tabla se listan solo las 'pendientes',
     pero las estadísticas se calculan sobre todas las incidencias de su alcance.
     """
-    perfil = request.user.perfil
+    scope = request.scope
 
     # Solo ADMIN o JEFE pueden entrar
-    if not (perfil.es_admin() or perfil.es_jefe()):
+    if not (scope.es_admin() or scope.es_jefe()):
         messages.error(request, 'No tienes permiso para acceder a esta página.')
         return redirect('incidencias:lista_incidencias')
 
-    # Base de incidencias según alcance
-    if perfil.es_admin():
-        base_qs = Incidencia.objects.all()
-    else:
-        # JEFE: solo su unidad
-        if perfil.id_trabajador and perfil.id_trabajador.id_unidad:
-            base_qs = Incidencia.objects.filter(
-                id_trabajador__id_unidad=perfil.id_trabajador.id_unidad
-            )
-        else:
-            base_qs = Incidencia.objects.none()
+    # Base de incidencias según alcance (admin: todas, jefe: su unidad)
+    base_qs = Incidencia.objects.visible_to(scope)
 
     # Estadísticas dentro del alcance del usuario
     estadisticas = {
@@ -406,7 +391,6 @@ def autorizar_incidencias(request):
     context = {
         'incidencias': incidencias,
         'estadisticas': estadisticas,
-        'perfil': perfil,
     }
     return render(request, 'incidencias/autorizar_incidencias.html', context)
 
@@ -1,5 +1,19 @@
 from django.contrib import admin
-from .models import JornadaLaboral, JornadaDias, CalendarioLaboral, TrabajadorJornada
+from .models import NOMBRES_DIAS, JornadaLaboral, JornadaDias, CalendarioLaboral, ReglaDiaInhabil, TrabajadorJornada
+
+
+class DiaLaboralFilter(admin.SimpleListFilter):
+    """Filtra por día de la semana con la máscara de días (sin JOIN a JornadaDias)"""
+    title = 'día laboral'
+    parameter_name = 'dia'
+
+    def lookups(self, request, model_admin):
+        return [(str(numero), nombre) for numero, nombre in NOMBRES_DIAS.items()]
+
+    def queryset(self, request, queryset):
+        if self.value() in {str(numero) for numero in NOMBRES_DIAS}:
+            return queryset.que_laboran(int(self.value()))
+        return queryset
 
 
 class JornadaDiasInline(admin.TabularInline):
@@ -15,7 +29,7 @@ class JornadaDiasInline(admin.TabularInline):
 class JornadaLaboralAdmin(admin.ModelAdmin):
     list_display = ['descripcion', 'hora_entrada', 'hora_salida', 'get_dias', 'created_at']
     search_fields = ['descripcion']
-    list_filter = ['created_at', 'dias__numero_dia']
+    list_filter = ['created_at', DiaLaboralFilter]
     readonly_fields = ['created_at', 'updated_at', 'created_by', 'updated_by', 'dias_texto']
     inlines = [JornadaDiasInline]
     
@@ -69,6 +83,34 @@ class CalendarioLaboralAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(ReglaDiaInhabil)
+class ReglaDiaInhabilAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'tipo', 'anio_inicio', 'anio_fin', 'activo']
+    search_fields = ['descripcion']
+    list_filter = ['tipo', 'mes', 'activo']
+    readonly_fields = ['created_at', 'updated_at', 'created_by', 'updated_by']
+
+    fieldsets = (
+        ('Regla', {
+            'fields': ('descripcion', 'tipo', 'mes', 'dia', 'ordinal', 'dia_semana', 'activo'),
+            'description': 'Fecha fija: mes y día. Día de la semana del mes: mes, ocurrencia y día de la semana.',
+        }),
+        ('Vigencia', {
+            'fields': ('anio_inicio', 'anio_fin'),
+        }),
+        ('Auditoría', {
+            'fields': ('created_at', 'updated_at', 'created_by', 'updated_by'),
+            'classes': ('collapse',)
+        }),
+    )
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        obj.updated_by = request.user
+        super().save_model(request, obj, form, change)
+
+
 @admin.register(TrabajadorJornada)
 class TrabajadorJornadaAdmin(admin.ModelAdmin):
     list_display = ['id_trabajador', 'id_jornada', 'fecha_inicio', 'fecha_fin', 'get_esta_vigente', 'created_at']
@@ -4,4 +4,6 @@ from django.apps import AppConfig
 class JornadasLaboralesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.jornadas_laborales'
-    verbose_name = 'Jornadas Laborales'
\ No newline at end of file
+    verbose_name = 'Jornadas Laborales'
+    def ready(self):
+        import apps.jornadas_laborales.signals
@@ -0,0 +1,152 @@
+# apps/jornadas_laborales/asignacion_masiva.py
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.trabajadores.models import Trabajador
+
+from .jornada_actual import sincronizar_jornada_actual
+from .models import TrabajadorJornada
+
+
+# Estados del reporte por trabajador
+ASIGNADO = 'asignado'
+SIN_CAMBIOS = 'sin_cambios'
+CONFLICTO = 'conflicto'
+
+# Fin de las asignaciones abiertas al buscar traslapes
+FECHA_MAXIMA = date(2099, 12, 31)
+
+
+@dataclass
+class FilaReporte:
+    trabajador: object
+    estado: str
+    detalle: str = ''
+
+
+@dataclass
+class ResultadoAsignacion:
+    filas: list = field(default_factory=list)
+    cerradas: int = 0
+
+    def _contar(self, estado):
+        return sum(1 for fila in self.filas if fila.estado == estado)
+
+    @property
+    def asignados(self):
+        return self._contar(ASIGNADO)
+
+    @property
+    def sin_cambios(self):
+        return self._contar(SIN_CAMBIOS)
+
+    @property
+    def conflictos(self):
+        return [fila for fila in self.filas if fila.estado == CONFLICTO]
+
+    def __str__(self):
+        return (
+            f"{self.asignados} asignados ({self.cerradas} asignaciones cerradas), "
+            f"{self.sin_cambios} sin cambios, {len(self.conflictos)} con conflicto"
+        )
+
+
+def asignar_jornada_masiva(trabajadores, jornada, fecha_inicio, fecha_fin=None, usuario=None):
+    """
+    Asigna `jornada` a un conjunto de trabajadores desde `fecha_inicio`.
+
+    Las asignaciones de todos los trabajadores que se traslapan con el nuevo
+    periodo se leen en una sola consulta y se resuelven en memoria:
+        - Si empezó antes de `fecha_inicio` se cierra el día anterior
+          (la asignación vigente de cada trabajador).
+        - Si ya es la misma jornada y cubre todo el periodo, no se toca.
+        - Si empieza dentro del periodo (asignación futura) es un conflicto:
+          el trabajador se omite y queda en el reporte.
+    Los cierres van en un bulk_update y las altas en un bulk_create, dentro
+    de una sola transacción; al final se recalcula la jornada actual de los
+    trabajadores asignados.
+
+    Args:
+        trabajadores: QuerySet de Trabajador (ya acotado al alcance).
+        jornada (JornadaLaboral)
+        fecha_inicio (date)
+        fecha_fin (date | None): None = asignación sin fin.
+        usuario: User que queda en created_by/updated_by.
+
+    Returns:
+        ResultadoAsignacion con una fila por trabajador.
+    """
+    resultado = ResultadoAsignacion()
+    trabajadores = list(trabajadores.only(
+        'id_trabajador', 'numero_empleado', 'nombre', 'apellido_paterno', 'apellido_materno'
+    ))
+    if not trabajadores:
+        return resultado
+
+    fin_periodo = fecha_fin or FECHA_MAXIMA
+    cierre = fecha_inicio - timedelta(days=1)
+
+    with transaction.atomic():
+        traslapes = {}
+        for asignacion in TrabajadorJornada.objects.select_for_update(of=('self',)).filter(
+            id_trabajador__in=[trabajador.pk for trabajador in trabajadores],
+        ).traslapan(fecha_inicio, fecha_fin).select_related('id_jornada').order_by('fecha_inicio'):
+            traslapes.setdefault(asignacion.id_trabajador_id, []).append(asignacion)
+
+        por_cerrar = []
+        nuevas = []
+        for trabajador in trabajadores:
+            existentes = traslapes.get(trabajador.pk, [])
+
+            # Una sola asignación de la misma jornada que ya cubre el periodo
+            # (p. ej. al repetir la misma asignación masiva)
+            if len(existentes) == 1:
+                actual = existentes[0]
+                if (actual.id_jornada_id == jornada.pk and actual.fecha_inicio <= fecha_inicio
+                        and (actual.fecha_fin or FECHA_MAXIMA) >= fin_periodo):
+                    resultado.filas.append(FilaReporte(trabajador, SIN_CAMBIOS, "Ya tiene esta jornada en el periodo"))
+                    continue
+
+            futuras = [a for a in existentes if a.fecha_inicio >= fecha_inicio]
+            if futuras:
+                primera = futuras[0]
+                resultado.filas.append(FilaReporte(trabajador, CONFLICTO, (
+                    f"Ya tiene la jornada '{primera.id_jornada.get_descripcion_display()}' "
+                    f"desde {primera.fecha_inicio.strftime('%d/%m/%Y')}"
+                )))
+                continue
+
+            for asignacion in existentes:
+                asignacion.fecha_fin = cierre
+                asignacion.updated_by = usuario
+                asignacion.updated_at = timezone.now()
+                por_cerrar.append(asignacion)
+
+            nuevas.append(TrabajadorJornada(
+                id_trabajador=trabajador,
+                id_jornada=jornada,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                created_by=usuario,
+                updated_by=usuario,
+            ))
+            detalle = ''
+            if existentes:
+                detalle = f"Se cerró '{existentes[-1].id_jornada.get_descripcion_display()}' al {cierre.strftime('%d/%m/%Y')}"
+            resultado.filas.append(FilaReporte(trabajador, ASIGNADO, detalle))
+
+        TrabajadorJornada.objects.bulk_update(por_cerrar, ['fecha_fin', 'updated_by', 'updated_at'])
+        TrabajadorJornada.objects.bulk_create(nuevas)
+
+        # bulk_update/bulk_create no emiten señales
+        if nuevas:
+            sincronizar_jornada_actual(Trabajador.objects.filter(
+                pk__in=[asignacion.id_trabajador_id for asignacion in nuevas]
+            ))
+
+    resultado.cerradas = len(por_cerrar)
+    return resultado
@@ -0,0 +1,320 @@
+# apps/jornadas_laborales/calendario.py
+
+import time
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+
+from apps.accounts.caches import CALENDARIO
+
+from .models import CalendarioLaboral, ReglaDiaInhabil
+
+
+# =========================================================
+#   ÍNDICE DE DÍAS INHÁBILES (en memoria del proceso)
+# =========================================================
+# Un frozenset de fechas inhábiles por año, armado la primera vez que se
+# consulta ese año a partir de:
+#   - las reglas recurrentes (ReglaDiaInhabil), expandidas para ese año, y
+#   - los registros de CalendarioLaboral de ese año, que mandan sobre las
+#     reglas (es_inhabil=False hace hábil una fecha que la regla marcaría).
+# Reglas y registros se leen una sola vez por proceso (dos consultas) y el
+# resto de los años se arma en memoria: consultar un día de cualquier año,
+# incluso en reportes de varios años, es una búsqueda en un set, sin
+# consultas ni accesos a la caché.
+#
+# Los demás procesos se enteran de los cambios por la versión del dominio
+# CALENDARIO en la caché compartida, que suben las señales de
+# CalendarioLaboral y ReglaDiaInhabil; cada proceso la revisa a lo más una
+# vez cada CALENDARIO_REVISION_SEGUNDOS.
+
+_indice = {}           # {año: frozenset(date)}
+_fuentes = {}          # 'reglas': [ReglaDiaInhabil], 'registros': {año: {date: (es_inhabil, descripcion)}}
+_estado = {'version': None, 'proxima_revision': 0.0}
+
+
+def _descartar():
+    _indice.clear()
+    _fuentes.clear()
+
+
+def _revisar_version():
+    ahora = time.monotonic()
+    if ahora < _estado['proxima_revision']:
+        return
+    version = CALENDARIO.version()
+    if version != _estado['version']:
+        _descartar()
+        _estado['version'] = version
+    _estado['proxima_revision'] = ahora + settings.CALENDARIO_REVISION_SEGUNDOS
+
+
+def _cargar_fuentes():
+    registros = {}
+    for fecha, inhabil, descripcion in CalendarioLaboral.objects.values_list('fecha', 'es_inhabil', 'descripcion'):
+        registros.setdefault(fecha.year, {})[fecha] = (inhabil, descripcion)
+    fuentes = {
+        'registros': registros,
+        'reglas': list(ReglaDiaInhabil.objects.filter(activo=True)),
+    }
+    _fuentes.update(fuentes)
+    return fuentes
+
+
+def _armar_anio(anio):
+    # Copia local: otro hilo puede descartar las fuentes mientras tanto
+    fuentes = dict(_fuentes) or _cargar_fuentes()
+
+    dias = {regla.fecha_en(anio) for regla in fuentes['reglas']}
+    dias.discard(None)
+    for fecha, (inhabil, _) in fuentes['registros'].get(anio, {}).items():
+        if inhabil:
+            dias.add(fecha)
+        else:
+            dias.discard(fecha)
+    return frozenset(dias)
+
+
+def dias_inhabiles(anio):
+    """frozenset con las fechas inhábiles de `anio`."""
+    _revisar_version()
+    dias = _indice.get(anio)
+    if dias is None:
+        dias = _indice[anio] = _armar_anio(anio)
+    return dias
+
+
+def es_inhabil(fecha):
+    """True si `fecha` es inhábil según el calendario laboral."""
+    return fecha in dias_inhabiles(fecha.year)
+
+
+DiaInhabil = namedtuple('DiaInhabil', 'fecha descripcion regla')  # regla: None si es un registro
+
+
+def inhabiles_entre(inicio, fin):
+    """
+    [DiaInhabil] de `inicio` a `fin` (inclusive), por fecha: los registros
+    de CalendarioLaboral y los días que aportan las reglas recurrentes.
+    """
+    dias = []
+    for anio in range(inicio.year, fin.year + 1):
+        inhabiles = dias_inhabiles(anio)
+        fuentes = dict(_fuentes) or _cargar_fuentes()
+        registros = fuentes['registros'].get(anio, {})
+        reglas = {}
+        for regla in fuentes['reglas']:
+            reglas.setdefault(regla.fecha_en(anio), regla)
+
+        for fecha in sorted(inhabiles):
+            if not inicio <= fecha <= fin:
+                continue
+            if fecha in registros:
+                dias.append(DiaInhabil(fecha, registros[fecha][1], None))
+            else:
+                regla = reglas[fecha]
+                dias.append(DiaInhabil(fecha, regla.descripcion, regla))
+    return dias
+
+
+def invalidar_calendario():
+    """
+    Descarta el índice de este proceso y sube la versión compartida para
+    que los demás procesos lo descarten en su siguiente revisión.
+    """
+    _descartar()
+    _estado['version'] = CALENDARIO.invalidar()
+    _estado['proxima_revision'] = 0.0
+
+
+# =========================================================
+#   ALTA MASIVA (periodos e importación .ics)
+# =========================================================
+
+@dataclass
+class ResultadoCalendario:
+    creados: int = 0
+    existentes: int = 0
+    recalculados: int = 0
+
+    def __str__(self):
+        texto = f"{self.creados} días registrados"
+        if self.existentes:
+            texto += f", {self.existentes} ya existían"
+        if self.recalculados:
+            texto += f"; {self.recalculados} asistencias recalculadas"
+        return texto
+
+
+def fechas_en_rango(fecha_inicio, fecha_fin, dias_semana=None):
+    """
+    Fechas de `fecha_inicio` a `fecha_fin` (inclusive). Si se da
+    `dias_semana` (1 = lunes ... 7 = domingo) solo se incluyen esos días.
+    """
+    fechas = []
+    fecha = fecha_inicio
+    while fecha <= fecha_fin:
+        if not dias_semana or fecha.isoweekday() in dias_semana:
+            fechas.append(fecha)
+        fecha += timedelta(days=1)
+    return fechas
+
+
+def _fecha_ics(valor):
+    # DATE (20251216) o DATE-TIME (20251216T000000[Z]): basta la fecha
+    valor = valor.strip()
+    return date(int(valor[0:4]), int(valor[4:6]), int(valor[6:8])), len(valor) == 8
+
+
+def _texto_ics(valor):
+    return (valor.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',')
+            .replace('\\;', ';').replace('\\\\', '\\').strip())
+
+
+def leer_ics(contenido):
+    """
+    Días de los eventos (VEVENT) de un calendario iCalendar (.ics), como
+    los que publican Google Calendar u Outlook para días festivos.
+
+    Un evento de día completo cubre de DTSTART hasta el día anterior a
+    DTEND; uno con hora, hasta la fecha de DTEND. Las reglas de repetición
+    (RRULE) no se expanden.
+
+    Args:
+        contenido (str): texto del archivo.
+
+    Returns:
+        list de (fecha, descripcion).
+
+    Raises:
+        ValueError: si una fecha no es válida o no hay eventos.
+    """
+    # Las líneas largas continúan en la siguiente con un espacio o tabulador
+    lineas = []
+    for linea in contenido.splitlines():
+        if linea[:1] in (' ', '\t') and lineas:
+            lineas[-1] += linea[1:]
+        elif linea.strip():
+            lineas.append(linea)
+
+    dias = []
+    evento = None
+    for linea in lineas:
+        nombre, _, valor = linea.partition(':')
+        nombre = nombre.split(';', 1)[0].upper()
+
+        if nombre == 'BEGIN' and valor.strip().upper() == 'VEVENT':
+            evento = {}
+        elif nombre == 'END' and valor.strip().upper() == 'VEVENT' and evento is not None:
+            if 'DTSTART' not in evento:
+                raise ValueError("Hay un evento sin fecha de inicio (DTSTART)")
+            inicio, todo_el_dia = _fecha_ics(evento['DTSTART'])
+            fin = inicio
+            if 'DTEND' in evento:
+                fin, fin_todo_el_dia = _fecha_ics(evento['DTEND'])
+                if fin_todo_el_dia:
+                    fin -= timedelta(days=1)  # DTEND de día completo es exclusivo
+            descripcion = _texto_ics(evento.get('SUMMARY', ''))[:200]
+            dias.extend((fecha, descripcion) for fecha in fechas_en_rango(inicio, max(inicio, fin)))
+            evento = None
+        elif evento is not None and nombre in ('DTSTART', 'DTEND', 'SUMMARY'):
+            evento[nombre] = valor
+
+    if not dias:
+        raise ValueError("El archivo no contiene eventos")
+    return dias
+
+
+def registrar_dias(dias, es_inhabil=True, usuario=None):
+    """
+    Registra varios días del calendario en un solo INSERT.
+
+    Las fechas que ya están en el calendario no se modifican (bulk_create
+    con ignore_conflicts también cubre las que se registren al mismo
+    tiempo). Después se invalida el índice de días inhábiles y se
+    recalcula una sola vez el estatus de las asistencias de esas fechas:
+    también con es_inhabil=False, porque un día hábil registrado anula la
+    regla recurrente que lo marcaría inhábil.
+
+    Args:
+        dias: iterable de (fecha, descripcion); si una fecha se repite
+            gana la primera.
+        es_inhabil (bool)
+        usuario: User que queda en created_by/updated_by.
+
+    Returns:
+        ResultadoCalendario
+    """
+    from apps.asistencias.utils import recalcular_estatus
+
+    descripciones = {}
+    for fecha, descripcion in dias:
+        descripciones.setdefault(fecha, descripcion)
+
+    existentes = set(CalendarioLaboral.objects.filter(
+        fecha__in=descripciones
+    ).values_list('fecha', flat=True))
+
+    nuevos = [
+        CalendarioLaboral(
+            fecha=fecha,
+            es_inhabil=es_inhabil,
+            descripcion=descripcion,
+            created_by=usuario,
+            updated_by=usuario,
+        )
+        for fecha, descripcion in sorted(descripciones.items())
+        if fecha not in existentes
+    ]
+
+    resultado = ResultadoCalendario(creados=len(nuevos), existentes=len(existentes))
+    if not nuevos:
+        return resultado
+
+    with transaction.atomic():
+        CalendarioLaboral.objects.bulk_create(nuevos, ignore_conflicts=True)
+
+    # bulk_create no emite las señales que invalidan el índice. Sin una
+    # transacción externa corre en el momento, antes de recalcular.
+    transaction.on_commit(invalidar_calendario)
+    resultado.recalculados = recalcular_estatus([dia.fecha for dia in nuevos])
+    return resultado
+
+
+# =========================================================
+#   CAMBIOS EN LAS REGLAS RECURRENTES
+# =========================================================
+
+def fechas_de_regla(regla):
+    """Fechas de `regla` en los años que tienen asistencias registradas."""
+    from apps.asistencias.models import RegistroAsistencia
+
+    rango = RegistroAsistencia.objects.aggregate(desde=Min('fecha'), hasta=Max('fecha'))
+    if rango['desde'] is None:
+        return []
+    fechas = (regla.fecha_en(anio) for anio in range(rango['desde'].year, rango['hasta'].year + 1))
+    return [fecha for fecha in fechas if fecha is not None]
+
+
+def aplicar_cambio_regla(*reglas):
+    """
+    Invalida el índice y recalcula el estatus de las asistencias en las
+    fechas de `reglas` (la versión nueva y la anterior de una regla
+    editada, o la eliminada). Las señales lo llaman al confirmarse la
+    transacción.
+
+    Returns:
+        int: registros actualizados.
+    """
+    from apps.asistencias.utils import recalcular_estatus
+
+    invalidar_calendario()
+    fechas = set()
+    for regla in reglas:
+        if regla is not None:
+            fechas.update(fechas_de_regla(regla))
+    return recalcular_estatus(sorted(fechas)) if fechas else 0
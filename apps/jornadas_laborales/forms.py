@@ -1,11 +1,17 @@
 # apps/jornadas_laborales/forms.py
 
+import re
+
 from django import forms
-from django.db.models import Q
 from datetime import date
 
-from .models import JornadaLaboral, CalendarioLaboral, JornadaDias, TrabajadorJornada
+from apps.accounts import catalogos
+
+from .calendario import fechas_en_rango, leer_ics
+from .models import NOMBRES_DIAS, JornadaLaboral, CalendarioLaboral, JornadaDias, TrabajadorJornada
 from apps.trabajadores.models import Trabajador
+from apps.trabajadores.widgets import TrabajadorAutocompleteWidget
+from apps.unidades.models import UnidadAdministrativa
 
 
 # =========================================================
@@ -125,9 +131,7 @@ class AsignarJornadaForm(forms.ModelForm):
         model = TrabajadorJornada
         fields = ['id_trabajador', 'id_jornada', 'fecha_inicio', 'fecha_fin']
         widgets = {
-            'id_trabajador': forms.Select(attrs={
-                'class': 'w-full bg-gray-900 border border-gray-600 text-white rounded-lg px-4 py-3 focus:ring-2 focus:ring-green-500 focus:border-green-500 transition'
-            }),
+            'id_trabajador': TrabajadorAutocompleteWidget(unidad_selector='#unidad-select'),
             'id_jornada': forms.Select(attrs={
                 'class': 'w-full bg-gray-900 border border-gray-600 text-white rounded-lg px-4 py-3 focus:ring-2 focus:ring-green-500 focus:border-green-500 transition'
             }),
@@ -155,9 +159,8 @@ class AsignarJornadaForm(forms.ModelForm):
         qs = Trabajador.objects.filter(activo=True)
 
         # Si es jefe → limitar a su unidad
-        if request and hasattr(request.user, 'perfil') and request.user.perfil.es_jefe():
-            unidad = request.user.perfil.id_trabajador.id_unidad
-            qs = qs.filter(id_unidad=unidad)
+        if request:
+            qs = qs.visible_to(request.scope)
 
         self.fields['id_trabajador'].queryset = qs
 
@@ -169,8 +172,6 @@ class AsignarJornadaForm(forms.ModelForm):
     
     def clean(self):
         cleaned_data = super().clean()
-        trabajador = cleaned_data.get('id_trabajador')
-        jornada = cleaned_data.get('id_jornada')
         fecha_inicio = cleaned_data.get('fecha_inicio')
         fecha_fin = cleaned_data.get('fecha_fin')
         
@@ -181,29 +182,210 @@ class AsignarJornadaForm(forms.ModelForm):
                     "La fecha de fin debe ser posterior a la fecha de inicio"
                 )
         
-        # Validar traslapes con otras asignaciones del mismo trabajador
-        if trabajador and fecha_inicio:
-            # Buscar asignaciones que se traslapen
-            traslapes = TrabajadorJornada.objects.filter(
-                id_trabajador=trabajador,
-                fecha_inicio__lte=fecha_fin or date(2099, 12, 31),
-            ).filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=fecha_inicio)
-            )
-            
-            # Excluir la instancia actual si estamos editando
-            if self.instance.pk:
-                traslapes = traslapes.exclude(pk=self.instance.pk)
-            
-            if traslapes.exists():
-                jornada_existente = traslapes.first()
-                raise forms.ValidationError(
-                    f"El trabajador ya tiene asignada la jornada '{jornada_existente.id_jornada.descripcion}' "
-                    f"desde {jornada_existente.fecha_inicio.strftime('%d/%m/%Y')}. "
-                    f"Debe finalizar esa asignación antes de crear una nueva."
-                )
+        # Los traslapes con otras asignaciones del mismo trabajador se
+        # validan en TrabajadorJornada.clean() (también aplica al admin)
         
         return cleaned_data
 
 
+# =========================================================
+#   FORMULARIO: ASIGNACIÓN MASIVA
+# =========================================================
+
+CLASE_CAMPO = 'w-full px-3 py-2 bg-gray-50 dark:bg-dark-800 border border-gray-200 dark:border-dark-700 rounded-lg text-sm text-gray-900 dark:text-white focus:ring-2 focus:ring-purple-500 focus:border-transparent transition-all duration-200'
+
+
+class AsignacionMasivaForm(forms.Form):
+    """
+    Asigna una jornada a toda una unidad y/o a una lista de números de empleado
+    """
+    unidad = forms.ModelChoiceField(
+        queryset=UnidadAdministrativa.objects.none(),
+        required=False,
+        empty_label='Todas (usar solo la lista)',
+        label='Unidad Administrativa',
+        widget=forms.Select(attrs={'class': CLASE_CAMPO}),
+    )
+    numeros_empleado = forms.CharField(
+        required=False,
+        label='Números de empleado',
+        widget=forms.Textarea(attrs={
+            'class': CLASE_CAMPO,
+            'rows': 6,
+            'placeholder': 'Uno por línea o separados por comas',
+        }),
+    )
+    id_jornada = forms.ModelChoiceField(
+        queryset=JornadaLaboral.objects.all(),
+        label='Jornada',
+        widget=forms.Select(attrs={'class': CLASE_CAMPO}),
+    )
+    fecha_inicio = forms.DateField(
+        label='Fecha de Inicio',
+        initial=date.today,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': CLASE_CAMPO}),
+    )
+    fecha_fin = forms.DateField(
+        required=False,
+        label='Fecha de Fin (opcional)',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': CLASE_CAMPO}),
+    )
+
+    def __init__(self, *args, request=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scope = request.scope
+
+        # El jefe solo puede elegir su unidad
+        unidades = UnidadAdministrativa.objects.order_by('nombre')
+        if not self.scope.es_admin():
+            unidades = unidades.filter(id_unidad=self.scope.id_unidad)
+        self.fields['unidad'].queryset = unidades
+
+        # Las opciones se dibujan desde los catálogos cacheados
+        catalogos.usar_catalogo(self.fields['unidad'], [
+            unidad for unidad in catalogos.unidades()
+            if self.scope.es_admin() or unidad.id_unidad == self.scope.id_unidad
+        ])
+        catalogos.usar_catalogo(self.fields['id_jornada'], catalogos.opciones_jornadas())
+
+    def clean_numeros_empleado(self):
+        texto = self.cleaned_data.get('numeros_empleado', '')
+        numeros = re.split(r'[\s,;]+', texto.strip()) if texto.strip() else []
+        # Sin repetidos, conservando el orden
+        return list(dict.fromkeys(numeros))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        fecha_inicio = cleaned_data.get('fecha_inicio')
+        fecha_fin = cleaned_data.get('fecha_fin')
+
+        if not cleaned_data.get('unidad') and not cleaned_data.get('numeros_empleado'):
+            raise forms.ValidationError("Seleccione una unidad o escriba al menos un número de empleado")
+
+        if fecha_inicio and fecha_fin and fecha_fin <= fecha_inicio:
+            raise forms.ValidationError("La fecha de fin debe ser posterior a la fecha de inicio")
+
+        return cleaned_data
+
+    def trabajadores(self):
+        """
+        Trabajadores activos seleccionados (dentro del alcance) y los números
+        de empleado de la lista que no se encontraron.
+
+        Returns:
+            (QuerySet, list)
+        """
+        qs = Trabajador.objects.visible_to(self.scope).filter(activo=True)
+        if self.cleaned_data.get('unidad'):
+            qs = qs.filter(id_unidad=self.cleaned_data['unidad'])
+
+        numeros = self.cleaned_data.get('numeros_empleado')
+        if not numeros:
+            return qs, []
+
+        qs = qs.filter(numero_empleado__in=numeros)
+        encontrados = set(qs.values_list('numero_empleado', flat=True))
+        return qs, [numero for numero in numeros if numero not in encontrados]
+
+
+# =========================================================
+#   FORMULARIOS: ALTA MASIVA DEL CALENDARIO
+# =========================================================
+
+class RangoCalendarioForm(forms.Form):
+    """
+    Registra un periodo (p. ej. vacaciones) como días del calendario
+    """
+    MAXIMO_DIAS = 366
+
+    fecha_inicio = forms.DateField(
+        label='Desde',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': CLASE_CAMPO}),
+    )
+    fecha_fin = forms.DateField(
+        label='Hasta',
+        widget=forms.DateInput(attrs={'type': 'date', 'class': CLASE_CAMPO}),
+    )
+    dias_semana = forms.TypedMultipleChoiceField(
+        choices=list(NOMBRES_DIAS.items()),
+        coerce=int,
+        required=False,
+        label='Solo estos días (opcional)',
+        widget=forms.CheckboxSelectMultiple(attrs={
+            'class': 'w-4 h-4 text-purple-600 border-gray-300 rounded focus:ring-purple-500'
+        }),
+    )
+    es_inhabil = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Marcar como días inhábiles',
+    )
+    descripcion = forms.CharField(
+        max_length=200,
+        required=False,
+        label='Descripción',
+        widget=forms.TextInput(attrs={'class': CLASE_CAMPO, 'placeholder': 'Ej: Vacaciones de invierno'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        fecha_inicio = cleaned_data.get('fecha_inicio')
+        fecha_fin = cleaned_data.get('fecha_fin')
+
+        if fecha_inicio and fecha_fin:
+            if fecha_inicio.year < 2020:
+                raise forms.ValidationError("Ingrese una fecha válida (2020 en adelante)")
+            if fecha_fin < fecha_inicio:
+                raise forms.ValidationError("La fecha final no puede ser anterior a la inicial")
+            if (fecha_fin - fecha_inicio).days >= self.MAXIMO_DIAS:
+                raise forms.ValidationError(f"El periodo no puede ser mayor a {self.MAXIMO_DIAS} días")
+
+        return cleaned_data
+
+    def dias(self):
+        """(fecha, descripcion) de cada día del periodo."""
+        fechas = fechas_en_rango(
+            self.cleaned_data['fecha_inicio'],
+            self.cleaned_data['fecha_fin'],
+            self.cleaned_data['dias_semana'],
+        )
+        return [(fecha, self.cleaned_data['descripcion']) for fecha in fechas]
+
+
+class ImportarCalendarioForm(forms.Form):
+    """
+    Importa los días festivos de un archivo iCalendar (.ics)
+    """
+    TAMANO_MAXIMO = 1024 * 1024  # 1 MB
+
+    archivo = forms.FileField(
+        label='Archivo .ics',
+        widget=forms.ClearableFileInput(attrs={'class': CLASE_CAMPO, 'accept': '.ics,text/calendar'}),
+    )
+    es_inhabil = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Marcar como días inhábiles',
+    )
+
+    def clean_archivo(self):
+        archivo = self.cleaned_data['archivo']
+        if not archivo.name.lower().endswith('.ics'):
+            raise forms.ValidationError("El archivo debe tener extensión .ics")
+        if archivo.size > self.TAMANO_MAXIMO:
+            raise forms.ValidationError("El archivo no puede pesar más de 1 MB")
+
+        try:
+            self.dias_ics = leer_ics(archivo.read().decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            raise forms.ValidationError("El archivo debe estar codificado en UTF-8")
+        except ValueError as e:
+            raise forms.ValidationError(f"El archivo no es un calendario válido: {e}")
+        return archivo
+
+    def dias(self):
+        """(fecha, descripcion) de cada día de los eventos del archivo."""
+        return self.dias_ics
+
+
 # Alias para mantener compatibilidad si se usa en otros lados
@@ -0,0 +1,55 @@
+# apps/jornadas_laborales/jornada_actual.py
+
+from datetime import date
+
+from django.db.models import Exists, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from apps.trabajadores.models import Trabajador
+
+from .models import TrabajadorJornada
+
+
+# =========================================================
+#   JORNADA ACTUAL DESNORMALIZADA
+# =========================================================
+# Trabajador.jornada_actual / jornada_actual_fin guardan la asignación
+# vigente hoy para que "trabajadores con jornada" sea un filtro sobre una
+# columna indexada. Se recalcula:
+#   - al guardar o borrar una asignación (signals.py),
+#   - después de una asignación masiva (bulk_create no emite señales),
+#   - una vez al día con renovar_jornadas_actuales, para las asignaciones
+#     que terminaron ayer o empiezan hoy.
+
+def sincronizar_jornada_actual(trabajadores, fecha=None):
+    """
+    Recalcula la jornada actual de `trabajadores` (QuerySet) en un solo
+    UPDATE con subconsultas correlacionadas.
+
+    Returns:
+        int: trabajadores actualizados.
+    """
+    fecha = fecha or date.today()
+    vigente = TrabajadorJornada.objects.filter(id_trabajador=OuterRef('pk')).vigentes_en(fecha)
+    return trabajadores.update(
+        jornada_actual=Subquery(vigente.values('pk')[:1]),
+        jornada_actual_fin=Subquery(vigente.values('fecha_fin')[:1]),
+    )
+
+
+def renovar_jornadas_actuales(fecha=None):
+    """
+    Cambio de día: actualiza solo a los trabajadores cuya jornada actual
+    ya terminó o que tienen vigente una asignación distinta (la que
+    empieza hoy, o las que se perdieron si el comando no corrió algún día).
+
+    Returns:
+        int: trabajadores actualizados.
+    """
+    fecha = fecha or date.today()
+    vigente = TrabajadorJornada.objects.filter(id_trabajador=OuterRef('pk')).vigentes_en(fecha)
+    desfasados = Trabajador.objects.filter(
+        Q(jornada_actual_fin__lt=fecha)
+        | Exists(vigente.exclude(pk=Coalesce(OuterRef('jornada_actual'), Value(0))))
+    )
+    return sincronizar_jornada_actual(desfasados, fecha)
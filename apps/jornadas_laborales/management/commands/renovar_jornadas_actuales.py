@@ -0,0 +1,31 @@
+# apps/jornadas_laborales/management/commands/renovar_jornadas_actuales.py
+
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.jornadas_laborales.jornada_actual import renovar_jornadas_actuales
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza la jornada actual de los trabajadores cuya asignación "
+        "terminó o empieza hoy. Programarlo al inicio de cada día."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fecha',
+            help='Día a aplicar en formato YYYY-MM-DD (por defecto hoy)'
+        )
+
+    def handle(self, *args, **options):
+        fecha = date.today()
+        if options['fecha']:
+            try:
+                fecha = datetime.strptime(options['fecha'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("La fecha debe tener el formato YYYY-MM-DD")
+
+        total = renovar_jornadas_actuales(fecha)
+        self.stdout.write(f"Trabajadores actualizados: {total} ({fecha.strftime('%d/%m/%Y')})")
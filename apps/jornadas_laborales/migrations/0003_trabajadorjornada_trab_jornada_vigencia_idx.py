@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornadas_laborales', '0002_remove_jornadalaboral_dias_semana_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trabajadorjornada',
+            index=models.Index(fields=['id_trabajador', 'fecha_fin'], name='trab_jornada_vigencia_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+def calcular_dias_mask(apps, schema_editor):
+    JornadaLaboral = apps.get_model('jornadas_laborales', 'JornadaLaboral')
+    JornadaDias = apps.get_model('jornadas_laborales', 'JornadaDias')
+
+    mascaras = {}
+    for id_jornada, numero_dia in JornadaDias.objects.values_list('id_jornada_id', 'numero_dia'):
+        mascaras[id_jornada] = mascaras.get(id_jornada, 0) | (1 << (numero_dia - 1))
+
+    for id_jornada, mascara in mascaras.items():
+        JornadaLaboral.objects.filter(pk=id_jornada).update(dias_mask=mascara)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornadas_laborales', '0003_trabajadorjornada_trab_jornada_vigencia_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jornadalaboral',
+            name='dias_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Días (máscara)'),
+        ),
+        migrations.RunPython(calcular_dias_mask, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from datetime import timedelta
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+# Vigencia de cada asignación como daterange(fecha_inicio, fecha_fin, '[]')
+# con una restricción de exclusión: un trabajador no puede tener dos
+# asignaciones que se traslapen. Su índice GiST (id_trabajador_id, vigencia)
+# resuelve "qué jornada aplicaba en la fecha X" con una sola búsqueda
+# (ver TrabajadorJornadaQuerySet.vigentes_en). Igual que las migraciones de
+# búsqueda de trabajadores, solo aplica en PostgreSQL.
+RESTRICCION = 'trabajador_jornada_sin_traslape'
+
+
+def cerrar_traslapes(schema_editor):
+    """
+    Corrige los traslapes existentes antes de crear la restricción.
+
+    Hasta ahora ganaba la asignación con fecha_inicio más reciente, así que
+    cerrar la anterior el día previo conserva el mismo resultado siempre que
+    la posterior llegue al menos hasta donde llegaba la anterior. Si la
+    posterior queda contenida en la anterior no hay un cierre equivalente y
+    la migración se detiene para corregirlo a mano.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.id_trabajador_jornada, a.fecha_fin, MIN(b.fecha_inicio), "
+            "BOOL_OR(b.fecha_fin IS NOT NULL AND (a.fecha_fin IS NULL OR b.fecha_fin < a.fecha_fin)) "
+            "FROM trabajador_jornada a JOIN trabajador_jornada b "
+            "ON b.id_trabajador_id = a.id_trabajador_id "
+            "AND b.fecha_inicio > a.fecha_inicio "
+            "AND (a.fecha_fin IS NULL OR b.fecha_inicio <= a.fecha_fin) "
+            "GROUP BY a.id_trabajador_jornada, a.fecha_fin"
+        )
+        traslapes = cursor.fetchall()
+
+        contenidas = [str(pk) for pk, _, _, contiene in traslapes if contiene]
+        if contenidas:
+            raise RuntimeError(
+                "Hay asignaciones de jornada que contienen a otras posteriores "
+                f"(id_trabajador_jornada: {', '.join(contenidas[:20])}). "
+                "Corríjalas desde el admin y vuelva a ejecutar migrate."
+            )
+
+        cursor.executemany(
+            "UPDATE trabajador_jornada SET fecha_fin = %s WHERE id_trabajador_jornada = %s",
+            [(siguiente - timedelta(days=1), pk) for pk, _, siguiente, _ in traslapes],
+        )
+
+
+def crear_restriccion(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    cerrar_traslapes(schema_editor)
+    schema_editor.execute(
+        f"ALTER TABLE trabajador_jornada ADD CONSTRAINT {RESTRICCION} "
+        "EXCLUDE USING gist (id_trabajador_id WITH =, "
+        "daterange(fecha_inicio, fecha_fin, '[]') WITH &&)"
+    )
+
+
+def eliminar_restriccion(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'ALTER TABLE trabajador_jornada DROP CONSTRAINT IF EXISTS {RESTRICCION}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornadas_laborales', '0004_jornadalaboral_dias_mask'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(crear_restriccion, eliminar_restriccion),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornadas_laborales', '0005_trabajadorjornada_sin_traslape'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReglaDiaInhabil',
+            fields=[
+                ('id_regla', models.AutoField(primary_key=True, serialize=False)),
+                ('descripcion', models.CharField(help_text='Ej: Día de la Independencia', max_length=200, verbose_name='Descripción')),
+                ('tipo', models.CharField(choices=[('fija', 'Fecha fija'), ('semana', 'Día de la semana del mes')], default='fija', max_length=10, verbose_name='Tipo')),
+                ('mes', models.PositiveSmallIntegerField(choices=[(1, 'Enero'), (2, 'Febrero'), (3, 'Marzo'), (4, 'Abril'), (5, 'Mayo'), (6, 'Junio'), (7, 'Julio'), (8, 'Agosto'), (9, 'Septiembre'), (10, 'Octubre'), (11, 'Noviembre'), (12, 'Diciembre')], verbose_name='Mes')),
+                ('dia', models.PositiveSmallIntegerField(blank=True, help_text='Solo para fecha fija', null=True, verbose_name='Día del mes')),
+                ('dia_semana', models.PositiveSmallIntegerField(blank=True, choices=[(1, 'Lunes'), (2, 'Martes'), (3, 'Miércoles'), (4, 'Jueves'), (5, 'Viernes'), (6, 'Sábado'), (7, 'Domingo')], null=True, verbose_name='Día de la semana')),
+                ('ordinal', models.SmallIntegerField(blank=True, choices=[(1, 'Primer'), (2, 'Segundo'), (3, 'Tercer'), (4, 'Cuarto'), (5, 'Quinto'), (-1, 'Último')], help_text='Ej: Tercer (lunes de noviembre)', null=True, verbose_name='Ocurrencia')),
+                ('anio_inicio', models.PositiveSmallIntegerField(blank=True, help_text='Vacío = desde siempre', null=True, verbose_name='Desde el año')),
+                ('anio_fin', models.PositiveSmallIntegerField(blank=True, help_text='Vacío = sin fin', null=True, verbose_name='Hasta el año')),
+                ('activo', models.BooleanField(default=True, verbose_name='Activo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Actualización')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reglas_inhabiles_creadas', to=settings.AUTH_USER_MODEL, verbose_name='Creado por')),
+                ('updated_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reglas_inhabiles_modificadas', to=settings.AUTH_USER_MODEL, verbose_name='Modificado por')),
+            ],
+            options={
+                'verbose_name': 'Día Inhábil Recurrente',
+                'verbose_name_plural': 'Días Inhábiles Recurrentes',
+                'db_table': 'regla_dia_inhabil',
+                'ordering': ['mes', 'dia', 'ordinal'],
+            },
+        ),
+    ]
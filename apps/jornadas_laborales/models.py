@@ -1,14 +1,47 @@
 # apps/jornadas_laborales/models.py
 
-from django.db import models
+import calendar
+from datetime import date, timedelta
+
+from django.contrib.postgres.fields import DateRangeField
+from django.db import connections, models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 
+from apps.accounts.scope import ScopeQuerySet
+
 
 # =========================================================
 #   JORNADA LABORAL (Horarios de trabajo)
 # =========================================================
 
+# Días de la semana como en JornadaDias.numero_dia / date.isoweekday()
+NOMBRES_DIAS = {1: 'Lunes', 2: 'Martes', 3: 'Miércoles', 4: 'Jueves', 5: 'Viernes', 6: 'Sábado', 7: 'Domingo'}
+NOMBRES_CORTOS = {1: 'L', 2: 'M', 3: 'Mi', 4: 'J', 5: 'V', 6: 'S', 7: 'D'}
+
+
+def bit_dia(numero_dia):
+    """Bit del día en dias_mask: Lunes (1) es el bit 0 ... Domingo (7) el bit 6."""
+    return 1 << (numero_dia - 1)
+
+
+def mascara_dias(numeros_dia):
+    """Máscara de 7 bits para una lista de números de día."""
+    mascara = 0
+    for numero_dia in numeros_dia:
+        mascara |= bit_dia(int(numero_dia))
+    return mascara
+
+
+class JornadaLaboralQuerySet(models.QuerySet):
+
+    def que_laboran(self, numero_dia):
+        """Jornadas que incluyen el día (1 = Lunes ... 7 = Domingo), sin unir JornadaDias."""
+        return self.alias(
+            dia_laboral=models.F('dias_mask').bitand(bit_dia(numero_dia))
+        ).exclude(dia_laboral=0)
+
+
 class JornadaLaboral(models.Model):
     """
     Modelo para definir jornadas laborales (horarios de trabajo)
@@ -35,6 +68,15 @@ class JornadaLaboral(models.Model):
     
     hora_entrada = models.TimeField(verbose_name="Hora de Entrada")
     hora_salida = models.TimeField(verbose_name="Hora de Salida")
+
+    # Copia de JornadaDias en 7 bits (ver bit_dia). Se mantiene en
+    # asignar_dias() y en las señales de JornadaDias; permite saber si la
+    # jornada labora un día sin consultar la tabla de días.
+    dias_mask = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Días (máscara)"
+    )
     
     # Auditoría
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
@@ -56,6 +98,8 @@ class JornadaLaboral(models.Model):
         verbose_name="Modificado por"
     )
     
+    objects = JornadaLaboralQuerySet.as_manager()
+
     class Meta:
         db_table = 'jornada_laboral'
         verbose_name = 'Jornada Laboral'
@@ -69,24 +113,35 @@ class JornadaLaboral(models.Model):
     def descripcion_texto(self):
         """Mantener compatibilidad con código existente"""
         return self.get_descripcion_display()
+
+    @property
+    def numeros_dia(self):
+        """Días laborales (1 = Lunes ... 7 = Domingo) leídos de la máscara."""
+        return [numero_dia for numero_dia in NOMBRES_DIAS if self.dias_mask & bit_dia(numero_dia)]
+
+    @property
+    def nombres_dias(self):
+        return [NOMBRES_DIAS[numero_dia] for numero_dia in self.numeros_dia]
+
+    def labora(self, fecha):
+        """True si la jornada incluye el día de la semana de `fecha`."""
+        return bool(self.dias_mask & bit_dia(fecha.isoweekday()))
     
     @property
     def dias_texto(self):
         """Retorna los días en formato texto legible"""
-        dias = self.dias.all().order_by('numero_dia')
-        if not dias.exists():
+        nombres = self.nombres_dias
+        if not nombres:
             return "Sin días asignados"
-        return ', '.join([dia.get_numero_dia_display() for dia in dias])
+        return ', '.join(nombres)
     
     @property
     def dias_cortos(self):
         """Retorna los días en formato corto"""
-        dias = self.dias.all().order_by('numero_dia').values_list('numero_dia', flat=True)
-        if not dias:
+        dias_list = self.numeros_dia
+        if not dias_list:
             return "-"
         
-        dias_list = list(dias)
-        
         # Si son días consecutivos L-V
         if dias_list == [1, 2, 3, 4, 5]:
             return "L-V"
@@ -95,8 +150,29 @@ class JornadaLaboral(models.Model):
         elif dias_list == [1, 2, 3, 4, 5, 6, 7]:
             return "L-D"
         else:
-            nombres_cortos = {1: 'L', 2: 'M', 3: 'Mi', 4: 'J', 5: 'V', 6: 'S', 7: 'D'}
-            return ', '.join([nombres_cortos[d] for d in dias_list])
+            return ', '.join([NOMBRES_CORTOS[d] for d in dias_list])
+
+    def asignar_dias(self, numeros_dia):
+        """Reemplaza los días de la jornada y actualiza dias_mask."""
+        numeros_dia = sorted({int(numero_dia) for numero_dia in numeros_dia})
+        self.dias.all().delete()
+        JornadaDias.objects.bulk_create([
+            JornadaDias(id_jornada=self, numero_dia=numero_dia) for numero_dia in numeros_dia
+        ])
+        self.dias_mask = mascara_dias(numeros_dia)
+        JornadaLaboral.objects.filter(pk=self.pk).update(dias_mask=self.dias_mask)
+        self._invalidar_catalogo()
+
+    def sincronizar_dias_mask(self):
+        """Recalcula dias_mask desde JornadaDias (p. ej. tras editar días en el admin)."""
+        self.dias_mask = mascara_dias(self.dias.values_list('numero_dia', flat=True))
+        JornadaLaboral.objects.filter(pk=self.pk).update(dias_mask=self.dias_mask)
+        self._invalidar_catalogo()
+
+    def _invalidar_catalogo(self):
+        # update() no emite post_save: el catálogo cacheado muestra los días
+        from apps.accounts.catalogos import invalidar_catalogos
+        invalidar_catalogos()
     
     def clean(self):
         """Validaciones del modelo"""
@@ -193,10 +269,167 @@ class CalendarioLaboral(models.Model):
         return f"{self.fecha.strftime('%d/%m/%Y')} - {estado}"
 
 
+class ReglaDiaInhabil(models.Model):
+    """
+    Día inhábil que se repite cada año, sin registrarlo fecha por fecha:
+    una fecha fija (16 de septiembre) o el n-ésimo día de la semana de un
+    mes (tercer lunes de noviembre). Un registro de CalendarioLaboral en la
+    misma fecha tiene prioridad sobre la regla.
+    """
+    FECHA_FIJA = 'fija'
+    DIA_SEMANA = 'semana'
+    TIPO_CHOICES = [
+        (FECHA_FIJA, 'Fecha fija'),
+        (DIA_SEMANA, 'Día de la semana del mes'),
+    ]
+    MES_CHOICES = [
+        (1, 'Enero'), (2, 'Febrero'), (3, 'Marzo'), (4, 'Abril'),
+        (5, 'Mayo'), (6, 'Junio'), (7, 'Julio'), (8, 'Agosto'),
+        (9, 'Septiembre'), (10, 'Octubre'), (11, 'Noviembre'), (12, 'Diciembre'),
+    ]
+    ORDINAL_CHOICES = [
+        (1, 'Primer'), (2, 'Segundo'), (3, 'Tercer'), (4, 'Cuarto'), (5, 'Quinto'), (-1, 'Último'),
+    ]
+
+    id_regla = models.AutoField(primary_key=True)
+    descripcion = models.CharField(max_length=200, verbose_name="Descripción",
+                                   help_text="Ej: Día de la Independencia")
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES, default=FECHA_FIJA, verbose_name="Tipo")
+    mes = models.PositiveSmallIntegerField(choices=MES_CHOICES, verbose_name="Mes")
+    dia = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Día del mes",
+                                           help_text="Solo para fecha fija")
+    dia_semana = models.PositiveSmallIntegerField(null=True, blank=True, choices=list(NOMBRES_DIAS.items()),
+                                                  verbose_name="Día de la semana")
+    ordinal = models.SmallIntegerField(null=True, blank=True, choices=ORDINAL_CHOICES, verbose_name="Ocurrencia",
+                                       help_text="Ej: Tercer (lunes de noviembre)")
+    anio_inicio = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Desde el año",
+                                                   help_text="Vacío = desde siempre")
+    anio_fin = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Hasta el año",
+                                                help_text="Vacío = sin fin")
+    activo = models.BooleanField(default=True, verbose_name="Activo")
+
+    # Auditoría
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
+    created_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='reglas_inhabiles_creadas',
+        verbose_name="Creado por"
+    )
+    updated_by = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='reglas_inhabiles_modificadas',
+        verbose_name="Modificado por"
+    )
+
+    class Meta:
+        db_table = 'regla_dia_inhabil'
+        verbose_name = 'Día Inhábil Recurrente'
+        verbose_name_plural = 'Días Inhábiles Recurrentes'
+        ordering = ['mes', 'dia', 'ordinal']
+
+    def __str__(self):
+        mes = self.get_mes_display().lower()
+        if self.tipo == self.FECHA_FIJA:
+            return f"{self.descripcion} ({self.dia} de {mes})"
+        return f"{self.descripcion} ({self.get_ordinal_display().lower()} {self.get_dia_semana_display().lower()} de {mes})"
+
+    def clean(self):
+        if self.tipo == self.FECHA_FIJA:
+            if not self.dia:
+                raise ValidationError({'dia': 'Indique el día del mes'})
+            try:
+                # 2000 es bisiesto: acepta el 29 de febrero
+                date(2000, self.mes, self.dia)
+            except (TypeError, ValueError):
+                raise ValidationError({'dia': 'El día no existe en ese mes'})
+        else:
+            if not self.dia_semana:
+                raise ValidationError({'dia_semana': 'Indique el día de la semana'})
+            if not self.ordinal:
+                raise ValidationError({'ordinal': 'Indique la ocurrencia (primer, segundo, ..., último)'})
+
+        if self.anio_inicio and self.anio_fin and self.anio_fin < self.anio_inicio:
+            raise ValidationError({'anio_fin': 'El año final no puede ser anterior al inicial'})
+
+    def fecha_en(self, anio):
+        """Fecha de la regla en `anio`, o None si no aplica ese año."""
+        if (self.anio_inicio and anio < self.anio_inicio) or (self.anio_fin and anio > self.anio_fin):
+            return None
+
+        if self.tipo == self.FECHA_FIJA:
+            try:
+                return date(anio, self.mes, self.dia)
+            except ValueError:  # 29 de febrero en año no bisiesto
+                return None
+
+        ultimo_dia = calendar.monthrange(anio, self.mes)[1]
+        if self.ordinal == -1:
+            ultimo = date(anio, self.mes, ultimo_dia)
+            return ultimo - timedelta(days=(ultimo.isoweekday() - self.dia_semana) % 7)
+
+        primero = date(anio, self.mes, 1)
+        dia = 1 + (self.dia_semana - primero.isoweekday()) % 7 + (self.ordinal - 1) * 7
+        return date(anio, self.mes, dia) if dia <= ultimo_dia else None
+
+
 # =========================================================
 #   ASIGNACIÓN TRABAJADOR-JORNADA (Quién trabaja en qué horario)
 # =========================================================
 
+class Vigencia(models.Func):
+    """
+    daterange(fecha_inicio, fecha_fin, '[]'): ambos extremos incluidos y
+    fecha_fin NULL = sin fin. Es la misma expresión de la restricción de
+    exclusión de la migración 0005 (PostgreSQL), cuyo índice GiST usan
+    `@>` y `&&`.
+    """
+    function = 'daterange'
+    template = "%(function)s(%(expressions)s, '[]')"
+    output_field = DateRangeField()
+
+    def __init__(self, fecha_inicio='fecha_inicio', fecha_fin='fecha_fin'):
+        super().__init__(fecha_inicio, fecha_fin)
+
+
+class TrabajadorJornadaQuerySet(ScopeQuerySet):
+
+    def _es_postgres(self):
+        return connections[self.db].vendor == 'postgresql'
+
+    def vigentes_en(self, fecha):
+        """
+        Asignaciones que cubren `fecha`, la más reciente primero.
+
+        En PostgreSQL es `vigencia @> fecha` sobre el índice GiST; en otros
+        motores, la comparación equivalente de columnas.
+        """
+        if self._es_postgres():
+            qs = self.alias(vigencia=Vigencia()).filter(vigencia__contains=fecha)
+        else:
+            qs = self.filter(fecha_inicio__lte=fecha).filter(
+                models.Q(fecha_fin__isnull=True) | models.Q(fecha_fin__gte=fecha)
+            )
+        return qs.order_by('-fecha_inicio')
+
+    def traslapan(self, fecha_inicio, fecha_fin=None):
+        """Asignaciones que se traslapan con el periodo (fecha_fin None = sin fin)."""
+        if self._es_postgres():
+            return self.alias(vigencia=Vigencia()).filter(
+                vigencia__overlap=Vigencia(models.Value(fecha_inicio), models.Value(fecha_fin))
+            )
+        qs = self.filter(models.Q(fecha_fin__isnull=True) | models.Q(fecha_fin__gte=fecha_inicio))
+        if fecha_fin is not None:
+            qs = qs.filter(fecha_inicio__lte=fecha_fin)
+        return qs
+
+
 class TrabajadorJornada(models.Model):
     id_trabajador_jornada = models.AutoField(primary_key=True)
     
@@ -238,12 +471,18 @@ class TrabajadorJornada(models.Model):
         verbose_name="Modificado por"
     )
     
+    objects = TrabajadorJornadaQuerySet.as_manager()
+
     class Meta:
         db_table = 'trabajador_jornada'
         verbose_name = 'Asignación de Jornada'
         verbose_name_plural = 'Asignaciones de Jornadas'
         ordering = ['-fecha_inicio']
         unique_together = [['id_trabajador', 'fecha_inicio']]
+        indexes = [
+            # Alcance por trabajador + vigencia (fecha_fin NULL o >= hoy)
+            models.Index(fields=['id_trabajador', 'fecha_fin'], name='trab_jornada_vigencia_idx'),
+        ]
     
     def __str__(self):
         return f"{self.id_trabajador.nombre_completo} - {self.id_jornada.descripcion}"
@@ -258,7 +497,23 @@ class TrabajadorJornada(models.Model):
     
     def clean(self):
         """Validaciones del modelo"""
-        if self.fecha_fin and self.fecha_fin < self.fecha_inicio:
+        if self.fecha_fin and self.fecha_inicio and self.fecha_fin < self.fecha_inicio:
             raise ValidationError({
                 'fecha_fin': 'La fecha de fin no puede ser anterior a la fecha de inicio'
-            })
\ No newline at end of file
+            })
+
+        # Traslapes con otras asignaciones del mismo trabajador (en
+        # PostgreSQL además lo impide la restricción de exclusión)
+        if self.id_trabajador_id and self.fecha_inicio:
+            traslape = TrabajadorJornada.objects.filter(
+                id_trabajador_id=self.id_trabajador_id
+            ).traslapan(self.fecha_inicio, self.fecha_fin).exclude(
+                pk=self.pk
+            ).select_related('id_jornada').first()
+
+            if traslape:
+                raise ValidationError(
+                    f"El trabajador ya tiene asignada la jornada '{traslape.id_jornada.descripcion}' "
+                    f"desde {traslape.fecha_inicio.strftime('%d/%m/%Y')}. "
+                    f"Debe finalizar esa asignación antes de crear una nueva."
+                )
\ No newline at end of file
@@ -0,0 +1,75 @@
+# apps/jornadas_laborales/signals.py
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.trabajadores.models import Trabajador
+
+from .calendario import aplicar_cambio_regla, invalidar_calendario
+from .jornada_actual import sincronizar_jornada_actual
+from .models import CalendarioLaboral, JornadaDias, JornadaLaboral, ReglaDiaInhabil, TrabajadorJornada
+
+
+# =========================================================
+#   MÁSCARA DE DÍAS
+# =========================================================
+# asignar_dias() ya deja la máscara correcta; estas señales cubren los
+# cambios hechos fila por fila (inline del admin, shell, fixtures).
+
+@receiver(post_save, sender=JornadaDias, dispatch_uid='jornada_dias_mask_save')
+@receiver(post_delete, sender=JornadaDias, dispatch_uid='jornada_dias_mask_delete')
+def sincronizar_dias_mask(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Basta la llave primaria: no hace falta leer la jornada
+    JornadaLaboral(pk=instance.id_jornada_id).sincronizar_dias_mask()
+
+
+# =========================================================
+#   JORNADA ACTUAL DEL TRABAJADOR
+# =========================================================
+# Cubre las vistas de asignaciones y el admin; la asignación masiva
+# sincroniza por su cuenta después del bulk_create.
+
+@receiver(post_save, sender=TrabajadorJornada, dispatch_uid='trabajador_jornada_actual_save')
+@receiver(post_delete, sender=TrabajadorJornada, dispatch_uid='trabajador_jornada_actual_delete')
+def sincronizar_jornada_actual_por_cambio(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sincronizar_jornada_actual(Trabajador.objects.filter(pk=instance.id_trabajador_id))
+
+
+# =========================================================
+#   CALENDARIO LABORAL
+# =========================================================
+# Sube la versión del índice de días inhábiles (calendario.py) para que
+# todos los procesos lo vuelvan a cargar. Espera a que se confirme la
+# transacción (el admin guarda dentro de una): si otro proceso revisara la
+# versión antes, armaría el índice con los datos viejos y lo conservaría
+# hasta el siguiente cambio.
+
+@receiver(post_save, sender=CalendarioLaboral, dispatch_uid='calendario_laboral_save')
+@receiver(post_delete, sender=CalendarioLaboral, dispatch_uid='calendario_laboral_delete')
+def invalidar_calendario_por_cambio(sender, **kwargs):
+    transaction.on_commit(invalidar_calendario)
+
+
+# Una regla cambia el estatus de asistencias ya registradas en todos los años
+# en que aplica: además de invalidar se recalculan las fechas de la regla, las
+# de antes y las de después de editarla.
+
+@receiver(pre_save, sender=ReglaDiaInhabil, dispatch_uid='regla_dia_inhabil_anterior')
+def recordar_regla_anterior(sender, instance, raw=False, **kwargs):
+    instance._anterior = None
+    if instance.pk and not raw:
+        instance._anterior = ReglaDiaInhabil.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=ReglaDiaInhabil, dispatch_uid='regla_dia_inhabil_save')
+@receiver(post_delete, sender=ReglaDiaInhabil, dispatch_uid='regla_dia_inhabil_delete')
+def recalcular_por_regla(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_anterior', None)
+    transaction.on_commit(lambda: aplicar_cambio_regla(instance, anterior))
@@ -17,12 +17,15 @@ urlpatterns = [
     # ========== CALENDARIO LABORAL ==========
     path('calendario/', views.CalendarioListView.as_view(), name='calendario'),
     path('calendario/crear/', views.CalendarioCreateView.as_view(), name='calendario_crear'),
+    path('calendario/periodo/', views.CalendarioRangoView.as_view(), name='calendario_periodo'),
+    path('calendario/importar/', views.CalendarioImportarView.as_view(), name='calendario_importar'),
     path('calendario/<int:pk>/editar/', views.CalendarioUpdateView.as_view(), name='calendario_editar'),
     path('calendario/<int:pk>/eliminar/', views.CalendarioDeleteView.as_view(), name='calendario_eliminar'),
 
     # ========== ASIGNACIONES ==========
     path('asignaciones/', views.AsignacionListView.as_view(), name='asignaciones'),
     path('asignaciones/crear/', views.AsignacionCreateView.as_view(), name='asignacion_crear'),
+    path('asignaciones/masiva/', views.AsignacionMasivaView.as_view(), name='asignacion_masiva'),
     path('asignaciones/<int:pk>/editar/', views.AsignacionUpdateView.as_view(), name='asignacion_editar'),
     path('asignaciones/<int:pk>/eliminar/', views.AsignacionDeleteView.as_view(), name='asignacion_eliminar'),
 
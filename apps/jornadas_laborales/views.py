@@ -1,35 +1,46 @@
 # apps/jornadas_laborales/views.py
 
+import asyncio
 from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.http import Http404
 from django.contrib import messages
 from django.utils.decorators import method_decorator
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q, Exists, OuterRef
+from django.db.models import Count, Q, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.deletion import ProtectedError
 from django.utils import timezone
 from django.views.generic import (
-    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, FormView
 )
 
 from .models import (
     JornadaLaboral,
     CalendarioLaboral,
-    TrabajadorJornada,
-    JornadaDias
+    TrabajadorJornada
 )
 
 from apps.trabajadores.models import Trabajador
-from apps.unidades.models import UnidadAdministrativa
+from apps.trabajadores.widgets import etiqueta_trabajador
 
 from .forms import (
     JornadaLaboralForm,
     CalendarioLaboralForm,
-    AsignarJornadaForm
+    AsignarJornadaForm,
+    AsignacionMasivaForm,
+    RangoCalendarioForm,
+    ImportarCalendarioForm
 )
+from .asignacion_masiva import asignar_jornada_masiva
+from .calendario import dias_inhabiles, inhabiles_entre, registrar_dias
 
+from apps.accounts import catalogos
+from apps.accounts.concurrencia import ejecutar_concurrentes
 from apps.accounts.decorators import (
     rol_requerido,
     requiere_trabajador_y_unidad,
@@ -44,7 +55,7 @@ from apps.accounts.decorators import (
 # =========================================================
 
 @method_decorator([rol_requerido('admin', 'jefe'), requiere_trabajador_y_unidad], name='dispatch')
-class JornadaListView(LoginRequiredMixin, ListView):
+class JornadaListView(ListView):
     model = JornadaLaboral
     template_name = 'jornadas_laborales/lista_jornadas.html'
     context_object_name = 'jornadas'
@@ -52,42 +63,25 @@ class JornadaListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         hoy = date.today()
-        user = self.request.user
-
-        # 🔹 Si es jefe, anotar solo trabajadores de su unidad
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            unidad = user.perfil.id_trabajador.id_unidad
-            # Anotamos con trabajadores de la unidad del jefe
-            qs = JornadaLaboral.objects.prefetch_related('dias').annotate(
-                num_dias=Count('dias', distinct=True),
-                num_trabajadores=Count(
-                    'trabajadores_asignados',
-                    filter=Q(trabajadores_asignados__id_trabajador__id_unidad=unidad),
-                    distinct=True
-                ),
-                num_trabajadores_activos=Count(
-                    'trabajadores_asignados',
-                    filter=(
-                        Q(trabajadores_asignados__id_trabajador__id_unidad=unidad) &
-                        (Q(trabajadores_asignados__fecha_fin__isnull=True) | Q(trabajadores_asignados__fecha_fin__gte=hoy))
-                    ),
-                    distinct=True
-                )
-            ).order_by('descripcion')
-            
-            # Mostrar jornadas que tienen trabajadores de su unidad asignados
-            qs = qs.filter(trabajadores_asignados__id_trabajador__id_unidad=unidad).distinct()
-        else:
-            # Admin ve todo
-            qs = JornadaLaboral.objects.prefetch_related('dias').annotate(
-                num_dias=Count('dias', distinct=True),
-                num_trabajadores=Count('trabajadores_asignados', distinct=True),
-                num_trabajadores_activos=Count(
-                    'trabajadores_asignados',
-                    filter=Q(trabajadores_asignados__fecha_fin__isnull=True) | Q(trabajadores_asignados__fecha_fin__gte=hoy),
-                    distinct=True
-                )
-            ).order_by('descripcion')
+        scope = self.request.scope
+
+        # Asignaciones de cada jornada; el jefe solo cuenta las de su unidad
+        asignaciones = TrabajadorJornada.objects.visible_to(scope).filter(id_jornada=OuterRef('pk'))
+        vigentes = asignaciones.filter(Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy))
+
+        # Subconsulta correlacionada por jornada de la página: sin JOIN ni
+        # COUNT(DISTINCT) sobre todo el historial de asignaciones
+        qs = JornadaLaboral.objects.annotate(
+            num_trabajadores_activos=Coalesce(Subquery(
+                vigentes.order_by().values('id_jornada').annotate(
+                    total=Count('id_trabajador_jornada')
+                ).values('total')
+            ), 0)
+        ).order_by('descripcion')
+
+        # 🔹 Si es jefe: solo jornadas que tienen trabajadores de su unidad asignados
+        if scope.es_jefe() and scope.tiene_unidad:
+            qs = qs.filter(Exists(asignaciones))
 
         # 🔹 FILTRO desde GET - Solo tipo de jornada
         tipo = self.request.GET.get('tipo', '')
@@ -98,103 +92,91 @@ class JornadaListView(LoginRequiredMixin, ListView):
 
         return qs
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    async def dispatch(self, request, *args, **kwargs):
+        # Asíncrono para que los decoradores de rol verifiquen fuera del event loop
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        """
+        La página de jornadas (paginación) y las estadísticas son independientes:
+        se calculan al mismo tiempo y la latencia es la de la consulta más lenta.
+        """
+        self.object_list = self.get_queryset()
+        consultas, lentas = self.get_consultas_estadisticas()
+
+        context, estadisticas = await asyncio.gather(
+            sync_to_async(self.get_context_data)(),
+            ejecutar_concurrentes(consultas, lentas, timeout=settings.CONSULTAS_TIMEOUT),
+        )
+        context.update(estadisticas)
+        context['es_jefe'] = self.request.scope.es_jefe() and self.request.scope.tiene_unidad
+        return self.render_to_response(context)
+
+    def get_consultas_estadisticas(self):
+        """
+        Consultas de las tarjetas y pestañas, como callables independientes
+        para ejecutar_concurrentes. Los conteos se degradan a "n/a".
+        """
+        scope = self.request.scope
         hoy = date.today()
+        vigente = Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
+
+        # Trabajadores: jornada actual desnormalizada. Jornadas: asignaciones
+        # vigentes (del alcance) correlacionadas con la fila externa
+        con_jornada = Q(jornada_actual__isnull=False) & ~Q(jornada_actual_fin__lt=hoy)
+        asignaciones_vigentes = TrabajadorJornada.objects.visible_to(scope).filter(vigente)
+        jornada_en_uso = Exists(asignaciones_vigentes.filter(id_jornada=OuterRef('pk')))
+
+        # Cada tarjeta es un COUNT(...) FILTER (WHERE ...) dentro de un solo
+        # aggregate: una consulta para trabajadores y otra para jornadas
+        def trabajadores():
+            totales = Trabajador.objects.visible_to(scope).aggregate(
+                activos=Count('id_trabajador', filter=Q(activo=True)),
+                con_jornada=Count('id_trabajador', filter=con_jornada),
+                sin_jornada=Count('id_trabajador', filter=Q(~con_jornada, activo=True)),
+            )
+            return totales['activos'], totales['con_jornada'], totales['sin_jornada']
 
-        # Base queryset según rol
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            unidad = user.perfil.id_trabajador.id_unidad
-            # Jornadas que tienen trabajadores de la unidad del jefe
-            jornadas_qs = JornadaLaboral.objects.filter(
-                trabajadores_asignados__id_trabajador__id_unidad=unidad
-            ).distinct()
-            trabajadores_qs = Trabajador.objects.filter(id_unidad=unidad, activo=True)
-            
-            # Estadísticas específicas para jefes
-            # 1. Total de trabajadores en su unidad
-            context['total_trabajadores_unidad'] = trabajadores_qs.count()
-            
-            # 2. Trabajadores con jornada asignada (de su unidad)
-            trabajadores_con_jornada = TrabajadorJornada.objects.filter(
-                id_trabajador__id_unidad=unidad
-            ).filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-            ).values_list('id_trabajador', flat=True).distinct()
-            context['trabajadores_con_jornada'] = len(trabajadores_con_jornada)
-            
-            # 3. Trabajadores sin jornada vigente (de su unidad)
-            context['trabajadores_sin_jornada'] = trabajadores_qs.exclude(
-                id_trabajador__in=trabajadores_con_jornada
-            ).count()
-            
-            # 4. Jornadas activas en su unidad
-            context['jornadas_activas_unidad'] = jornadas_qs.filter(
-                trabajadores_asignados__fecha_fin__isnull=True
-            ).distinct().count() or jornadas_qs.filter(
-                trabajadores_asignados__fecha_fin__gte=hoy
-            ).distinct().count()
-            
-            # No mostrar estadísticas globales irrelevantes para jefes
-            context['es_jefe'] = True
+        def jornadas():
+            totales = JornadaLaboral.objects.aggregate(
+                total=Count('id_jornada'),
+                en_uso=Count('id_jornada', filter=jornada_en_uso),
+            )
+            return totales['total'], totales['en_uso'], totales['total'] - totales['en_uso']
+
+        if scope.es_jefe() and scope.tiene_unidad:
+            # Estadísticas específicas para jefes (sin estadísticas globales);
+            # para el jefe "en uso" ya es "con trabajadores vigentes de su unidad"
+            lentas = {
+                ('total_trabajadores_unidad', 'trabajadores_con_jornada', 'trabajadores_sin_jornada'): trabajadores,
+                'jornadas_activas_unidad': lambda: jornadas()[1],
+            }
         else:
-            # Admin ve todo
-            jornadas_qs = JornadaLaboral.objects.all()
-            trabajadores_qs = Trabajador.objects.filter(activo=True)
-
-            # 1. Total de jornadas
-            context['total_jornadas'] = jornadas_qs.count()
-
-            # 2. Jornadas en uso (tienen al menos un trabajador con asignación vigente)
-            jornadas_en_uso = jornadas_qs.filter(
-                Exists(
-                    TrabajadorJornada.objects.filter(
-                        id_jornada=OuterRef('pk')
-                    ).filter(
-                        Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-                    )
-                )
-            ).count()
-            context['jornadas_en_uso'] = jornadas_en_uso
-
-            # 3. Jornadas sin uso (no tienen trabajadores vigentes)
-            context['jornadas_sin_uso'] = context['total_jornadas'] - jornadas_en_uso
-
-            # 4. Trabajadores sin jornada vigente
-            trabajadores_con_jornada = TrabajadorJornada.objects.filter(
-                Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-            ).values_list('id_trabajador', flat=True)
-            context['trabajadores_sin_jornada'] = trabajadores_qs.exclude(
-                id_trabajador__in=trabajadores_con_jornada
-            ).count()
-
-            # 5. Días inhábiles próximos (próximos 30 días)
+            # Días inhábiles próximos (próximos 30 días)
             fecha_limite = hoy + timedelta(days=30)
-            context['dias_inhabiles_proximos'] = CalendarioLaboral.objects.filter(
-                fecha__gte=hoy,
-                fecha__lte=fecha_limite,
-                es_inhabil=True
-            ).count()
-            
-            context['es_jefe'] = False
-
-        # Asignaciones para el tab de asignaciones
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            context['asignaciones'] = TrabajadorJornada.objects.filter(
-                id_trabajador__id_unidad=unidad
-            ).select_related('id_trabajador', 'id_jornada').order_by('-fecha_inicio')[:20]
-        else:
-            context['asignaciones'] = TrabajadorJornada.objects.all().select_related(
-                'id_trabajador', 'id_jornada'
-            ).order_by('-fecha_inicio')[:20]
-
-        # Calendario laboral para el tab de calendario
-        context['dias_calendario'] = CalendarioLaboral.objects.filter(
-            fecha__gte=hoy - timedelta(days=30)
-        ).order_by('fecha')[:30]
 
-        return context
+            lentas = {
+                ('total_jornadas', 'jornadas_en_uso', 'jornadas_sin_uso'): jornadas,
+                'trabajadores_sin_jornada': lambda: trabajadores()[2],
+                # Del índice: incluye los días de las reglas recurrentes
+                'dias_inhabiles_proximos': lambda: len(inhabiles_entre(hoy, fecha_limite)),
+            }
+
+        consultas = {
+            # Asignaciones para el tab de asignaciones
+            'asignaciones': lambda: list(
+                TrabajadorJornada.objects.visible_to(scope).select_related(
+                    'id_trabajador', 'id_jornada'
+                ).order_by('-fecha_inicio')[:20]
+            ),
+            # Calendario laboral para el tab de calendario
+            'dias_calendario': lambda: list(
+                CalendarioLaboral.objects.filter(
+                    fecha__gte=hoy - timedelta(days=30)
+                ).order_by('fecha')[:30]
+            ),
+        }
+        return consultas, lentas
 
 
 
@@ -207,13 +189,10 @@ class JornadaDetailView(LoginRequiredMixin, DetailView):
     def get_object(self, queryset=None):
         obj = super().get_object(queryset)
 
-        user = self.request.user
-        if user.perfil.es_jefe():
-            unidad = user.perfil.id_trabajador.id_unidad
-
-            pertenece = TrabajadorJornada.objects.filter(
-                id_jornada=obj,
-                id_trabajador__id_unidad=unidad
+        scope = self.request.scope
+        if scope.es_jefe():
+            pertenece = TrabajadorJornada.objects.visible_to(scope).filter(
+                id_jornada=obj
             ).exists()
 
             if not pertenece:
@@ -225,14 +204,11 @@ class JornadaDetailView(LoginRequiredMixin, DetailView):
         obj = self.get_object()
 
         # Si es jefe → validar que la jornada sea de su unidad
-        user = request.user
-        if user.perfil.es_jefe():
-            unidad_jefe = user.perfil.id_trabajador.id_unidad
-
+        scope = request.scope
+        if scope.es_jefe():
             # jornada pertenece a su unidad?
-            pertenece = TrabajadorJornada.objects.filter(
-                id_jornada=obj,
-                id_trabajador__id_unidad=unidad_jefe
+            pertenece = TrabajadorJornada.objects.visible_to(scope).filter(
+                id_jornada=obj
             ).exists()
 
             if not pertenece:
@@ -246,7 +222,7 @@ class JornadaDetailView(LoginRequiredMixin, DetailView):
         jornada = self.get_object()
         hoy = date.today()
 
-        context['dias_asignados'] = jornada.dias.all().order_by('numero_dia')
+        context['dias_asignados'] = jornada.nombres_dias
         context['hoy'] = hoy
         
         # Trabajadores vigentes = fecha_fin NULL o >= hoy
@@ -286,12 +262,8 @@ class JornadaCreateView(LoginRequiredMixin, CreateView):
         jornada.created_by = self.request.user
         jornada.save()
 
-        # Guardar días laborales
-        for dia in form.cleaned_data['dias']:
-            JornadaDias.objects.create(
-                id_jornada=jornada,
-                numero_dia=int(dia)
-            )
+        # Guardar días laborales (y su máscara)
+        jornada.asignar_dias(form.cleaned_data['dias'])
         
         messages.success(
             self.request,
@@ -317,8 +289,7 @@ class JornadaUpdateView(LoginRequiredMixin, UpdateView):
         initial = super().get_initial()
         # Cargar los días existentes de la jornada
         jornada = self.get_object()
-        dias_existentes = list(jornada.dias.values_list('numero_dia', flat=True))
-        initial['dias'] = [str(d) for d in dias_existentes]
+        initial['dias'] = [str(d) for d in jornada.numeros_dia]
         return initial
 
     def form_valid(self, form):
@@ -326,13 +297,8 @@ class JornadaUpdateView(LoginRequiredMixin, UpdateView):
         jornada.updated_by = self.request.user
         jornada.save()
 
-        # Actualizar días laborales
-        JornadaDias.objects.filter(id_jornada=jornada).delete()
-        for dia in form.cleaned_data['dias']:
-            JornadaDias.objects.create(
-                id_jornada=jornada,
-                numero_dia=int(dia)
-            )
+        # Actualizar días laborales (y su máscara)
+        jornada.asignar_dias(form.cleaned_data['dias'])
         
         messages.success(
             self.request,
@@ -344,14 +310,11 @@ class JornadaUpdateView(LoginRequiredMixin, UpdateView):
         obj = self.get_object()
 
         # Si es jefe → validar que la jornada sea de su unidad
-        user = request.user
-        if user.perfil.es_jefe():
-            unidad_jefe = user.perfil.id_trabajador.id_unidad
-
+        scope = request.scope
+        if scope.es_jefe():
             # jornada pertenece a su unidad?
-            pertenece = TrabajadorJornada.objects.filter(
-                id_jornada=obj,
-                id_trabajador__id_unidad=unidad_jefe
+            pertenece = TrabajadorJornada.objects.visible_to(scope).filter(
+                id_jornada=obj
             ).exists()
 
             if not pertenece:
@@ -403,14 +366,11 @@ class JornadaDeleteView(LoginRequiredMixin, DeleteView):
         obj = self.get_object()
 
         # Si es jefe → validar que la jornada sea de su unidad
-        user = request.user
-        if user.perfil.es_jefe():
-            unidad_jefe = user.perfil.id_trabajador.id_unidad
-
+        scope = request.scope
+        if scope.es_jefe():
             # jornada pertenece a su unidad?
-            pertenece = TrabajadorJornada.objects.filter(
-                id_jornada=obj,
-                id_trabajador__id_unidad=unidad_jefe
+            pertenece = TrabajadorJornada.objects.visible_to(scope).filter(
+                id_jornada=obj
             ).exists()
 
             if not pertenece:
@@ -441,14 +401,17 @@ class CalendarioListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_dias_inhabiles'] = CalendarioLaboral.objects.filter(
-            es_inhabil=True
-        ).count()
-        context['proximos_inhabiles'] = CalendarioLaboral.objects.filter(
-            es_inhabil=True,
-            fecha__gte=date.today()
-        ).order_by('fecha')[:5]
-        context['es_admin'] = self.request.user.perfil.es_admin()
+        # Del índice de días inhábiles: registros y reglas recurrentes
+        hoy = date.today()
+        context['total_dias_inhabiles'] = len(dias_inhabiles(hoy.year))
+        context['proximos_inhabiles'] = inhabiles_entre(hoy, hoy + timedelta(days=365))[:5]
+        # Los días de las reglas no son registros: van al calendario como
+        # eventos de solo lectura (del año anterior al siguiente)
+        context['dias_por_regla'] = [
+            dia for dia in inhabiles_entre(date(hoy.year - 1, 1, 1), date(hoy.year + 1, 12, 31))
+            if dia.regla is not None
+        ]
+        context['es_admin'] = self.request.scope.es_admin()
         return context
 
 
@@ -519,6 +482,49 @@ class CalendarioDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+@method_decorator(admin_requerido, name='dispatch')
+class CalendarioRangoView(LoginRequiredMixin, FormView):
+    """
+    Registrar un periodo de días (vacaciones) en el calendario laboral
+    Acceso: Solo Admin
+    """
+    form_class = RangoCalendarioForm
+    template_name = 'jornadas_laborales/calendario/alta_masiva.html'
+    success_url = reverse_lazy('jornadas:calendario')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # La página muestra los dos formularios; el que no se envió va vacío
+        context.setdefault('form_rango', context['form'])
+        context.setdefault('form_ics', ImportarCalendarioForm())
+        return context
+
+    def form_valid(self, form):
+        resultado = registrar_dias(
+            form.dias(),
+            es_inhabil=form.cleaned_data['es_inhabil'],
+            usuario=self.request.user,
+        )
+        if resultado.creados:
+            messages.success(self.request, f"Calendario actualizado: {resultado}")
+        else:
+            messages.warning(self.request, f"No se registró ningún día: {resultado}")
+        return super().form_valid(form)
+
+
+class CalendarioImportarView(CalendarioRangoView):
+    """
+    Importar días festivos desde un archivo .ics
+    Acceso: Solo Admin
+    """
+    form_class = ImportarCalendarioForm
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('form_rango', RangoCalendarioForm())
+        kwargs.setdefault('form_ics', kwargs.get('form') or self.get_form())
+        return super().get_context_data(**kwargs)
+
+
 # =========================================================
 #   ASIGNACIONES DE JORNADAS - LIST & CRUD
 # =========================================================
@@ -535,24 +541,16 @@ class AsignacionListView(LoginRequiredMixin, ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        qs = TrabajadorJornada.objects.select_related(
-            'id_trabajador', 'id_jornada', 'id_trabajador__id_unidad'
-        ).order_by('-fecha_inicio')
-
-        user = self.request.user
+        scope = self.request.scope
 
         # 🔹 Filtro por unidad del jefe (si no es admin)
-        if user.perfil.es_jefe() and not user.perfil.es_admin():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
-                qs = qs.filter(id_trabajador__id_unidad=unidad)
-            else:
-                # Si el jefe no tiene trabajador asignado, no ve nada
-                qs = TrabajadorJornada.objects.none()
+        qs = TrabajadorJornada.objects.visible_to(scope).select_related(
+            'id_trabajador', 'id_jornada', 'id_trabajador__id_unidad'
+        ).order_by('-fecha_inicio')
         
         # 🔹 Filtro por unidad (solo para admin)
         unidad_id = self.request.GET.get('unidad')
-        if unidad_id and user.perfil.es_admin():
+        if unidad_id and scope.es_admin():
             qs = qs.filter(id_trabajador__id_unidad_id=unidad_id)
         
         # 🔹 Filtro por trabajador (por ID)
@@ -575,27 +573,13 @@ class AsignacionListView(LoginRequiredMixin, ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
+        scope = self.request.scope
         
-        # Filtrar unidades y trabajadores según el rol
-        if user.perfil.es_admin():
-            context['unidades'] = UnidadAdministrativa.objects.all().order_by('nombre')
-            context['trabajadores'] = Trabajador.objects.filter(activo=True).select_related('id_unidad').order_by('nombre', 'apellido_paterno')
-        elif user.perfil.es_jefe():
-            # Para jefe, solo su unidad y sus trabajadores
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
-                context['unidades'] = UnidadAdministrativa.objects.filter(id_unidad=unidad.id_unidad)
-                context['trabajadores'] = Trabajador.objects.filter(
-                    id_unidad=unidad,
-                    activo=True
-                ).order_by('nombre', 'apellido_paterno')
-            else:
-                context['unidades'] = UnidadAdministrativa.objects.none()
-                context['trabajadores'] = Trabajador.objects.none()
-        else:
-            context['unidades'] = UnidadAdministrativa.objects.none()
-            context['trabajadores'] = Trabajador.objects.none()
+        # Filtrar unidades según el rol (admin: todas, jefe: la suya); el
+        # trabajador se busca con el autocompletado y aquí solo se carga la
+        # etiqueta del seleccionado
+        context['unidades'] = catalogos.unidades_visibles(scope)
+        context['trabajador_etiqueta'] = etiqueta_trabajador(self.request.GET.get('trabajador'))
         
         return context
 
@@ -612,14 +596,14 @@ class AsignacionCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('jornadas:asignaciones')
 
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
 
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
+        if scope.es_jefe():
+            if scope.tiene_unidad:
+                unidad = scope.id_unidad
                 trabajador = form.cleaned_data['id_trabajador']
 
-                if trabajador.id_unidad != unidad:
+                if trabajador.id_unidad_id != unidad:
                     messages.error(self.request, "No puedes asignar jornadas a trabajadores de otra unidad.")
                     return redirect('jornadas:asignaciones')
             else:
@@ -638,13 +622,11 @@ class AsignacionCreateView(LoginRequiredMixin, CreateView):
     
     def get_form(self, *args, **kwargs):
         form = super().get_form(*args, **kwargs)
-        user = self.request.user
+        scope = self.request.scope
 
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
-                form.fields['id_trabajador'].queryset = Trabajador.objects.filter(
-                    id_unidad=unidad,
+        if scope.es_jefe():
+            if scope.tiene_unidad:
+                form.fields['id_trabajador'].queryset = Trabajador.objects.visible_to(scope).filter(
                     activo=True
                 )
                 # Permitir que el jefe vea todas las jornadas disponibles
@@ -661,45 +643,17 @@ class AsignacionCreateView(LoginRequiredMixin, CreateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        
-        # Pasar unidades y trabajadores al contexto
-        if user.perfil.es_admin():
-            context['unidades'] = UnidadAdministrativa.objects.all().order_by('nombre')
-            context['todos_trabajadores'] = Trabajador.objects.filter(activo=True).select_related('id_unidad').order_by('id_unidad', 'nombre', 'apellido_paterno')
-        elif user.perfil.es_jefe():
-            # Para jefe, solo su unidad
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
-                context['unidades'] = UnidadAdministrativa.objects.filter(id_unidad=unidad.id_unidad)
-                context['todos_trabajadores'] = Trabajador.objects.filter(
-                    id_unidad=unidad,
-                    activo=True
-                ).order_by('nombre', 'apellido_paterno')
-            else:
-                context['unidades'] = UnidadAdministrativa.objects.none()
-                context['todos_trabajadores'] = Trabajador.objects.none()
-        else:
-            context['unidades'] = UnidadAdministrativa.objects.none()
-            context['todos_trabajadores'] = Trabajador.objects.none()
+        scope = self.request.scope
         
-        # Agrupar jornadas por tipo
-        jornadas_agrupadas = {}
-        jornadas_queryset = self.get_form().fields['id_jornada'].queryset
+        # Unidades para acotar la búsqueda de trabajadores (autocompletado)
+        context['unidades'] = catalogos.unidades_visibles(scope)
         
-        for jornada in jornadas_queryset.prefetch_related('dias'):
-            tipo_key = jornada.descripcion
-            tipo_label = jornada.get_descripcion_display()
-            
-            if tipo_key not in jornadas_agrupadas:
-                jornadas_agrupadas[tipo_key] = {
-                    'label': tipo_label,
-                    'jornadas': []
-                }
-            
-            jornadas_agrupadas[tipo_key]['jornadas'].append(jornada)
-        
-        context['jornadas_agrupadas'] = jornadas_agrupadas
+        # Jornadas agrupadas por tipo, desde el catálogo cacheado (el jefe
+        # sin unidad no puede asignar ninguna, igual que en get_form)
+        if scope.es_jefe() and not scope.tiene_unidad:
+            context['jornadas_agrupadas'] = {}
+        else:
+            context['jornadas_agrupadas'] = catalogos.jornadas_por_tipo()
         context['tipos_jornada'] = JornadaLaboral.TIPO_JORNADA
         
         return context
@@ -719,14 +673,14 @@ class AsignacionUpdateView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy('jornadas:asignaciones')
 
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
 
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
+        if scope.es_jefe():
+            if scope.tiene_unidad:
+                unidad = scope.id_unidad
                 trabajador = form.cleaned_data['id_trabajador']
 
-                if trabajador.id_unidad != unidad:
+                if trabajador.id_unidad_id != unidad:
                     messages.error(self.request, "No puedes editar asignaciones de un trabajador de otra unidad.")
                     return redirect('jornadas:asignaciones')
             else:
@@ -746,11 +700,11 @@ class AsignacionUpdateView(LoginRequiredMixin, UpdateView):
     def dispatch(self, request, *args, **kwargs):
         obj = self.get_object()
 
-        if request.user.perfil.es_jefe():
-            if request.user.perfil.id_trabajador and request.user.perfil.id_trabajador.id_unidad:
-                unidad_jefe = request.user.perfil.id_trabajador.id_unidad
+        if request.scope.es_jefe():
+            if request.scope.tiene_unidad:
+                unidad_jefe = request.scope.id_unidad
                 
-                if obj.id_trabajador.id_unidad != unidad_jefe:
+                if obj.id_trabajador.id_unidad_id != unidad_jefe:
                     raise Http404("No puedes modificar esta asignación")
             else:
                 raise Http404("No tienes un trabajador asignado")
@@ -759,13 +713,11 @@ class AsignacionUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_form(self, *args, **kwargs):
         form = super().get_form(*args, **kwargs)
-        user = self.request.user
+        scope = self.request.scope
 
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                unidad = user.perfil.id_trabajador.id_unidad
-                form.fields['id_trabajador'].queryset = Trabajador.objects.filter(
-                    id_unidad=unidad,
+        if scope.es_jefe():
+            if scope.tiene_unidad:
+                form.fields['id_trabajador'].queryset = Trabajador.objects.visible_to(scope).filter(
                     activo=True
                 )
                 # Permitir que el jefe vea todas las jornadas disponibles
@@ -781,25 +733,14 @@ class AsignacionUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        
-        # Agrupar jornadas por tipo
-        jornadas_agrupadas = {}
-        jornadas_queryset = self.get_form().fields['id_jornada'].queryset
+        scope = self.request.scope
         
-        for jornada in jornadas_queryset.prefetch_related('dias'):
-            tipo_key = jornada.descripcion
-            tipo_label = jornada.get_descripcion_display()
-            
-            if tipo_key not in jornadas_agrupadas:
-                jornadas_agrupadas[tipo_key] = {
-                    'label': tipo_label,
-                    'jornadas': []
-                }
-            
-            jornadas_agrupadas[tipo_key]['jornadas'].append(jornada)
-        
-        context['jornadas_agrupadas'] = jornadas_agrupadas
+        # Jornadas agrupadas por tipo, desde el catálogo cacheado (el jefe
+        # sin unidad no puede asignar ninguna, igual que en get_form)
+        if scope.es_jefe() and not scope.tiene_unidad:
+            context['jornadas_agrupadas'] = {}
+        else:
+            context['jornadas_agrupadas'] = catalogos.jornadas_por_tipo()
         context['tipos_jornada'] = JornadaLaboral.TIPO_JORNADA
         
         return context
@@ -830,11 +771,11 @@ class AsignacionDeleteView(LoginRequiredMixin, DeleteView):
     def dispatch(self, request, *args, **kwargs):
         obj = self.get_object()
 
-        if request.user.perfil.es_jefe():
-            if request.user.perfil.id_trabajador and request.user.perfil.id_trabajador.id_unidad:
-                unidad_jefe = request.user.perfil.id_trabajador.id_unidad
+        if request.scope.es_jefe():
+            if request.scope.tiene_unidad:
+                unidad_jefe = request.scope.id_unidad
                 
-                if obj.id_trabajador.id_unidad != unidad_jefe:
+                if obj.id_trabajador.id_unidad_id != unidad_jefe:
                     raise Http404("No puedes modificar esta asignación")
             else:
                 raise Http404("No tienes un trabajador asignado")
@@ -843,6 +784,44 @@ class AsignacionDeleteView(LoginRequiredMixin, DeleteView):
 
 
 
+@method_decorator([jefe_o_admin_requerido, requiere_trabajador_y_unidad], name='dispatch')
+class AsignacionMasivaView(LoginRequiredMixin, FormView):
+    """
+    Asignar una jornada a una unidad completa o a una lista de trabajadores
+    Acceso: Jefe (su unidad) y Admin
+    """
+    form_class = AsignacionMasivaForm
+    template_name = 'jornadas_laborales/asignaciones/asignacion_masiva.html'
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['request'] = self.request
+        return kwargs
+
+    def form_valid(self, form):
+        trabajadores, no_encontrados = form.trabajadores()
+        resultado = asignar_jornada_masiva(
+            trabajadores,
+            form.cleaned_data['id_jornada'],
+            form.cleaned_data['fecha_inicio'],
+            form.cleaned_data['fecha_fin'],
+            usuario=self.request.user,
+        )
+
+        if resultado.asignados:
+            messages.success(self.request, f"Jornada asignada: {resultado}")
+        else:
+            messages.warning(self.request, f"No se asignó ninguna jornada: {resultado}")
+
+        # El reporte por trabajador se muestra en la misma página
+        return self.render_to_response(self.get_context_data(
+            form=form,
+            resultado=resultado,
+            no_encontrados=no_encontrados,
+            total_conflictos=len(resultado.conflictos) + len(no_encontrados),
+        ))
+
+
 # =========================================================
 #   MI JORNADA (Vista para Trabajadores)
 # =========================================================
@@ -861,7 +840,7 @@ class MiJornadaView(LoginRequiredMixin, TemplateView):
         context['hoy'] = hoy
 
         # Verificar si el usuario tiene un trabajador asociado
-        if not hasattr(self.request.user.perfil, 'id_trabajador') or not self.request.user.perfil.id_trabajador:
+        if not self.request.scope.tiene_trabajador:
             messages.warning(
                 self.request,
                 "No tienes un trabajador asociado. Contacta al administrador."
@@ -870,22 +849,21 @@ class MiJornadaView(LoginRequiredMixin, TemplateView):
             context['jornada_asignada'] = None
             return context
 
+        # Instancia ya cargada por AccessScopeMiddleware (sin consulta extra)
         trabajador = self.request.user.perfil.id_trabajador
 
-        # Buscar jornada vigente (fecha_fin NULL o >= hoy)
+        # Jornada vigente hoy (la jornada actual del trabajador, por llave primaria)
         jornada_asignada = TrabajadorJornada.objects.select_related(
             'id_jornada'
         ).filter(
-            id_trabajador=trabajador
-        ).filter(
-            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=hoy)
-        ).first()
+            pk=trabajador.jornada_actual_id
+        ).vigentes_en(hoy).first()
 
         context['trabajador'] = trabajador
         context['jornada_asignada'] = jornada_asignada
         
         if jornada_asignada:
-            context['dias_laborales'] = jornada_asignada.id_jornada.dias.all().order_by('numero_dia')
+            context['dias_laborales'] = jornada_asignada.id_jornada.nombres_dias
         
         # Todas las jornadas vigentes del trabajador
         context['jornadas_vigentes'] = TrabajadorJornada.objects.select_related(
@@ -0,0 +1,46 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import CorreoSalida
+
+
+@admin.register(CorreoSalida)
+class CorreoSalidaAdmin(admin.ModelAdmin):
+    list_display = ['asunto', 'get_destinatarios', 'estado', 'intentos', 'siguiente_intento', 'created_at', 'enviado_at']
+    list_filter = ['estado', 'created_at']
+    search_fields = ['asunto', 'remitente']
+    readonly_fields = [
+        'asunto', 'cuerpo', 'tipo_contenido', 'remitente', 'destinatarios', 'cc', 'bcc',
+        'responder_a', 'encabezados', 'alternativas', 'adjuntos',
+        'intentos', 'ultimo_error', 'created_at', 'enviado_at'
+    ]
+    date_hierarchy = 'created_at'
+
+    fieldsets = (
+        ('Mensaje', {
+            'fields': ('asunto', 'remitente', 'destinatarios', 'cc', 'bcc', 'responder_a', 'cuerpo', 'tipo_contenido')
+        }),
+        ('Contenido adicional', {
+            'fields': ('alternativas', 'adjuntos', 'encabezados'),
+            'classes': ('collapse',)
+        }),
+        ('Entrega', {
+            'fields': ('estado', 'intentos', 'siguiente_intento', 'ultimo_error', 'created_at', 'enviado_at')
+        }),
+    )
+
+    actions = ['reintentar']
+
+    def get_destinatarios(self, obj):
+        return ', '.join(obj.destinatarios)
+    get_destinatarios.short_description = 'Para'
+
+    def reintentar(self, request, queryset):
+        """Vuelve a encolar correos fallidos o pendientes para envío inmediato"""
+        count = queryset.exclude(estado='enviado').update(
+            estado='pendiente',
+            intentos=0,
+            siguiente_intento=timezone.now()
+        )
+        self.message_user(request, f"{count} correo(s) reprogramados")
+    reintentar.short_description = "Reintentar envío"
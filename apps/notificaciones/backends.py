@@ -0,0 +1,33 @@
+# apps/notificaciones/backends.py
+
+from django.core.mail.backends.base import BaseEmailBackend
+
+
+class BandejaSalidaEmailBackend(BaseEmailBackend):
+    """
+    Backend de correo que no abre conexiones SMTP: solo guarda los mensajes
+    en la tabla `correo_salida` dentro de la transacción actual.
+
+    La entrega real la hace el comando `enviar_correos` usando el backend
+    configurado en BANDEJA_SALIDA_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        from .models import CorreoSalida
+
+        correos = [
+            CorreoSalida.desde_mensaje(mensaje)
+            for mensaje in email_messages
+            if mensaje.recipients()
+        ]
+        if not correos:
+            return 0
+
+        try:
+            CorreoSalida.objects.bulk_create(correos)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+
+        return len(correos)
@@ -0,0 +1,112 @@
+# apps/notificaciones/management/commands/enviar_correos.py
+
+import time
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notificaciones.models import CorreoSalida
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega los correos pendientes de la bandeja de salida por lotes, "
+        "reutilizando una sola conexión SMTP por lote y reintentando con backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=settings.BANDEJA_SALIDA_LOTE,
+            help='Número máximo de correos por lote'
+        )
+        parser.add_argument(
+            '--continuo', action='store_true',
+            help='Seguir revisando la bandeja indefinidamente'
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=5,
+            help='Segundos de espera entre revisiones en modo continuo'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            enviados, fallidos = 0, 0
+
+            # Procesar lotes hasta vaciar lo que está listo para enviarse
+            while True:
+                resultado = self.procesar_lote(options['lote'])
+                if resultado is None:
+                    break
+                enviados += resultado[0]
+                fallidos += resultado[1]
+
+            if enviados or fallidos:
+                self.stdout.write(f"Correos enviados: {enviados} | con error: {fallidos}")
+
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
+
+    def procesar_lote(self, tamano):
+        """
+        Envía un lote de correos pendientes.
+
+        Returns:
+            (enviados, con_error) o None si no había correos listos.
+
+        Notas:
+            - select_for_update(skip_locked=True) permite correr varios
+              procesos de envío sin que se repartan el mismo correo.
+            - Todo el lote usa una sola conexión abierta.
+        """
+        with transaction.atomic():
+            lote = list(
+                CorreoSalida.objects.select_for_update(skip_locked=True)
+                .filter(estado='pendiente', siguiente_intento__lte=timezone.now())
+                .order_by('siguiente_intento')[:tamano]
+            )
+            if not lote:
+                return None
+
+            enviados, con_error = 0, 0
+            connection = get_connection(settings.BANDEJA_SALIDA_BACKEND)
+
+            try:
+                connection.open()
+            except Exception as e:
+                # Servidor no disponible: todo el lote se reprograma
+                for correo in lote:
+                    self.registrar_error(correo, e)
+                CorreoSalida.objects.bulk_update(
+                    lote, ['estado', 'intentos', 'siguiente_intento', 'ultimo_error']
+                )
+                return (0, len(lote))
+
+            try:
+                for correo in lote:
+                    try:
+                        correo.a_mensaje(connection).send()
+                        correo.marcar_enviado()
+                        enviados += 1
+                    except Exception as e:
+                        self.registrar_error(correo, e)
+                        con_error += 1
+            finally:
+                connection.close()
+
+            CorreoSalida.objects.bulk_update(
+                lote, ['estado', 'intentos', 'siguiente_intento', 'ultimo_error', 'enviado_at']
+            )
+
+        return (enviados, con_error)
+
+    def registrar_error(self, correo, error):
+        correo.marcar_error(
+            error,
+            max_intentos=settings.BANDEJA_SALIDA_MAX_INTENTOS,
+            espera_base=settings.BANDEJA_SALIDA_ESPERA_BASE,
+        )
+        self.stderr.write(f"[ERROR] correo {correo.pk}: {error}")
@@ -0,0 +1,35 @@
+# apps/notificaciones/management/commands/enviar_resumen_jefes.py
+
+from datetime import date, datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.notificaciones.resumenes import enviar_resumenes_jefes
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía a cada jefe un solo correo con el resumen del día de su unidad "
+        "(retardos, faltas, registros sin salida e incidencias)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fecha',
+            help='Fecha a resumir en formato YYYY-MM-DD (por defecto hoy)'
+        )
+        parser.add_argument(
+            '--incluir-vacios', action='store_true',
+            help='Enviar el resumen aunque la unidad no tenga eventos'
+        )
+
+    def handle(self, *args, **options):
+        fecha = date.today()
+        if options['fecha']:
+            try:
+                fecha = datetime.strptime(options['fecha'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("La fecha debe tener el formato YYYY-MM-DD")
+
+        total = enviar_resumenes_jefes(fecha, incluir_vacios=options['incluir_vacios'])
+        self.stdout.write(f"Resúmenes enviados: {total} ({fecha.strftime('%d/%m/%Y')})")
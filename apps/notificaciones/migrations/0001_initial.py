@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-19 04:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSalida',
+            fields=[
+                ('id_correo', models.BigAutoField(primary_key=True, serialize=False)),
+                ('asunto', models.CharField(max_length=998, verbose_name='Asunto')),
+                ('cuerpo', models.TextField(blank=True, verbose_name='Cuerpo')),
+                ('tipo_contenido', models.CharField(default='plain', max_length=20, verbose_name='Tipo de contenido')),
+                ('remitente', models.CharField(max_length=254, verbose_name='Remitente')),
+                ('destinatarios', models.JSONField(default=list, verbose_name='Para')),
+                ('cc', models.JSONField(blank=True, default=list, verbose_name='CC')),
+                ('bcc', models.JSONField(blank=True, default=list, verbose_name='CCO')),
+                ('responder_a', models.JSONField(blank=True, default=list, verbose_name='Responder a')),
+                ('encabezados', models.JSONField(blank=True, default=dict, verbose_name='Encabezados')),
+                ('alternativas', models.JSONField(blank=True, default=list, help_text='Lista de [contenido, mimetype] (ej. versión HTML)', verbose_name='Alternativas')),
+                ('adjuntos', models.JSONField(blank=True, default=list, help_text='Lista de [nombre, contenido base64, mimetype]', verbose_name='Adjuntos')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('fallido', 'Fallido')], default='pendiente', max_length=10, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('siguiente_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Siguiente intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('enviado_at', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Envío')),
+            ],
+            options={
+                'verbose_name': 'Correo en Bandeja de Salida',
+                'verbose_name_plural': 'Bandeja de Salida',
+                'db_table': 'correo_salida',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['estado', 'siguiente_intento'], name='correo_estado_intento_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,138 @@
+# apps/notificaciones/models.py
+
+import base64
+from datetime import timedelta
+
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+
+
+# =========================================================
+#   BANDEJA DE SALIDA DE CORREOS
+# =========================================================
+
+class CorreoSalida(models.Model):
+    """
+    Correo encolado por el backend de bandeja de salida.
+
+    Las peticiones solo insertan el registro; el comando `enviar_correos`
+    los entrega por lotes reutilizando una sola conexión SMTP.
+    """
+
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviado', 'Enviado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    id_correo = models.BigAutoField(primary_key=True)
+
+    asunto = models.CharField(max_length=998, verbose_name="Asunto")
+    cuerpo = models.TextField(blank=True, verbose_name="Cuerpo")
+    tipo_contenido = models.CharField(max_length=20, default='plain', verbose_name="Tipo de contenido")
+    remitente = models.CharField(max_length=254, verbose_name="Remitente")
+
+    destinatarios = models.JSONField(default=list, verbose_name="Para")
+    cc = models.JSONField(default=list, blank=True, verbose_name="CC")
+    bcc = models.JSONField(default=list, blank=True, verbose_name="CCO")
+    responder_a = models.JSONField(default=list, blank=True, verbose_name="Responder a")
+    encabezados = models.JSONField(default=dict, blank=True, verbose_name="Encabezados")
+    alternativas = models.JSONField(default=list, blank=True, verbose_name="Alternativas",
+                                    help_text="Lista de [contenido, mimetype] (ej. versión HTML)")
+    adjuntos = models.JSONField(default=list, blank=True, verbose_name="Adjuntos",
+                                help_text="Lista de [nombre, contenido base64, mimetype]")
+
+    # Control de entrega
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='pendiente', verbose_name="Estado")
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name="Intentos")
+    siguiente_intento = models.DateTimeField(default=timezone.now, verbose_name="Siguiente intento")
+    ultimo_error = models.TextField(blank=True, verbose_name="Último error")
+
+    # Auditoría
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
+    enviado_at = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Envío")
+
+    class Meta:
+        db_table = 'correo_salida'
+        verbose_name = 'Correo en Bandeja de Salida'
+        verbose_name_plural = 'Bandeja de Salida'
+        ordering = ['-created_at']
+        indexes = [
+            # El comando de envío solo consulta pendientes por fecha de siguiente intento
+            models.Index(fields=['estado', 'siguiente_intento'], name='correo_estado_intento_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} → {', '.join(self.destinatarios)} ({self.get_estado_display()})"
+
+    # =========================================================
+    #   CONVERSIÓN EmailMessage <-> CorreoSalida
+    # =========================================================
+
+    @classmethod
+    def desde_mensaje(cls, mensaje):
+        """Construye (sin guardar) un CorreoSalida a partir de un EmailMessage."""
+        adjuntos = []
+        for adjunto in mensaje.attachments:
+            # Los adjuntos MIMEBase ya armados no se pueden serializar a JSON
+            if not isinstance(adjunto, tuple):
+                continue
+            nombre, contenido, mimetype = adjunto
+            if isinstance(contenido, str):
+                contenido = contenido.encode('utf-8')
+            adjuntos.append([nombre, base64.b64encode(contenido).decode('ascii'), mimetype])
+
+        return cls(
+            asunto=mensaje.subject,
+            cuerpo=mensaje.body,
+            tipo_contenido=mensaje.content_subtype,
+            remitente=mensaje.from_email,
+            destinatarios=list(mensaje.to),
+            cc=list(mensaje.cc),
+            bcc=list(mensaje.bcc),
+            responder_a=list(mensaje.reply_to),
+            encabezados=dict(mensaje.extra_headers),
+            alternativas=[list(alt) for alt in getattr(mensaje, 'alternatives', [])],
+            adjuntos=adjuntos,
+        )
+
+    def a_mensaje(self, connection=None):
+        """Reconstruye el EmailMultiAlternatives listo para enviarse."""
+        mensaje = EmailMultiAlternatives(
+            subject=self.asunto,
+            body=self.cuerpo,
+            from_email=self.remitente,
+            to=self.destinatarios,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.responder_a,
+            headers=self.encabezados,
+            alternatives=[tuple(alt) for alt in self.alternativas],
+            connection=connection,
+        )
+        mensaje.content_subtype = self.tipo_contenido
+        for nombre, contenido, mimetype in self.adjuntos:
+            mensaje.attach(nombre, base64.b64decode(contenido), mimetype)
+        return mensaje
+
+    # =========================================================
+    #   ESTADO DE ENTREGA
+    # =========================================================
+
+    def marcar_enviado(self):
+        self.estado = 'enviado'
+        self.enviado_at = timezone.now()
+        self.ultimo_error = ''
+
+    def marcar_error(self, error, max_intentos, espera_base):
+        """
+        Registra un intento fallido con backoff exponencial
+        (espera_base * 2^intentos segundos). Al agotar los intentos queda como fallido.
+        """
+        self.intentos += 1
+        self.ultimo_error = str(error)[:2000]
+        if self.intentos >= max_intentos:
+            self.estado = 'fallido'
+        else:
+            self.siguiente_intento = timezone.now() + timedelta(seconds=espera_base * 2 ** self.intentos)
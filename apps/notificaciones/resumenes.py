@@ -0,0 +1,161 @@
+# apps/notificaciones/resumenes.py
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Count, Exists, OuterRef, Q
+from django.template.loader import render_to_string
+
+from apps.accounts.models import PerfilUsuario
+from apps.asistencias.models import RegistroAsistencia
+from apps.incidencias.models import Incidencia
+from apps.jornadas_laborales.calendario import es_inhabil
+from apps.jornadas_laborales.models import JornadaLaboral
+from apps.trabajadores.models import Trabajador
+
+
+# =========================================================
+#   RESUMEN DIARIO POR UNIDAD
+# =========================================================
+
+def obtener_eventos_por_unidad(fecha):
+    """
+    Agrupa los eventos del día por unidad administrativa.
+
+    Args:
+        fecha (date)
+
+    Returns:
+        dict {id_unidad: {...contadores...}}
+
+    Optimización:
+        - Tres consultas agregadas (asistencias, trabajadores sin checada e
+          incidencias), sin importar cuántos eventos haya: el costo depende
+          del número de unidades.
+    """
+    eventos = {}
+
+    def unidad(id_unidad, nombre):
+        return eventos.setdefault(id_unidad, {
+            'unidad': nombre,
+            'asistencias': 0,
+            'retardos': 0,
+            'faltas': 0,
+            'sin_checada': 0,
+            'sin_salida': 0,
+            'incidencias_nuevas': 0,
+            'incidencias_pendientes': 0,
+        })
+
+    asistencias = RegistroAsistencia.objects.filter(
+        fecha=fecha
+    ).values(
+        'id_trabajador__id_unidad', 'id_trabajador__id_unidad__nombre'
+    ).annotate(
+        asistencias=Count('id_registro', filter=Q(estatus='ASI')),
+        retardos=Count('id_registro', filter=Q(estatus='RET')),
+        faltas=Count('id_registro', filter=Q(estatus='FAL')),
+        sin_salida=Count('id_registro', filter=Q(hora_entrada__isnull=False, hora_salida__isnull=True)),
+    ).order_by()
+
+    for fila in asistencias:
+        datos = unidad(fila['id_trabajador__id_unidad'], fila['id_trabajador__id_unidad__nombre'])
+        for campo in ('asistencias', 'retardos', 'faltas', 'sin_salida'):
+            datos[campo] = fila[campo]
+
+    # Quien no checó no tiene registro del día (la falta no se guarda hasta
+    # que alguien la captura): activos con jornada vigente que labora ese día
+    if not es_inhabil(fecha):
+        sin_checada = Trabajador.objects.filter(activo=True).con_jornada_vigente(fecha).filter(
+            jornada_actual__id_jornada__in=JornadaLaboral.objects.que_laboran(fecha.isoweekday())
+        ).exclude(Exists(
+            RegistroAsistencia.objects.filter(id_trabajador=OuterRef('pk'), fecha=fecha)
+        )).values(
+            'id_unidad', 'id_unidad__nombre'
+        ).annotate(
+            total=Count('id_trabajador')
+        ).order_by()
+
+        for fila in sin_checada:
+            unidad(fila['id_unidad'], fila['id_unidad__nombre'])['sin_checada'] = fila['total']
+
+    incidencias = Incidencia.objects.filter(
+        Q(created_at__date=fecha) | Q(estado='pendiente')
+    ).values(
+        'id_trabajador__id_unidad', 'id_trabajador__id_unidad__nombre'
+    ).annotate(
+        nuevas=Count('id_incidencia', filter=Q(created_at__date=fecha)),
+        pendientes=Count('id_incidencia', filter=Q(estado='pendiente')),
+    ).order_by()
+
+    for fila in incidencias:
+        datos = unidad(fila['id_trabajador__id_unidad'], fila['id_trabajador__id_unidad__nombre'])
+        datos['incidencias_nuevas'] = fila['nuevas']
+        datos['incidencias_pendientes'] = fila['pendientes']
+
+    return eventos
+
+
+def tiene_eventos(datos):
+    """Un resumen vale la pena si hay algo que atender."""
+    return any(datos[campo] for campo in (
+        'retardos', 'faltas', 'sin_checada', 'sin_salida', 'incidencias_nuevas', 'incidencias_pendientes'
+    ))
+
+
+def construir_resumenes_jefes(fecha, incluir_vacios=False):
+    """
+    Construye un correo por jefe con el resumen de su unidad.
+
+    Returns:
+        list[EmailMultiAlternatives]
+    """
+    eventos = obtener_eventos_por_unidad(fecha)
+
+    jefes = PerfilUsuario.objects.filter(
+        rol='jefe',
+        user__is_active=True,
+        id_trabajador__id_unidad__isnull=False,
+    ).exclude(
+        user__email=''
+    ).values_list('user__email', 'user__username', 'id_trabajador__id_unidad')
+
+    mensajes = []
+    for email, username, id_unidad in jefes:
+        datos = eventos.get(id_unidad)
+        if datos is None or (not incluir_vacios and not tiene_eventos(datos)):
+            continue
+
+        context = {
+            'fecha': fecha,
+            'jefe': username,
+            'resumen': datos,
+        }
+        asunto = f"Resumen diario {datos['unidad']} - {fecha.strftime('%d/%m/%Y')}"
+        mensaje = EmailMultiAlternatives(
+            subject=asunto,
+            body=render_to_string('notificaciones/resumen_jefe.txt', context),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to=[email],
+        )
+        mensaje.attach_alternative(
+            render_to_string('notificaciones/resumen_jefe.html', context),
+            'text/html'
+        )
+        mensajes.append(mensaje)
+
+    return mensajes
+
+
+def enviar_resumenes_jefes(fecha, incluir_vacios=False):
+    """
+    Envía todos los resúmenes del día usando una sola conexión.
+
+    Returns:
+        int: número de correos enviados
+    """
+    mensajes = construir_resumenes_jefes(fecha, incluir_vacios=incluir_vacios)
+    if not mensajes:
+        return 0
+
+    with get_connection() as connection:
+        return connection.send_messages(mensajes)
@@ -4,25 +4,23 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Q, Value
 from django.db.models.functions import TruncMonth, Concat
 from datetime import datetime, timedelta
+from apps.accounts import catalogos
 from apps.asistencias.models import RegistroAsistencia
-from apps.trabajadores.models import Trabajador
-from apps.unidades.models import UnidadAdministrativa
+from apps.trabajadores.widgets import etiqueta_trabajador
 import csv
 
 @login_required
 def index(request):
     """Vista principal de reportes - Solo administradores"""
     # Verificar permisos (solo admin)
-    if not request.user.perfil.es_admin():
+    if not request.scope.es_admin():
         return HttpResponseForbidden("No tienes permiso para acceder a esta página")
     
-    # Obtener todas las unidades y trabajadores (solo admin puede acceder)
-    unidades = UnidadAdministrativa.objects.all()
-    trabajadores = Trabajador.objects.filter(activo=True)
+    # Obtener todas las unidades (solo admin puede acceder)
+    unidades = catalogos.unidades()
     
     context = {
         'unidades': unidades,
-        'trabajadores': trabajadores,
     }
     
     return render(request, 'reportes/index.html', context)
@@ -32,7 +30,7 @@ def index(request):
 def reporte_asistencias(request):
     """Generar reporte de asistencias con filtros y estadísticas avanzadas - Solo administradores"""
     # Verificar permisos (solo admin)
-    if not request.user.perfil.es_admin():
+    if not request.scope.es_admin():
         return HttpResponseForbidden("No tienes permiso para acceder a esta página")
     
     # Obtener parámetros de filtrado
@@ -132,9 +130,9 @@ def reporte_asistencias(request):
             total = stat['total_asistencias'] + stat['total_retardos'] + stat['total_faltas']
             stat['porcentaje'] = round((stat['total_asistencias'] / total * 100) if total > 0 else 0, 1)
     
-    # Obtener todas las unidades y trabajadores (solo admin puede acceder)
-    unidades = UnidadAdministrativa.objects.all()
-    trabajadores = Trabajador.objects.filter(activo=True)
+    # Obtener todas las unidades (solo admin puede acceder); el trabajador
+    # se elige con el autocompletado y aquí solo se carga su etiqueta
+    unidades = catalogos.unidades()
     
     context = {
         'asistencias': asistencias.order_by('-fecha', 'id_trabajador__nombre'),
@@ -155,7 +153,7 @@ def reporte_asistencias(request):
         'trabajador_seleccionado': trabajador_id,
         'unidad_seleccionada': unidad_id,
         'unidades': unidades,
-        'trabajadores': trabajadores,
+        'trabajador_etiqueta': etiqueta_trabajador(trabajador_id),
     }
     
     return render(request, 'reportes/reporte_asistencias.html', context)
@@ -165,7 +163,7 @@ def reporte_asistencias(request):
 def exportar_asistencias_csv(request):
     """Exportar reporte de asistencias a CSV con métricas completas - Solo administradores"""
     # Verificar permisos (solo admin)
-    if not request.user.perfil.es_admin():
+    if not request.scope.es_admin():
         return HttpResponseForbidden("No tienes permiso para exportar reportes")
     
     # Obtener los mismos parámetros que el reporte
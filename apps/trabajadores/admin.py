@@ -1,4 +1,13 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .forms import ImportarTrabajadoresForm
+from .importacion import COLUMNAS, importar_trabajadores
 from .models import Puesto, TipoNombramiento, Trabajador
 
 
@@ -28,6 +37,7 @@ class TipoNombramientoAdmin(admin.ModelAdmin):
 # ------------------------------
 @admin.register(Trabajador)
 class TrabajadorAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/trabajadores/trabajador/change_list.html'
     list_display = ['numero_empleado', 'nombre_completo', 'id_puesto', 'id_unidad', 'activo', 'created_at']
     search_fields = ['numero_empleado', 'nombre', 'apellido_paterno', 'apellido_materno', 'rfc', 'curp']
     list_filter = ['activo', 'id_puesto', 'id_tipo_nombramiento', 'id_unidad', 'created_at']
@@ -47,4 +57,46 @@ class TrabajadorAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at', 'created_by', 'updated_by'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+    # ---- IMPORTACIÓN CSV ----
+    def get_urls(self):
+        urls = [
+            path(
+                'importar/',
+                self.admin_site.admin_view(self.importar_csv),
+                name='trabajadores_trabajador_importar',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def importar_csv(self, request):
+        """
+        Sube un CSV y lo importa con importar_trabajadores(). Si hay filas con
+        error se descarga el reporte; las filas válidas ya quedaron guardadas.
+        """
+        if not self.has_add_permission(request) or not self.has_change_permission(request):
+            return redirect('admin:trabajadores_trabajador_changelist')
+
+        form = ImportarTrabajadoresForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            reporte = io.StringIO()
+            resultado = importar_trabajadores(
+                form.cleaned_data['archivo'].file, reporte=reporte, usuario=request.user
+            )
+            self.message_user(request, f"Importación terminada: {resultado}", messages.SUCCESS)
+
+            if resultado.errores:
+                response = HttpResponse(reporte.getvalue(), content_type='text/csv; charset=utf-8')
+                response['Content-Disposition'] = 'attachment; filename="errores_importacion.csv"'
+                return response
+            return redirect('admin:trabajadores_trabajador_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar trabajadores',
+            'form': form,
+            'columnas': COLUMNAS,
+        }
+        return TemplateResponse(request, 'admin/trabajadores/trabajador/importar.html', context)
@@ -4,4 +4,4 @@ from django.apps import AppConfig
 class TrabajadoresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.trabajadores'
-    verbose_name = 'Trabajadores'
\ No newline at end of file
+    verbose_name = 'Trabajadores'
@@ -24,3 +24,10 @@ class PuestoSimpleForm(forms.Form):
 
 
 PuestoFormSet = formset_factory(PuestoSimpleForm, extra=5)
+
+
+class ImportarTrabajadoresForm(forms.Form):
+    archivo = forms.FileField(
+        label="Archivo CSV",
+        help_text="UTF-8, con encabezado. Los trabajadores existentes se actualizan por número de empleado."
+    )
@@ -0,0 +1,270 @@
+# apps/trabajadores/importacion.py
+
+import csv
+import io
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from apps.unidades.models import UnidadAdministrativa
+
+from .models import CURP_REGEX, RFC_REGEX, Puesto, TipoNombramiento, Trabajador
+
+
+# Columnas del CSV (la primera fila es el encabezado). Las opcionales:
+#   - activo: si falta o viene vacío el trabajador queda activo.
+#   - nivel: distingue puestos con el mismo nombre (también se puede
+#     escribir el puesto como "nombre (nivel)").
+OBLIGATORIAS = [
+    'numero_empleado', 'nombre', 'apellido_paterno', 'apellido_materno',
+    'rfc', 'curp', 'unidad', 'puesto', 'tipo_nombramiento',
+]
+COLUMNAS = OBLIGATORIAS + ['activo', 'nivel']
+
+# Campos que se sobrescriben cuando el número de empleado ya existe
+CAMPOS_ACTUALIZABLES = [
+    'nombre', 'apellido_paterno', 'apellido_materno', 'rfc', 'curp',
+    'id_unidad', 'id_puesto', 'id_tipo_nombramiento', 'activo',
+    'updated_at', 'updated_by',
+]
+
+VALORES_INACTIVO = {'0', 'no', 'false', 'falso', 'inactivo'}
+
+LOTE = 1000
+
+
+@dataclass
+class ResultadoImportacion:
+    creados: int = 0
+    actualizados: int = 0
+    errores: int = 0
+    segundos: float = 0.0
+
+    @property
+    def procesados(self):
+        return self.creados + self.actualizados
+
+    def __str__(self):
+        return (
+            f"{self.creados} creados, {self.actualizados} actualizados, "
+            f"{self.errores} con error ({self.segundos:.1f} s)"
+        )
+
+
+def _clave(texto):
+    return (texto or '').strip().casefold()
+
+
+def _con_nivel(nombre, nivel):
+    return f"{nombre} ({nivel})"
+
+
+# Valor de un nombre que corresponde a más de un registro del catálogo
+AMBIGUO = object()
+
+
+def _indice(pares):
+    """
+    {nombre normalizado: id} a partir de pares (nombre, id). Un nombre
+    repetido queda como AMBIGUO en lugar de quedarse con el último id.
+    """
+    indice = {}
+    for nombre, pk in pares:
+        clave = _clave(nombre)
+        indice[clave] = AMBIGUO if clave in indice else pk
+    return indice
+
+
+def _catalogos():
+    """Un diccionario {nombre normalizado: id} por catálogo (tres consultas)."""
+    puestos = Puesto.objects.values_list('id_puesto', 'nombre_puesto', 'nivel')
+    return {
+        'unidad': _indice(
+            (nombre, pk) for pk, nombre in UnidadAdministrativa.objects.values_list('id_unidad', 'nombre')
+        ),
+        # Cada puesto se encuentra por nombre y por "nombre (nivel)", como
+        # lo muestra __str__
+        'puesto': _indice(
+            (texto, pk)
+            for pk, nombre, nivel in puestos
+            for texto in (nombre, _con_nivel(nombre, nivel))
+        ),
+        'tipo_nombramiento': _indice(
+            (descripcion, pk)
+            for pk, descripcion in TipoNombramiento.objects.values_list('id_tipo_nombramiento', 'descripcion')
+        ),
+    }
+
+
+# Longitudes máximas tomadas del modelo, para no fallar en el INSERT
+LONGITUDES = {
+    campo: Trabajador._meta.get_field(campo).max_length
+    for campo in ['numero_empleado', 'nombre', 'apellido_paterno', 'apellido_materno', 'rfc', 'curp']
+}
+
+
+def _validar_fila(fila, catalogos, usuario):
+    """
+    Convierte una fila del CSV en un Trabajador sin guardar.
+
+    Aplica las mismas reglas que el formulario (obligatorios, longitudes,
+    formato de RFC/CURP) sin consultar la base de datos.
+
+    Returns:
+        (trabajador, errores) — trabajador es None si hay errores.
+    """
+    datos = {columna: (fila.get(columna) or '').strip() for columna in COLUMNAS}
+    errores = []
+
+    for columna in OBLIGATORIAS:
+        if not datos[columna]:
+            errores.append(f"{columna}: obligatorio")
+
+    for campo, maximo in LONGITUDES.items():
+        if len(datos[campo]) > maximo:
+            errores.append(f"{campo}: máximo {maximo} caracteres")
+
+    datos['rfc'] = datos['rfc'].upper()
+    datos['curp'] = datos['curp'].upper()
+    if datos['rfc'] and not RFC_REGEX.match(datos['rfc']):
+        errores.append("rfc: formato no válido")
+    if datos['curp'] and not CURP_REGEX.match(datos['curp']):
+        errores.append("curp: formato no válido")
+
+    if datos['puesto'] and datos['nivel']:
+        datos['puesto'] = _con_nivel(datos['puesto'], datos['nivel'])
+
+    ids = {}
+    for catalogo, lookup in catalogos.items():
+        if datos[catalogo]:
+            ids[catalogo] = lookup.get(_clave(datos[catalogo]))
+            if ids[catalogo] is None:
+                errores.append(f"{catalogo}: '{datos[catalogo]}' no existe")
+            elif ids[catalogo] is AMBIGUO:
+                errores.append(
+                    f"{catalogo}: '{datos[catalogo]}' es ambiguo (hay varios con ese nombre)"
+                    + (", indique el nivel" if catalogo == 'puesto' else "")
+                )
+
+    if errores:
+        return None, errores
+
+    trabajador = Trabajador(
+        numero_empleado=datos['numero_empleado'],
+        nombre=datos['nombre'],
+        apellido_paterno=datos['apellido_paterno'],
+        apellido_materno=datos['apellido_materno'],
+        rfc=datos['rfc'],
+        curp=datos['curp'],
+        id_unidad_id=ids['unidad'],
+        id_puesto_id=ids['puesto'],
+        id_tipo_nombramiento_id=ids['tipo_nombramiento'],
+        activo=_clave(datos['activo']) not in VALORES_INACTIVO,
+        created_by=usuario,
+        updated_by=usuario,
+    )
+    return trabajador, []
+
+
+def _guardar_lote(trabajadores, resultado):
+    """Inserta o actualiza un lote en un solo INSERT ... ON CONFLICT."""
+    if not trabajadores:
+        return
+    existentes = set(
+        Trabajador.objects.filter(
+            numero_empleado__in=trabajadores.keys()
+        ).values_list('numero_empleado', flat=True)
+    )
+    with transaction.atomic():
+        Trabajador.objects.bulk_create(
+            trabajadores.values(),
+            update_conflicts=True,
+            unique_fields=['numero_empleado'],
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+    resultado.actualizados += len(existentes)
+    resultado.creados += len(trabajadores) - len(existentes)
+
+
+def importar_trabajadores(archivo, reporte=None, usuario=None, lote=LOTE):
+    """
+    Importa trabajadores desde un CSV, leyéndolo fila por fila.
+
+    Unidad, puesto y tipo de nombramiento se resuelven por nombre (sin
+    distinguir mayúsculas) con diccionarios cargados una sola vez; una fila
+    cuyo nombre corresponde a varios registros va al reporte de errores en
+    lugar de asignarse a cualquiera de ellos. Las filas
+    válidas se guardan por lotes con bulk_create(update_conflicts=True)
+    sobre numero_empleado: si el trabajador ya existe se actualiza.
+
+    Args:
+        archivo: archivo binario (p. ej. open(..., 'rb') o un UploadedFile).
+        reporte: archivo de texto opcional donde se escriben las filas con
+            error (fila, numero_empleado, errores).
+        usuario: User que queda en created_by/updated_by.
+        lote (int): filas por INSERT.
+
+    Returns:
+        ResultadoImportacion
+
+    Las señales post_save no se disparan con bulk_create; al final se
+    invalida una sola vez la caché del dashboard.
+    """
+    from apps.accounts.dashboard import invalidar_dashboard
+
+    inicio = time.monotonic()
+    resultado = ResultadoImportacion()
+    catalogos = _catalogos()
+
+    escritor = None
+    if reporte is not None:
+        escritor = csv.writer(reporte)
+        escritor.writerow(['fila', 'numero_empleado', 'errores'])
+
+    def registrar_error(numero_fila, numero_empleado, errores):
+        resultado.errores += 1
+        if escritor:
+            escritor.writerow([numero_fila, numero_empleado, '; '.join(errores)])
+
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    lector = csv.DictReader(texto)
+
+    faltantes = [columna for columna in OBLIGATORIAS if columna not in (lector.fieldnames or [])]
+    if faltantes:
+        registrar_error(1, '', [f"faltan columnas: {', '.join(faltantes)}"])
+        texto.detach()
+        resultado.segundos = time.monotonic() - inicio
+        return resultado
+
+    pendientes = {}  # {numero_empleado: Trabajador} del lote actual
+    filas = {}       # {numero_empleado: número de fila} para el reporte
+    # La fila 1 es el encabezado
+    for numero_fila, fila in enumerate(lector, start=2):
+        trabajador, errores = _validar_fila(fila, catalogos, usuario)
+        if errores:
+            registrar_error(numero_fila, (fila.get('numero_empleado') or '').strip(), errores)
+            continue
+
+        # Un INSERT ... ON CONFLICT no puede tocar dos veces la misma fila
+        numero = trabajador.numero_empleado
+        if numero in pendientes:
+            registrar_error(filas[numero], numero, [
+                f"número de empleado repetido en la fila {numero_fila}, se usa esa"
+            ])
+        pendientes[numero] = trabajador
+        filas[numero] = numero_fila
+
+        if len(pendientes) >= lote:
+            _guardar_lote(pendientes, resultado)
+            pendientes, filas = {}, {}
+
+    _guardar_lote(pendientes, resultado)
+    # No cerrar el archivo del llamador al liberar el envoltorio de texto
+    texto.detach()
+
+    if resultado.procesados:
+        invalidar_dashboard()
+
+    resultado.segundos = time.monotonic() - inicio
+    return resultado
@@ -0,0 +1,49 @@
+# apps/trabajadores/management/commands/importar_trabajadores.py
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.trabajadores.importacion import COLUMNAS, LOTE, importar_trabajadores
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa (o actualiza por número de empleado) trabajadores desde un CSV "
+        f"con las columnas: {', '.join(COLUMNAS)}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del CSV (UTF-8)')
+        parser.add_argument(
+            '--errores', default='errores_importacion.csv',
+            help='Ruta del reporte de filas con error (por defecto errores_importacion.csv)'
+        )
+        parser.add_argument(
+            '--lote', type=int, default=LOTE,
+            help=f'Filas por inserción (por defecto {LOTE})'
+        )
+        parser.add_argument(
+            '--usuario',
+            help='Username que queda como creador/modificador de los registros'
+        )
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            usuario = User.objects.filter(username=options['usuario']).first()
+            if usuario is None:
+                raise CommandError(f"No existe el usuario '{options['usuario']}'")
+
+        try:
+            archivo = open(options['archivo'], 'rb')
+        except OSError as e:
+            raise CommandError(f"No se pudo abrir el archivo: {e}")
+
+        with archivo, open(options['errores'], 'w', encoding='utf-8', newline='') as reporte:
+            resultado = importar_trabajadores(
+                archivo, reporte=reporte, usuario=usuario, lote=max(1, options['lote'])
+            )
+
+        self.stdout.write(f"Importación terminada: {resultado}")
+        if resultado.errores:
+            self.stdout.write(f"Filas con error en {options['errores']}")
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trabajador',
+            index=models.Index(fields=['id_unidad', 'activo'], name='trabajador_unidad_activo_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.db import migrations
+
+
+# Índice para la búsqueda por prefijo de número de empleado del autocompletado
+# (istartswith genera UPPER(col::text) LIKE 'X%'). El nombre no lleva índice de
+# prefijo: en PostgreSQL se busca con el índice de trigramas de la 0004, y uno
+# aquí solo encarecería cada escritura. text_pattern_ops solo existe en
+# PostgreSQL; en otros motores (sqlite en desarrollo) la migración no hace nada.
+COLUMNAS = ['numero_empleado']
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for columna in COLUMNAS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS trabajador_{columna}_prefijo_idx '
+            f'ON trabajador (UPPER({columna}::text) text_pattern_ops)'
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for columna in COLUMNAS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS trabajador_{columna}_prefijo_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0002_trabajador_trabajador_unidad_activo_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+# Búsqueda por nombre sin acentos y tolerante a errores (ver
+# TrabajadorQuerySet.buscar). unaccent() no es IMMUTABLE y no puede ir en un
+# índice, por eso se envuelve en inmutable_unaccent() con el diccionario fijo.
+# Igual que 0003, solo aplica en PostgreSQL (TrigramExtension y
+# UnaccentExtension tampoco hacen nada en otros motores).
+PREFIJOS = ['rfc', 'curp']
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE OR REPLACE FUNCTION inmutable_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT "
+        "AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS trabajador_nombre_trgm_idx ON trabajador "
+        "USING gin (inmutable_unaccent(lower(nombre || ' ' || apellido_paterno "
+        "|| ' ' || apellido_materno)) gin_trgm_ops)"
+    )
+    for columna in PREFIJOS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS trabajador_{columna}_prefijo_idx '
+            f'ON trabajador (UPPER({columna}::text) text_pattern_ops)'
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for columna in PREFIJOS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS trabajador_{columna}_prefijo_idx')
+    schema_editor.execute('DROP INDEX IF EXISTS trabajador_nombre_trgm_idx')
+    schema_editor.execute('DROP FUNCTION IF EXISTS inmutable_unaccent(text)')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trabajadores', '0003_trabajador_busqueda_prefijo_idx'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0 on 2026-10-19 04:16
+
+import django.db.models.deletion
+from datetime import date
+
+from django.db import migrations, models
+
+
+def calcular_jornada_actual(apps, schema_editor):
+    Trabajador = apps.get_model('trabajadores', 'Trabajador')
+    TrabajadorJornada = apps.get_model('jornadas_laborales', 'TrabajadorJornada')
+
+    hoy = date.today()
+    vigentes = TrabajadorJornada.objects.filter(
+        models.Q(fecha_fin__isnull=True) | models.Q(fecha_fin__gte=hoy),
+        fecha_inicio__lte=hoy,
+    ).order_by('-fecha_inicio').values_list('id_trabajador_id', 'pk', 'fecha_fin')
+
+    vistos = set()
+    for id_trabajador, id_asignacion, fecha_fin in vigentes:
+        if id_trabajador in vistos:
+            continue
+        vistos.add(id_trabajador)
+        Trabajador.objects.filter(pk=id_trabajador).update(
+            jornada_actual=id_asignacion, jornada_actual_fin=fecha_fin
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jornadas_laborales', '0005_trabajadorjornada_sin_traslape'),
+        ('trabajadores', '0004_trabajador_busqueda_trigram_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajador',
+            name='jornada_actual',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jornadas_laborales.trabajadorjornada', verbose_name='Jornada actual'),
+        ),
+        migrations.AddField(
+            model_name='trabajador',
+            name='jornada_actual_fin',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Fin de la jornada actual'),
+        ),
+        migrations.AddIndex(
+            model_name='trabajador',
+            index=models.Index(condition=models.Q(('jornada_actual__isnull', False)), fields=['activo', 'jornada_actual_fin'], name='trabajador_jornada_actual_idx'),
+        ),
+        migrations.RunPython(calcular_jornada_actual, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
 import re
-from django.db import models
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections, models
+from django.db.models import Exists, OuterRef, Q, Value
 from django.contrib.auth.models import User
 from django.forms import ValidationError
 
+from apps.accounts.scope import ScopeQuerySet
+
 
 # ------------------------------
 #   PUESTO
@@ -89,6 +94,101 @@ class TipoNombramiento(models.Model):
 # ------------------------------
 #   TRABAJADOR
 # ------------------------------
+# Formatos de RFC y CURP; los usan clean() y la importación masiva
+RFC_REGEX = re.compile(r'^[A-ZÑ&]{3,4}\d{6}[A-Z0-9]{3}$')
+CURP_REGEX = re.compile(r'^[A-Z]{1}[AEIOUX]{1}[A-Z]{2}\d{6}[HM]{1}[A-Z]{5}[A-Z0-9]{2}$')
+
+
+# Búsqueda por nombre (PostgreSQL): minúsculas y sin acentos, igual que la
+# expresión del índice GIN trigram de la migración 0004. Las dos plantillas
+# deben producir el mismo SQL para que el planificador use el índice.
+class NormalizarBusqueda(models.Func):
+    function = 'inmutable_unaccent'
+    template = '%(function)s(lower(%(expressions)s))'
+    output_field = models.TextField()
+
+
+class NombreBusqueda(NormalizarBusqueda):
+    """nombre || ' ' || apellido_paterno || ' ' || apellido_materno, normalizado."""
+    arg_joiner = " || ' ' || "
+
+    def __init__(self):
+        super().__init__('nombre', 'apellido_paterno', 'apellido_materno')
+
+
+class TrabajadorQuerySet(ScopeQuerySet):
+    """Para Trabajador el alcance se filtra sobre sus propias columnas."""
+    campo_unidad = 'id_unidad_id'
+    campo_trabajador = 'pk'
+
+    def buscar(self, texto):
+        """
+        Búsqueda de trabajadores por nombre completo o por prefijo de número
+        de empleado, RFC o CURP.
+
+        En PostgreSQL el nombre se compara por similitud de trigramas sin
+        acentos ("jose munos" encuentra a "José Muñoz") usando el índice GIN
+        de la migración 0004, y los resultados se ordenan por similitud. En
+        otros motores cada palabra debe ser prefijo del nombre o de alguno de
+        los apellidos.
+
+        Los prefijos de número de empleado, RFC y CURP usan los índices
+        UPPER(...) text_pattern_ops de las migraciones 0003 y 0004.
+        """
+        texto = (texto or '').strip()
+        palabras = texto.split()
+        if not palabras:
+            return self.none()
+
+        por_clave = (
+            Q(numero_empleado__istartswith=texto) |
+            Q(rfc__istartswith=texto) |
+            Q(curp__istartswith=texto)
+        )
+
+        if connections[self.db].vendor == 'postgresql':
+            consulta = NormalizarBusqueda(Value(texto))
+            return self.annotate(
+                similitud=TrigramWordSimilarity(consulta, NombreBusqueda())
+            ).filter(
+                por_clave | Q(TrigramWordSimilar(NombreBusqueda(), consulta))
+            ).order_by('-similitud', *self.model._meta.ordering)
+
+        por_nombre = Q()
+        for palabra in palabras:
+            por_nombre &= (
+                Q(nombre__istartswith=palabra) |
+                Q(apellido_paterno__istartswith=palabra) |
+                Q(apellido_materno__istartswith=palabra)
+            )
+        return self.filter(por_clave | por_nombre)
+
+    def con_jornada_vigente(self, fecha):
+        """
+        Trabajadores con una jornada vigente en `fecha` (hoy o los días
+        siguientes): lee la jornada actual desnormalizada, sin subconsulta
+        sobre las asignaciones.
+        """
+        return self.filter(jornada_actual__isnull=False).exclude(jornada_actual_fin__lt=fecha)
+
+    def pendientes_de_registro(self, fecha):
+        """
+        Trabajadores con jornada vigente que aún no completan (entrada y
+        salida) su asistencia de `fecha`. Lo usan el registro rápido y su
+        autocompletado.
+        """
+        from apps.asistencias.models import RegistroAsistencia
+
+        return self.con_jornada_vigente(fecha).exclude(Exists(
+            RegistroAsistencia.objects.filter(
+                id_trabajador=OuterRef('pk'),
+                fecha=fecha,
+                hora_entrada__isnull=False,
+                hora_salida__isnull=False,
+            )
+        ))
+
+
 class Trabajador(models.Model):
     id_trabajador = models.AutoField(primary_key=True)
     numero_empleado = models.CharField(max_length=20, unique=True, verbose_name="Número de Empleado")
@@ -122,6 +222,21 @@ class Trabajador(models.Model):
 
     activo = models.BooleanField(default=True, verbose_name="Activo")
 
+    # Asignación de jornada vigente hoy y su fecha de fin (NULL = sin fin).
+    # Copia de TrabajadorJornada: la mantienen las altas/cambios de
+    # asignaciones y el comando diario renovar_jornadas_actuales.
+    jornada_actual = models.ForeignKey(
+        'jornadas_laborales.TrabajadorJornada',
+        null=True,
+        blank=True,
+        editable=False,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name="Jornada actual"
+    )
+    jornada_actual_fin = models.DateField(null=True, blank=True, editable=False,
+                                          verbose_name="Fin de la jornada actual")
+
     # Auditoría
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Fecha de Creación")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Actualización")
@@ -142,24 +257,41 @@ class Trabajador(models.Model):
         verbose_name="Modificado por"
     )
 
+    objects = TrabajadorQuerySet.as_manager()
+
     class Meta:
         db_table = 'trabajador'
         verbose_name = 'Trabajador'
         verbose_name_plural = 'Trabajadores'
         ordering = ['apellido_paterno', 'apellido_materno', 'nombre']
+        indexes = [
+            # Alcance de jefe: trabajadores (activos) de una unidad
+            models.Index(fields=['id_unidad', 'activo'], name='trabajador_unidad_activo_idx'),
+            # Trabajadores con jornada vigente (registro rápido, dashboards)
+            models.Index(
+                fields=['activo', 'jornada_actual_fin'],
+                condition=Q(jornada_actual__isnull=False),
+                name='trabajador_jornada_actual_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.numero_empleado} - {self.nombre} {self.apellido_paterno} {self.apellido_materno}"
     
     def clean(self):
         # Validar RFC (13 caracteres, formato general)
-        if not re.match(r'^[A-ZÑ&]{3,4}\d{6}[A-Z0-9]{3}$', self.rfc.upper()):
+        if not RFC_REGEX.match(self.rfc.upper()):
             raise ValidationError({"rfc": "El RFC no tiene un formato válido."})
 
         # Validar CURP (18 caracteres, formato oficial)
-        if not re.match(r'^[A-Z]{1}[AEIOUX]{1}[A-Z]{2}\d{6}[HM]{1}[A-Z]{5}[A-Z0-9]{2}$', self.curp.upper()):
+        if not CURP_REGEX.match(self.curp.upper()):
             raise ValidationError({"curp": "El CURP no tiene un formato válido."})
 
     @property
     def nombre_completo(self):
-        return f"{self.nombre} {self.apellido_paterno} {self.apellido_materno}"
\ No newline at end of file
+        return f"{self.nombre} {self.apellido_paterno} {self.apellido_materno}"
+
+    @property
+    def etiqueta(self):
+        """Texto con el que se muestra el trabajador en el autocompletado."""
+        return f"{self.nombre_completo} - {self.numero_empleado}"
\ No newline at end of file
@@ -11,6 +11,7 @@ urlpatterns = [
     path('<int:pk>/editar/', views.TrabajadorUpdateView.as_view(), name='editar'),
     path('<int:pk>/toggle-activo/', views.TrabajadorToggleActivoView.as_view(), name='toggle-activo'),
     path('<int:pk>/eliminar/', views.TrabajadorDeleteView.as_view(), name='eliminar'),
+    path('autocompletar/', views.autocompletar_trabajadores, name='autocompletar'),
     
     # --- PUESTOS ---
     path('puestos/', views.PuestoListView.as_view(), name='puestos-lista'),
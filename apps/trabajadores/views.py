@@ -1,3 +1,5 @@
+from datetime import date
+
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views import View
@@ -5,46 +7,39 @@ from django.contrib import messages
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from apps.trabajadores.forms import PuestoFormSet
+from apps.accounts import catalogos
 from .models import Puesto, TipoNombramiento, Trabajador
 from apps.unidades.models import UnidadAdministrativa
-from django.db import models
 from django.views.generic import ListView
 from .models import Trabajador, Puesto, TipoNombramiento
 from django.utils.decorators import method_decorator
 from apps.accounts.decorators import jefe_o_admin_requerido, admin_requerido
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404
+from django.db.models import Count, Q
 from django.db.models.deletion import ProtectedError
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_cookie
 
 @method_decorator([login_required, jefe_o_admin_requerido], name='dispatch')
 class TrabajadorListView(ListView):
     model = Trabajador
     template_name = 'trabajadores/lista_trabajadores.html'
     context_object_name = 'trabajadores'
+    paginate_by = 20
 
     def get_queryset(self):
-        queryset = Trabajador.objects.select_related(
+        # 🔹 Admin ve todos, jefe solo su unidad (sin unidad asignada no ve nada)
+        queryset = Trabajador.objects.visible_to(self.request.scope).select_related(
             'id_unidad', 'id_puesto', 'id_tipo_nombramiento'
-        ).all()
+        )
 
-        user = self.request.user
-        
-        # 🔹 Si es jefe → filtrar solo trabajadores de su unidad
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                queryset = queryset.filter(id_unidad=user.perfil.id_trabajador.id_unidad)
-            else:
-                # Si el jefe no tiene trabajador asignado, no ve nada
-                queryset = Trabajador.objects.none()
-
-        # ---- FILTRO POR NOMBRE ----
+        # ---- BÚSQUEDA (nombre, número de empleado, RFC o CURP) ----
         nombre = self.request.GET.get('nombre', '')
         if nombre:
-            queryset = queryset.filter(
-                models.Q(nombre__icontains=nombre) |
-                models.Q(apellido_paterno__icontains=nombre) |
-                models.Q(apellido_materno__icontains=nombre)
-            )
+            queryset = queryset.buscar(nombre)
 
         # ---- FILTRO POR UNIDAD ----
         unidad = self.request.GET.get('unidad', '')
@@ -66,21 +61,31 @@ class TrabajadorListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        user = self.request.user
+        scope = self.request.scope
         
         # 🔹 Si es jefe → solo su unidad en filtros
-        if user.perfil.es_jefe() and user.perfil.id_trabajador:
-            context["unidades"] = UnidadAdministrativa.objects.filter(
-                id_unidad=user.perfil.id_trabajador.id_unidad.id_unidad
+        if scope.es_jefe() and scope.tiene_trabajador:
+            unidades = UnidadAdministrativa.objects.filter(
+                id_unidad=scope.id_unidad
             )
         else:
             # Admin ve todas las unidades
-            context["unidades"] = UnidadAdministrativa.objects.all()
+            unidades = UnidadAdministrativa.objects.all()
+
+        # Trabajadores activos por unidad en la misma consulta (GROUP BY)
+        context["unidades"] = unidades.annotate(
+            trabajadores_activos=Count('trabajadores', filter=Q(trabajadores__activo=True))
+        ).order_by('nombre')
         
-        context["puestos"] = Puesto.objects.all()
-        context["nombramientos"] = TipoNombramiento.objects.all()
+        context["puestos"] = catalogos.puestos()
+        context["nombramientos"] = catalogos.tipos_nombramiento()
         context["values"] = self.request.GET  # conserva valores del formulario
 
+        # Filtros para los enlaces de paginación (sin el número de página)
+        filtros = self.request.GET.copy()
+        filtros.pop('page', None)
+        context["filtros_query"] = filtros.urlencode()
+
         return context
 
 @method_decorator([login_required, jefe_o_admin_requerido], name='dispatch')
@@ -90,17 +95,8 @@ class TrabajadorDetailView(DetailView):
     context_object_name = 'trabajador'
     
     def get_queryset(self):
-        queryset = super().get_queryset()
-        user = self.request.user
-        
         # 🔹 Si es jefe → solo puede ver trabajadores de su unidad
-        if user.perfil.es_jefe():
-            if user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-                queryset = queryset.filter(id_unidad=user.perfil.id_trabajador.id_unidad)
-            else:
-                queryset = Trabajador.objects.none()
-        
-        return queryset
+        return super().get_queryset().visible_to(self.request.scope)
 
 @method_decorator([login_required, admin_requerido], name='dispatch')
 class TrabajadorCreateView(LoginRequiredMixin, CreateView):
@@ -119,6 +115,14 @@ class TrabajadorCreateView(LoginRequiredMixin, CreateView):
     ]
     template_name = 'trabajadores/formulario_trabajador.html'
     success_url = reverse_lazy('trabajadores:index')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Opciones de los selects desde los catálogos cacheados
+        context['unidades'] = catalogos.unidades()
+        context['puestos'] = catalogos.puestos()
+        context['nombramientos'] = catalogos.tipos_nombramiento()
+        return context
     
     def form_valid(self, form):
         # Auditoría
@@ -146,34 +150,38 @@ class TrabajadorUpdateView(LoginRequiredMixin, UpdateView):
     
     def get_form(self, *args, **kwargs):
         form = super().get_form(*args, **kwargs)
-        user = self.request.user
+        scope = self.request.scope
         
         # 🔹 Si es jefe, pre-seleccionar su unidad y deshabilitarla
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            unidad = user.perfil.id_trabajador.id_unidad
-            form.fields['id_unidad'].queryset = UnidadAdministrativa.objects.filter(id_unidad=unidad.id_unidad)
+        if scope.es_jefe() and scope.tiene_unidad:
+            form.fields['id_unidad'].queryset = UnidadAdministrativa.objects.filter(id_unidad=scope.id_unidad)
             form.fields['id_unidad'].widget.attrs['disabled'] = True
         
         return form
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
+        scope = self.request.scope
         
         # Pasar flag al template para saber si es jefe
-        context['es_jefe'] = user.perfil.es_jefe()
+        context['es_jefe'] = scope.es_jefe()
+
+        # Opciones de los selects desde los catálogos cacheados
+        context['unidades'] = catalogos.unidades()
+        context['puestos'] = catalogos.puestos()
+        context['nombramientos'] = catalogos.tipos_nombramiento()
         
         return context
 
     def form_valid(self, form):
-        user = self.request.user
+        scope = self.request.scope
         
         # 🔹 Si es jefe, forzar la unidad (por si intentan manipular el HTML)
-        if user.perfil.es_jefe() and user.perfil.id_trabajador and user.perfil.id_trabajador.id_unidad:
-            form.instance.id_unidad = user.perfil.id_trabajador.id_unidad
+        if scope.es_jefe() and scope.tiene_unidad:
+            form.instance.id_unidad_id = scope.id_unidad
         
         # Auditoría
-        form.instance.updated_by = user
+        form.instance.updated_by = self.request.user
         return super().form_valid(form)
 
 @method_decorator([login_required, jefe_o_admin_requerido], name='dispatch')
@@ -202,6 +210,63 @@ class TrabajadorDeleteView(DeleteView):
     template_name = 'trabajadores/confirmar_eliminar_trabajador.html'
     success_url = reverse_lazy('trabajadores:index')
     
+# -- AUTOCOMPLETADO --
+
+@login_required
+@jefe_o_admin_requerido
+@cache_control(private=True, max_age=60)
+@vary_on_cookie
+def autocompletar_trabajadores(request):
+    """
+    Búsqueda de trabajadores activos para los campos de autocompletado.
+
+    Parámetros GET:
+        q       texto a buscar (nombre completo, o prefijo de número de
+                empleado, RFC o CURP; ver TrabajadorQuerySet.buscar)
+        unidad  opcional, limita a una unidad (dentro del alcance del usuario)
+        pendientes  opcional, solo quienes no han completado su asistencia
+                hoy (registro rápido)
+        limite  máximo de resultados (tope AUTOCOMPLETAR_LIMITE_MAX)
+
+    Sustituye a los <select> con todos los trabajadores: las páginas solo
+    cargan los resultados que el usuario pide y el navegador los reutiliza
+    durante un minuto.
+    """
+    texto = request.GET.get('q', '')
+    try:
+        limite = int(request.GET.get('limite', settings.AUTOCOMPLETAR_LIMITE))
+    except ValueError:
+        limite = settings.AUTOCOMPLETAR_LIMITE
+    limite = max(1, min(limite, settings.AUTOCOMPLETAR_LIMITE_MAX))
+
+    trabajadores = Trabajador.objects.visible_to(request.scope).filter(
+        activo=True
+    ).buscar(texto)
+
+    unidad = request.GET.get('unidad')
+    if unidad and unidad.isdigit():
+        trabajadores = trabajadores.filter(id_unidad_id=unidad)
+
+    if request.GET.get('pendientes'):
+        trabajadores = trabajadores.pendientes_de_registro(date.today())
+
+    filas = list(
+        trabajadores.values(
+            'id_trabajador', 'numero_empleado', 'nombre',
+            'apellido_paterno', 'apellido_materno', 'id_unidad__nombre'
+        )[:limite + 1]
+    )
+
+    resultados = [{
+        'id': fila['id_trabajador'],
+        'numero_empleado': fila['numero_empleado'],
+        'etiqueta': f"{fila['nombre']} {fila['apellido_paterno']} {fila['apellido_materno']} - {fila['numero_empleado']}",
+        'unidad': fila['id_unidad__nombre'],
+    } for fila in filas[:limite]]
+
+    return JsonResponse({'resultados': resultados, 'hay_mas': len(filas) > limite})
+
+
 # -- PUESTOS --
 
 @method_decorator([login_required, jefe_o_admin_requerido], name='dispatch')
@@ -212,7 +277,7 @@ class PuestoListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['es_admin'] = self.request.user.perfil.es_admin()
+        context['es_admin'] = self.request.scope.es_admin()
         return context
 
 @method_decorator([login_required, admin_requerido], name='dispatch')
@@ -260,7 +325,7 @@ class NombramientoListView(ListView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['es_admin'] = self.request.user.perfil.es_admin()
+        context['es_admin'] = self.request.scope.es_admin()
         return context
 
 @method_decorator([login_required, admin_requerido], name='dispatch')
@@ -0,0 +1,65 @@
+# apps/trabajadores/widgets.py
+
+from urllib.parse import urlencode
+
+from django import forms
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Trabajador
+
+
+def etiqueta_trabajador(pk):
+    """Etiqueta del trabajador seleccionado (una consulta, solo si hay valor)."""
+    if pk in (None, '') or not str(pk).isdigit():
+        return ''
+    trabajador = Trabajador.objects.filter(pk=pk).only(
+        'numero_empleado', 'nombre', 'apellido_paterno', 'apellido_materno'
+    ).first()
+    return trabajador.etiqueta if trabajador else ''
+
+
+class TrabajadorAutocompleteWidget(forms.Widget):
+    """
+    Campo de búsqueda de trabajador que consulta `trabajadores:autocompletar`.
+
+    A diferencia de un Select, no recorre el queryset del campo: la página
+    solo incluye el trabajador seleccionado. El ModelChoiceField sigue
+    validando contra su queryset (con alcance) al enviar el formulario.
+
+    Args:
+        unidad_selector: selector CSS de un <select> de unidad cuyo valor se
+            envía como filtro (p. ej. '#filtro-unidad').
+        placeholder: texto del campo de búsqueda.
+        parametros: filtros fijos que se añaden a cada búsqueda
+            (p. ej. {'pendientes': 1} en el registro rápido).
+    """
+    template_name = 'trabajadores/widgets/autocompletar.html'
+
+    def __init__(self, attrs=None, unidad_selector=None, placeholder='Buscar por nombre o número de empleado',
+                 parametros=None):
+        super().__init__(attrs)
+        self.unidad_selector = unidad_selector
+        self.placeholder = placeholder
+        self.parametros = parametros or {}
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        widget = context['widget']
+        atributos = dict(widget['attrs'])
+        return {
+            'nombre': name,
+            'id': atributos.pop('id', f'id_{name}'),
+            'valor': widget['value'],
+            'etiqueta': etiqueta_trabajador(widget['value']),
+            'clases': atributos.pop('class', ''),
+            'requerido': atributos.pop('required', False),
+            'atributos': atributos,
+            'unidad_selector': self.unidad_selector,
+            'placeholder': self.placeholder,
+            'parametros': urlencode(self.parametros),
+        }
+
+    def render(self, name, value, attrs=None, renderer=None):
+        # La plantilla vive en templates/ del proyecto, no en el motor de formularios
+        return mark_safe(render_to_string(self.template_name, self.get_context(name, value, attrs)))
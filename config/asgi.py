@@ -3,6 +3,9 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the async views (dashboard, jornadas list) run their independent
+queries concurrently; serve it with ``uvicorn config.asgi:application``.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
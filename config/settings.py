@@ -5,6 +5,7 @@ Django settings for SCA-B123 project.
 from pathlib import Path
 from decouple import config
 import os
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'apps.jornadas_laborales',
     'apps.asistencias',
     'apps.reportes',
+    'apps.notificaciones',
 
     # Required for django-browser-reload
     'django_browser_reload',
@@ -51,10 +53,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',  # Estáticos comprimidos y con caché larga
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.accounts.middleware.AccessScopeMiddleware',  # request.scope (rol/trabajador/unidad)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',  # Requerido por allauth
@@ -74,6 +78,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',  # Requerido por allauth
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.accounts.context_processors.scope',
             ],
         },
     },
@@ -123,6 +128,8 @@ ACCOUNT_EMAIL_REQUIRED = config('ACCOUNT_EMAIL_REQUIRED', default=True, cast=boo
 ACCOUNT_EMAIL_VERIFICATION = config('ACCOUNT_EMAIL_VERIFICATION', default='mandatory')
 ACCOUNT_LOGIN_ATTEMPTS_LIMIT = config('ACCOUNT_LOGIN_ATTEMPTS_LIMIT', default=5, cast=int)
 ACCOUNT_LOGIN_ATTEMPTS_TIMEOUT = config('ACCOUNT_LOGIN_ATTEMPTS_TIMEOUT', default=300, cast=int)
+# allauth guarda los intentos fallidos de login en la caché (no en la BD):
+# durante el pico de entrada de la mañana no generan escrituras.
 
 LOGIN_REDIRECT_URL = 'accounts:dashboard'
 ACCOUNT_LOGOUT_REDIRECT_URL = '/'
@@ -136,19 +143,100 @@ ACCOUNT_EMAIL_CONFIRMATION_AUTHENTICATED_REDIRECT_URL = '/accounts/dashboard/'
 # Solo permitir un email único por usuario
 ACCOUNT_UNIQUE_EMAIL = True
 
+# ==================================
+# SESIONES
+# ==================================
+
+# Lectura desde la caché y escritura en la BD (write-through): cada petición
+# autenticada deja de consultar django_session y la sesión sobrevive a reinicios.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 # ==================================
 # EMAIL CONFIGURATION (MailHog)
 # ==================================
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Las peticiones solo encolan el correo en la bandeja de salida (tabla correo_salida).
+# La entrega real la hace `python manage.py enviar_correos` con BANDEJA_SALIDA_BACKEND.
+EMAIL_BACKEND = 'apps.notificaciones.backends.BandejaSalidaEmailBackend'
 EMAIL_HOST = 'sca_b123_mailhog'
 EMAIL_PORT = 1025
 EMAIL_HOST_USER = ''
 EMAIL_HOST_PASSWORD = ''
 EMAIL_USE_TLS = False
+EMAIL_TIMEOUT = 10  # Evita que un servidor SMTP lento bloquee al proceso de envío
+
+BANDEJA_SALIDA_BACKEND = config('BANDEJA_SALIDA_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+BANDEJA_SALIDA_LOTE = config('BANDEJA_SALIDA_LOTE', default=50, cast=int)
+BANDEJA_SALIDA_MAX_INTENTOS = config('BANDEJA_SALIDA_MAX_INTENTOS', default=5, cast=int)
+BANDEJA_SALIDA_ESPERA_BASE = config('BANDEJA_SALIDA_ESPERA_BASE', default=30, cast=int)  # segundos
 DEFAULT_FROM_EMAIL = 'SCA-B123 <noreply@sca-b123.local>'
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# ==================================
+# CACHE
+# ==================================
+
+# Backend compartido por todos los procesos:
+#   archivo → FileBasedCache en CACHE_LOCATION (un solo servidor)
+#   db      → DatabaseCache; crear la tabla con `manage.py createcachetable`
+#   redis   → Redis o compatible (varios servidores); CACHE_LOCATION es la URL
+#   local   → LocMemCache por proceso (pruebas)
+CACHE_BACKEND = config('CACHE_BACKEND', default='archivo')
+_CACHE_BACKENDS = {
+    'archivo': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'cache_sca'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://localhost:6379/1'),
+    'local': ('django.core.cache.backends.locmem.LocMemCache', 'sca'),
+}
+if CACHE_BACKEND not in _CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"CACHE_BACKEND debe ser uno de: {', '.join(_CACHE_BACKENDS)} (se recibió {CACHE_BACKEND!r})"
+    )
+_cache_backend, _cache_location = _CACHE_BACKENDS[CACHE_BACKEND]
+
+CACHES = {
+    'default': {
+        'BACKEND': _cache_backend,
+        'LOCATION': config('CACHE_LOCATION', default=_cache_location),
+        'KEY_PREFIX': 'sca',
+        'TIMEOUT': config('CACHE_TTL', default=300, cast=int),
+    }
+}
+if CACHE_BACKEND != 'redis':
+    # Redis aplica su propia política de expulsión (maxmemory-policy)
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+    }
+
+# Ninguna entrada versionada vive más que esto, ni las de dominios "sin caducidad"
+# (catálogos): las de versiones pasadas terminan por salir aunque nadie las borre.
+CACHE_TTL_MAXIMO = config('CACHE_TTL_MAXIMO', default=86400, cast=int)
+
+# Cada proceso suma sus aciertos/fallos/expulsiones de caché a los contadores
+# compartidos a lo más cada estos segundos (ver `manage.py estadisticas_cache`).
+CACHE_METRICAS_SEGUNDOS = config('CACHE_METRICAS_SEGUNDOS', default=30, cast=int)
+
+# Segundos que viven las estadísticas del dashboard. Las señales de asistencias,
+# incidencias, trabajadores y perfiles las invalidan antes; el TTL es la red de seguridad.
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', default=60, cast=int)
+
+# Las vistas asíncronas (dashboard, lista de jornadas) ejecutan sus conteos al mismo
+# tiempo; el que tarde más de estos segundos se muestra como "n/a".
+CONSULTAS_TIMEOUT = config('CONSULTAS_TIMEOUT', default=2.0, cast=float)
+
+# Hilos (y conexiones a la base de datos, que cada hilo conserva) por proceso para
+# esas consultas concurrentes. En PostgreSQL, CONSULTAS_TIMEOUT se aplica como
+# statement_timeout: la consulta lenta se cancela en el servidor.
+CONSULTAS_HILOS = config('CONSULTAS_HILOS', default=4, cast=int)
+
+# Cada proceso guarda en memoria los días inhábiles por año; revisa la versión
+# compartida del calendario (que suben sus señales) a lo más cada estos segundos.
+CALENDARIO_REVISION_SEGUNDOS = config('CALENDARIO_REVISION_SEGUNDOS', default=5, cast=int)
+
+# Resultados del autocompletado de trabajadores (por defecto y máximo por petición)
+AUTOCOMPLETAR_LIMITE = 15
+AUTOCOMPLETAR_LIMITE_MAX = 50
+
 # ==================================
 # INTERNATIONALIZATION
 # ==================================
@@ -166,6 +254,21 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Los estáticos se construyen con scripts/construir_estaticos.sh (Tailwind,
+# Font Awesome, FullCalendar e Inter, sin CDNs). collectstatic les agrega un
+# hash al nombre (ManifestStaticFilesStorage) y genera versiones .gz y .br;
+# WhiteNoise sirve la versión comprimida que acepte el navegador y, como el
+# nombre cambia con el contenido, la marca como inmutable por un año.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+WHITENOISE_MAX_AGE = config('WHITENOISE_MAX_AGE', default=3600, cast=int)  # archivos sin hash
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -0,0 +1,39 @@
+#!/bin/bash
+# Construye los estáticos precompilados que sirven las plantillas:
+#
+#   static/dist/css/app.css        Tailwind (solo clases usadas) + Inter, minificado
+#   static/dist/js/*.js            JavaScript propio minificado
+#   static/vendor/fontawesome/     Font Awesome (css + webfonts)
+#   static/vendor/fullcalendar/    FullCalendar + locale es
+#   static/vendor/inter/           fuente Inter
+#
+# Las versiones están fijas en package.json. Después, collectstatic les pone
+# hash en el nombre y genera las versiones .gz/.br (ver STORAGES en settings).
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+echo -e "${YELLOW}Instalando dependencias de Node...${NC}"
+npm install --no-audit --no-fund --loglevel=error
+
+echo -e "${YELLOW}Compilando CSS y JavaScript...${NC}"
+npx tailwindcss -c tailwind.config.js -i assets/css/app.css -o static/dist/css/app.css --minify
+npx esbuild static/js/*.js --minify --outdir=static/dist/js --log-level=warning
+
+echo -e "${YELLOW}Copiando librerías de terceros...${NC}"
+rm -rf static/vendor
+mkdir -p static/vendor/fontawesome/css static/vendor/fullcalendar/locales static/vendor/inter
+
+cp node_modules/@fortawesome/fontawesome-free/css/all.min.css static/vendor/fontawesome/css/
+cp -r node_modules/@fortawesome/fontawesome-free/webfonts static/vendor/fontawesome/
+
+cp node_modules/fullcalendar/index.global.min.js static/vendor/fullcalendar/
+cp node_modules/fullcalendar/locales/es.global.min.js static/vendor/fullcalendar/locales/
+
+cp node_modules/@fontsource-variable/inter/files/inter-latin-wght-normal.woff2 static/vendor/inter/
+
+echo -e "${GREEN}✓ Estáticos construidos en static/dist y static/vendor${NC}"
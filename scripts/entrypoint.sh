@@ -19,6 +19,9 @@ echo -e "${YELLOW}Aplicando migraciones...${NC}"
 python manage.py migrate --noinput
 echo -e "${GREEN}✓ Migraciones aplicadas${NC}"
 
+# Tabla de la caché (solo la usa CACHE_BACKEND=db; con otro backend no hace nada)
+python manage.py createcachetable
+
 # Crear superusuario si no existe
 if [ -n "$DJANGO_SUPERUSER_USERNAME" ] && [ -n "$DJANGO_SUPERUSER_PASSWORD" ] && [ -n "$DJANGO_SUPERUSER_EMAIL" ]; then
     echo -e "${YELLOW}Verificando superusuario...${NC}"
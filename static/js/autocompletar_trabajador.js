@@ -0,0 +1,152 @@
+// Autocompletado de trabajadores (templates/trabajadores/widgets/autocompletar.html)
+//
+// El campo visible busca en `trabajadores:autocompletar` y el oculto guarda el
+// id que se envía con el formulario. Si el usuario cambia el texto sin elegir
+// un resultado, el valor oculto se limpia.
+(function () {
+    const ESPERA_MS = 250;
+
+    function iniciar(contenedor) {
+        const buscar = contenedor.querySelector('[data-autocompletar-buscar]');
+        const valor = contenedor.querySelector('[data-autocompletar-valor]');
+        const lista = contenedor.querySelector('[data-autocompletar-resultados]');
+        const unidad = contenedor.dataset.unidad ? document.querySelector(contenedor.dataset.unidad) : null;
+
+        let temporizador = null;
+        let peticion = null;
+        let activo = -1;
+
+        function cerrar() {
+            lista.classList.add('hidden');
+            lista.innerHTML = '';
+            activo = -1;
+        }
+
+        function seleccionar(resultado) {
+            valor.value = resultado.id;
+            buscar.value = resultado.etiqueta;
+            valor.dispatchEvent(new Event('change', { bubbles: true }));
+            cerrar();
+        }
+
+        function marcar(indice) {
+            const opciones = lista.querySelectorAll('li[data-id]');
+            if (!opciones.length) return;
+            activo = (indice + opciones.length) % opciones.length;
+            opciones.forEach(function (opcion, i) {
+                opcion.classList.toggle('bg-primary-500/10', i === activo);
+            });
+            opciones[activo].scrollIntoView({ block: 'nearest' });
+        }
+
+        function mostrar(datos) {
+            lista.innerHTML = '';
+            activo = -1;
+
+            if (!datos.resultados.length) {
+                const vacio = document.createElement('li');
+                vacio.className = 'px-3 py-2 text-gray-500 dark:text-dark-400';
+                vacio.textContent = 'Sin resultados';
+                lista.appendChild(vacio);
+            }
+
+            datos.resultados.forEach(function (resultado) {
+                const opcion = document.createElement('li');
+                opcion.dataset.id = resultado.id;
+                opcion.className = 'px-3 py-2 cursor-pointer text-gray-900 dark:text-white hover:bg-primary-500/10';
+                opcion.textContent = resultado.etiqueta;
+
+                const detalle = document.createElement('span');
+                detalle.className = 'block text-xs text-gray-500 dark:text-dark-400';
+                detalle.textContent = resultado.unidad;
+                opcion.appendChild(detalle);
+
+                opcion.addEventListener('mousedown', function (evento) {
+                    evento.preventDefault();  // que el blur no cierre antes de elegir
+                    seleccionar(resultado);
+                });
+                lista.appendChild(opcion);
+            });
+
+            if (datos.hay_mas) {
+                const mas = document.createElement('li');
+                mas.className = 'px-3 py-2 text-xs text-gray-500 dark:text-dark-400';
+                mas.textContent = 'Hay más resultados, escribe más para acotar';
+                lista.appendChild(mas);
+            }
+
+            lista.classList.remove('hidden');
+        }
+
+        function consultar() {
+            const texto = buscar.value.trim();
+            if (!texto) {
+                cerrar();
+                return;
+            }
+
+            const parametros = new URLSearchParams(contenedor.dataset.parametros || '');
+            parametros.set('q', texto);
+            if (unidad && unidad.value) {
+                parametros.set('unidad', unidad.value);
+            }
+
+            if (peticion) peticion.abort();
+            peticion = new AbortController();
+
+            fetch(contenedor.dataset.url + '?' + parametros.toString(), {
+                credentials: 'same-origin',
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                signal: peticion.signal,
+            })
+                .then(function (respuesta) { return respuesta.ok ? respuesta.json() : { resultados: [] }; })
+                .then(mostrar)
+                .catch(function (error) {
+                    if (error.name !== 'AbortError') cerrar();
+                });
+        }
+
+        buscar.addEventListener('input', function () {
+            if (valor.value) {
+                valor.value = '';
+                valor.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+            clearTimeout(temporizador);
+            temporizador = setTimeout(consultar, ESPERA_MS);
+        });
+
+        buscar.addEventListener('keydown', function (evento) {
+            if (lista.classList.contains('hidden')) return;
+            if (evento.key === 'ArrowDown') {
+                evento.preventDefault();
+                marcar(activo + 1);
+            } else if (evento.key === 'ArrowUp') {
+                evento.preventDefault();
+                marcar(activo - 1);
+            } else if (evento.key === 'Enter' && activo >= 0) {
+                evento.preventDefault();
+                lista.querySelectorAll('li[data-id]')[activo].dispatchEvent(new Event('mousedown'));
+            } else if (evento.key === 'Escape') {
+                cerrar();
+            }
+        });
+
+        buscar.addEventListener('blur', function () {
+            // Texto sin selección: no dejar un valor a medias
+            if (!valor.value) buscar.value = '';
+            cerrar();
+        });
+
+        if (unidad) {
+            unidad.addEventListener('change', function () {
+                valor.value = '';
+                buscar.value = '';
+                cerrar();
+            });
+        }
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('[data-autocompletar-trabajador]').forEach(iniciar);
+    });
+})();